@@ -1,14 +1,33 @@
 """
 Data Exploration and Quality Assessment Script
 
-This script loads and explores the labels and transactions CSV files,
-documenting any data quality issues found including:
+This script checks the labels and transactions files and documents any data
+quality issues found including:
 - Missing values (nulls)
 - Duplicate records
 - Outliers
 - Data type issues
 - Referential integrity issues
 
+The checks are declarative rules (data_quality/rules.py) evaluated by a
+streaming engine (data_quality/engine.py): each file is read once in chunks,
+every row-level rule runs as one vectorized pass per chunk, and each issue
+keeps its count plus a bounded sample of offending rows. Duplicates and
+customer IDs are tracked as 64-bit hashes in indexes that spill to disk. With
+--id-index, transaction IDs are also checked against an index of every file
+checked before, which is then updated with this file. The transactions are
+also profiled with mergeable sketches: amount quantiles per type, distinct
+customers and descriptions, and the top descriptions. Amount outliers are the
+values outside fences derived from the distribution: the baseline's
+(--baseline-profile, a profile saved by an earlier run with --save-profile),
+or else the file's own. Raw CSVs are parsed once into the typed parse cache
+shared with data_prep/prepare_data.py, so running both back to back (or
+re-running either) reads them without parsing. The transactions may be split
+into partition files (a directory or a glob pattern): partitions are checked
+in parallel (--workers) and merged into one report, with duplicates and
+customer IDs still checked across partitions. The report is printed and
+written as JSON.
+
 Assumptions:
 1. Transaction amounts are in the same currency (no currency column present)
 2. Timestamps are in ISO 8601 format (YYYY-MM-DDTHH:MM:SS)
@@ -17,341 +36,185 @@ Assumptions:
 5. Customer IDs should be consistent across both files
 6. Transaction IDs should be unique
 7. Amounts for credits should be positive, debits should be negative
+
+Usage:
+    python Data_Quality_Check.py [labels file] [transactions file, directory or glob] [--workers N] [--chunksize ROWS] [--sample-size N] [--report report.json] [--id-index DIR]
+        [--save-profile profile.json] [--baseline-profile yesterday.json] [--parse-cache DIR | --no-parse-cache]
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime
+import argparse
+import json
+import os
 import warnings
+from pathlib import Path
 
-warnings.filterwarnings("ignore")
-
-# ============================================================================
-# LOAD DATA
-# ============================================================================
-
-print("=" * 80)
-print("LOADING DATA")
-print("=" * 80)
-
-# Load labels CSV
-print("\nLoading labels.csv...")
-labels_df = pd.read_csv("data/labels.csv")
-print(f"Labels shape: {labels_df.shape}")
-
-# Load transactions CSV
-print("\nLoading transactions.csv...")
-transactions_df = pd.read_csv("data/transactions.csv")
-print(f"Transactions shape: {transactions_df.shape}")
-
-# ============================================================================
-# BASIC DATA EXPLORATION
-# ============================================================================
-
-print("\n" + "=" * 80)
-print("BASIC DATA EXPLORATION")
-print("=" * 80)
-
-# Labels exploration
-print("\n--- LABELS DATA ---")
-print("\nFirst 3 rows:")
-print(labels_df.head(3))
-print("\nData types:")
-print(labels_df.dtypes)
-print("\nColumn names:")
-print(labels_df.columns.tolist())
-print("\nBasic statistics:")
-print(labels_df.describe(include="all"))
-
-# Transactions exploration
-print("\n--- TRANSACTIONS DATA ---")
-print("\nFirst 3 rows:")
-print(transactions_df.head(3))
-print("\nData types:")
-print(transactions_df.dtypes)
-print("\nColumn names:")
-print(transactions_df.columns.tolist())
-print("\nBasic statistics:")
-print(transactions_df.describe(include="all"))
-
-# ============================================================================
-# DATA QUALITY CHECKS
-# ============================================================================
-
-print("\n" + "=" * 80)
-print("DATA QUALITY ASSESSMENT")
-print("=" * 80)
-
-data_quality_issues = []
-
-# ----------------------------------------------------------------------------
-# 1. MISSING VALUES (NULLS)
-# ----------------------------------------------------------------------------
-
-print("\n--- 1. MISSING VALUES CHECK ---")
-
-# Check labels for nulls
-labels_nulls = labels_df.isnull().sum()
-if labels_nulls.sum() > 0:
-    print("\n❌ NULLS FOUND IN LABELS:")
-    print(labels_nulls[labels_nulls > 0])
-    data_quality_issues.append({"file": "labels.csv", "issue": "Missing values", "details": labels_nulls[labels_nulls > 0].to_dict()})
-else:
-    print("\n✅ No missing values in labels.csv")
-
-# Check transactions for nulls
-transactions_nulls = transactions_df.isnull().sum()
-if transactions_nulls.sum() > 0:
-    print("\n❌ NULLS FOUND IN TRANSACTIONS:")
-    print(transactions_nulls[transactions_nulls > 0])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Missing values", "details": transactions_nulls[transactions_nulls > 0].to_dict()})
-else:
-    print("\n✅ No missing values in transactions.csv")
-
-# ----------------------------------------------------------------------------
-# 2. DUPLICATE RECORDS
-# ----------------------------------------------------------------------------
-
-print("\n--- 2. DUPLICATE RECORDS CHECK ---")
-
-# Check for duplicate rows in labels
-labels_duplicates = labels_df.duplicated().sum()
-if labels_duplicates > 0:
-    print(f"\n❌ Found {labels_duplicates} duplicate rows in labels.csv")
-    data_quality_issues.append({"file": "labels.csv", "issue": "Duplicate rows", "count": labels_duplicates})
-else:
-    print("\n✅ No duplicate rows in labels.csv")
-
-# Check for duplicate customer_ids in labels (should be unique)
-labels_dup_customers = labels_df["customer_id"].duplicated().sum()
-if labels_dup_customers > 0:
-    print(f"\n❌ Found {labels_dup_customers} duplicate customer_ids in labels.csv")
-    print("Duplicate customer_ids:")
-    print(labels_df[labels_df["customer_id"].duplicated(keep=False)])
-    data_quality_issues.append({"file": "labels.csv", "issue": "Duplicate customer_ids", "count": labels_dup_customers})
-else:
-    print("\n✅ All customer_ids are unique in labels.csv")
-
-# Check for duplicate rows in transactions
-transactions_duplicates = transactions_df.duplicated().sum()
-if transactions_duplicates > 0:
-    print(f"\n❌ Found {transactions_duplicates} duplicate rows in transactions.csv")
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Duplicate rows", "count": transactions_duplicates})
-else:
-    print("\n✅ No duplicate rows in transactions.csv")
-
-# Check for duplicate transaction_ids (should be unique)
-transactions_dup_ids = transactions_df["transaction_id"].duplicated().sum()
-if transactions_dup_ids > 0:
-    print(f"\n❌ Found {transactions_dup_ids} duplicate transaction_ids in transactions.csv")
-    print("Duplicate transaction_ids:")
-    print(transactions_df[transactions_df["transaction_id"].duplicated(keep=False)])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Duplicate transaction_ids", "count": transactions_dup_ids})
-else:
-    print("\n✅ All transaction_ids are unique in transactions.csv")
-
-# ----------------------------------------------------------------------------
-# 3. DATA TYPE VALIDATION
-# ----------------------------------------------------------------------------
-
-print("\n--- 3. DATA TYPE VALIDATION ---")
-
-# Convert txn_timestamp to datetime for validation
-try:
-    transactions_df["txn_timestamp"] = pd.to_datetime(transactions_df["txn_timestamp"])
-    print("\n✅ Transaction timestamps are valid datetime format")
-except Exception as e:
-    print(f"\n❌ ERROR converting timestamps: {e}")
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Invalid timestamp format", "details": str(e)})
-
-# Check defaulted_within_90d values (should be 0 or 1)
-invalid_defaults = labels_df[~labels_df["defaulted_within_90d"].isin([0, 1])]
-if len(invalid_defaults) > 0:
-    print(f"\n❌ Found {len(invalid_defaults)} invalid defaulted_within_90d values (should be 0 or 1):")
-    print(invalid_defaults)
-    data_quality_issues.append({"file": "labels.csv", "issue": "Invalid defaulted_within_90d values", "count": len(invalid_defaults)})
-else:
-    print("\n✅ All defaulted_within_90d values are valid (0 or 1)")
-
-# Check transaction types (should be 'credit' or 'debit')
-invalid_txn_types = transactions_df[~transactions_df["txn_type"].isin(["credit", "debit"])]
-if len(invalid_txn_types) > 0:
-    print(f"\n❌ Found {len(invalid_txn_types)} invalid transaction types:")
-    print(invalid_txn_types)
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Invalid transaction types", "count": len(invalid_txn_types)})
-else:
-    print("\n✅ All transaction types are valid ('credit' or 'debit')")
-
-# Check amount data type
-if not pd.api.types.is_numeric_dtype(transactions_df["amount"]):
-    print("\n❌ Amount column is not numeric")
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Amount column not numeric"})
-else:
-    print("\n✅ Amount column is numeric")
-
-# ----------------------------------------------------------------------------
-# 4. OUTLIER DETECTION
-# ----------------------------------------------------------------------------
-
-print("\n--- 4. OUTLIER DETECTION ---")
-
-# Check for extremely large or small amounts
-# Assumption: Amounts should be reasonable (e.g., between -1,000,000 and 1,000,000)
-# This is a business rule assumption
-EXTREME_THRESHOLD = 1000000
-extreme_amounts = transactions_df[abs(transactions_df["amount"]) > EXTREME_THRESHOLD]
-if len(extreme_amounts) > 0:
-    print(f"\n⚠️  Found {len(extreme_amounts)} transactions with extremely large amounts (> {EXTREME_THRESHOLD:,}):")
-    print(extreme_amounts[["transaction_id", "customer_id", "amount", "txn_type", "description"]])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Extremely large amounts", "count": len(extreme_amounts), "threshold": EXTREME_THRESHOLD})
-
-# Check for zero amounts
-zero_amounts = transactions_df[transactions_df["amount"] == 0]
-if len(zero_amounts) > 0:
-    print(f"\n⚠️  Found {len(zero_amounts)} transactions with zero amount:")
-    print(zero_amounts[["transaction_id", "customer_id", "amount", "txn_type", "description"]])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Zero amount transactions", "count": len(zero_amounts)})
-
-# Check timestamp outliers (future dates or very old dates)
-# Assumption: Transactions should be between 2000-01-01 and current date + 1 year
-if "txn_timestamp" in transactions_df.columns and pd.api.types.is_datetime64_any_dtype(transactions_df["txn_timestamp"]):
-    min_reasonable_date = pd.Timestamp("2000-01-01")
-    max_reasonable_date = pd.Timestamp.now() + pd.Timedelta(days=365)
-
-    future_dates = transactions_df[transactions_df["txn_timestamp"] > max_reasonable_date]
-    old_dates = transactions_df[transactions_df["txn_timestamp"] < min_reasonable_date]
-
-    if len(future_dates) > 0:
-        print(f"\n⚠️  Found {len(future_dates)} transactions with future dates:")
-        print(future_dates[["transaction_id", "customer_id", "txn_timestamp", "amount"]])
-        data_quality_issues.append({"file": "transactions.csv", "issue": "Future date transactions", "count": len(future_dates)})
-
-    if len(old_dates) > 0:
-        print(f"\n⚠️  Found {len(old_dates)} transactions with very old dates (< 2000-01-01):")
-        print(old_dates[["transaction_id", "customer_id", "txn_timestamp", "amount"]])
-        data_quality_issues.append({"file": "transactions.csv", "issue": "Very old date transactions", "count": len(old_dates)})
-
-# ----------------------------------------------------------------------------
-# 5. BUSINESS LOGIC VALIDATION
-# ----------------------------------------------------------------------------
-
-print("\n--- 5. BUSINESS LOGIC VALIDATION ---")
-
-# Check if credit transactions have positive amounts and debit transactions have negative amounts
-# Assumption: Credits should be positive, debits should be negative
-credit_negative = transactions_df[(transactions_df["txn_type"] == "credit") & (transactions_df["amount"] < 0)]
-debit_positive = transactions_df[(transactions_df["txn_type"] == "debit") & (transactions_df["amount"] > 0)]
-
-if len(credit_negative) > 0:
-    print(f"\n⚠️  Found {len(credit_negative)} credit transactions with negative amounts:")
-    print(credit_negative[["transaction_id", "customer_id", "amount", "txn_type"]])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Credit transactions with negative amounts", "count": len(credit_negative)})
-
-if len(debit_positive) > 0:
-    print(f"\n⚠️  Found {len(debit_positive)} debit transactions with positive amounts:")
-    print(debit_positive[["transaction_id", "customer_id", "amount", "txn_type"]])
-    data_quality_issues.append({"file": "transactions.csv", "issue": "Debit transactions with positive amounts", "count": len(debit_positive)})
+import pandas as pd
 
-if len(credit_negative) == 0 and len(debit_positive) == 0:
-    print("\n✅ Transaction types and amounts are consistent (credits positive, debits negative)")
+from data_quality.engine import DEFAULT_CHUNKSIZE, SAMPLE_SIZE, build_report
 
-# ----------------------------------------------------------------------------
-# 6. REFERENTIAL INTEGRITY
-# ----------------------------------------------------------------------------
+ICONS = {"error": "❌", "warning": "⚠️ "}
 
-print("\n--- 6. REFERENTIAL INTEGRITY CHECK ---")
+# Chunks with unparseable numbers are read as strings and reported by the checks
+warnings.filterwarnings("ignore", category=pd.errors.DtypeWarning)
 
-# Check if all customer_ids in transactions exist in labels
-unique_labels_customers = set(labels_df["customer_id"].unique())
-unique_transactions_customers = set(transactions_df["customer_id"].unique())
 
-missing_in_labels = unique_transactions_customers - unique_labels_customers
-if len(missing_in_labels) > 0:
-    print(f"\n❌ Found {len(missing_in_labels)} customer_ids in transactions that don't exist in labels:")
-    print(list(missing_in_labels))
-    data_quality_issues.append(
-        {"file": "transactions.csv", "issue": "Customer IDs missing in labels", "count": len(missing_in_labels), "customer_ids": list(missing_in_labels)}
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check the labels and transactions files for data quality issues.")
+    parser.add_argument("labels", type=Path, nargs="?", default=Path("data/labels.csv"), help="Labels file (.csv, .parquet or .feather)")
+    parser.add_argument(
+        "transactions",
+        nargs="?",
+        default="data/transactions.csv",
+        help="Transactions file (.csv, .parquet or .feather), or a directory or glob pattern of partition files",
     )
-else:
-    print("\n✅ All customer_ids in transactions exist in labels")
-
-# Check if all customer_ids in labels have transactions
-missing_in_transactions = unique_labels_customers - unique_transactions_customers
-if len(missing_in_transactions) > 0:
-    print(f"\n⚠️  Found {len(missing_in_transactions)} customer_ids in labels with no transactions:")
-    print(list(missing_in_transactions))
-    data_quality_issues.append(
-        {"file": "labels.csv", "issue": "Customer IDs with no transactions", "count": len(missing_in_transactions), "customer_ids": list(missing_in_transactions)}
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Transaction partitions checked in parallel (1 checks in this process)"
     )
-else:
-    print("\n✅ All customer_ids in labels have at least one transaction")
-
-# ============================================================================
-# SUMMARY STATISTICS
-# ============================================================================
-
-print("\n" + "=" * 80)
-print("SUMMARY STATISTICS")
-print("=" * 80)
-
-print("\n--- LABELS SUMMARY ---")
-print(f"Total customers: {len(labels_df)}")
-print(f"Customers with default (1): {labels_df['defaulted_within_90d'].sum()}")
-print(f"Customers without default (0): {(labels_df['defaulted_within_90d'] == 0).sum()}")
-print(f"Default rate: {labels_df['defaulted_within_90d'].mean():.2%}")
-
-print("\n--- TRANSACTIONS SUMMARY ---")
-print(f"Total transactions: {len(transactions_df)}")
-print(f"Credit transactions: {(transactions_df['txn_type'] == 'credit').sum()}")
-print(f"Debit transactions: {(transactions_df['txn_type'] == 'debit').sum()}")
-print(f"Total credit amount: {transactions_df[transactions_df['txn_type'] == 'credit']['amount'].sum():,.2f}")
-print(f"Total debit amount: {transactions_df[transactions_df['txn_type'] == 'debit']['amount'].sum():,.2f}")
-print(f"Net amount: {transactions_df['amount'].sum():,.2f}")
-
-if "txn_timestamp" in transactions_df.columns and pd.api.types.is_datetime64_any_dtype(transactions_df["txn_timestamp"]):
-    print(f"\nDate range:")
-    print(f"  Earliest transaction: {transactions_df['txn_timestamp'].min()}")
-    print(f"  Latest transaction: {transactions_df['txn_timestamp'].max()}")
-    print(f"  Date span: {(transactions_df['txn_timestamp'].max() - transactions_df['txn_timestamp'].min()).days} days")
-
-print(f"\nAmount statistics:")
-print(f"  Min amount: {transactions_df['amount'].min():,.2f}")
-print(f"  Max amount: {transactions_df['amount'].max():,.2f}")
-print(f"  Mean amount: {transactions_df['amount'].mean():,.2f}")
-print(f"  Median amount: {transactions_df['amount'].median():,.2f}")
-print(f"  Std deviation: {transactions_df['amount'].std():,.2f}")
-
-# Transactions per customer
-transactions_per_customer = transactions_df.groupby("customer_id").size()
-print(f"\nTransactions per customer:")
-print(f"  Min: {transactions_per_customer.min()}")
-print(f"  Max: {transactions_per_customer.max()}")
-print(f"  Mean: {transactions_per_customer.mean():.2f}")
-print(f"  Median: {transactions_per_customer.median():.2f}")
-
-# ============================================================================
-# DATA QUALITY ISSUES SUMMARY
-# ============================================================================
-
-print("\n" + "=" * 80)
-print("DATA QUALITY ISSUES SUMMARY")
-print("=" * 80)
-
-if len(data_quality_issues) == 0:
-    print("\n✅ No data quality issues found!")
-else:
-    print(f"\n⚠️  Found {len(data_quality_issues)} data quality issue(s):\n")
-    for i, issue in enumerate(data_quality_issues, 1):
-        print(f"{i}. File: {issue['file']}")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read and checked at a time")
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE, help="Offending rows kept per issue")
+    parser.add_argument("--report", type=Path, default=Path("artifacts/data_quality_report.json"), help="JSON report to write")
+    parser.add_argument(
+        "--id-index", type=Path, default=None, help="Directory of the persisted transaction ID index to check against and update"
+    )
+    parser.add_argument("--save-profile", type=Path, default=None, help="Write the sketch profile of the transactions here")
+    parser.add_argument(
+        "--baseline-profile", type=Path, default=None, help="Earlier saved profile: its outlier fences are applied and the report compares the two"
+    )
+    parser.add_argument(
+        "--parse-cache", type=Path, default=Path("artifacts/parse_cache"), help="Typed copies of the raw CSVs, shared with the feature pipeline"
+    )
+    parser.add_argument("--no-parse-cache", action="store_true", help="Parse the raw CSVs directly")
+    return parser.parse_args(argv)
+
+
+def _percent(change: dict) -> str:
+    return f" ({change['relative_change']:+.1%})" if change["relative_change"] is not None else ""
+
+
+def print_report(report: dict) -> None:
+    print("=" * 80)
+    print("FILES")
+    print("=" * 80)
+    for name, info in report["files"].items():
+        print(f"\n{name}: {info['path']} ({info['rows']} rows)")
+        if "partitions" in info:
+            print(f"  {info['partitions']} partition files")
+        if "id_index" in info:
+            index = info["id_index"]
+            if index["already_applied"] == index["files"]:
+                print(f"  Already in the ID index {index['path']}: duplicates checked within the input only")
+            else:
+                print(f"  Checked against the ID index {index['path']} ({index['ids_before']} -> {index['ids_after']} IDs)")
+                if index["already_applied"]:
+                    print(f"  {index['already_applied']} of {index['files']} files already in the index (not checked against it)")
+
+    print("\n" + "=" * 80)
+    print("SUMMARY STATISTICS")
+    print("=" * 80)
+    labels, tx = report["summary"]["labels"], report["summary"]["transactions"]
+    print("\n--- LABELS SUMMARY ---")
+    print(f"Total customers: {labels['customers']}")
+    print(f"Customers with default (1): {labels['defaulted']}")
+    print(f"Customers without default (0): {labels['not_defaulted']}")
+    if labels["default_rate"] is not None:
+        print(f"Default rate: {labels['default_rate']:.2%}")
+
+    print("\n--- TRANSACTIONS SUMMARY ---")
+    print(f"Total transactions: {tx['transactions']}")
+    print(f"Credit transactions: {tx['credit_transactions']}")
+    print(f"Debit transactions: {tx['debit_transactions']}")
+    print(f"Total credit amount: {tx['total_credit_amount']:,.2f}")
+    print(f"Total debit amount: {tx['total_debit_amount']:,.2f}")
+    print(f"Net amount: {tx['net_amount']:,.2f}")
+    if tx["earliest_transaction"] is not None:
+        print(f"\nDate range:")
+        print(f"  Earliest transaction: {tx['earliest_transaction']}")
+        print(f"  Latest transaction: {tx['latest_transaction']}")
+        print(f"  Date span: {tx['date_span_days']} days")
+    if tx["amount_min"] is not None:
+        print(f"\nAmount statistics:")
+        print(f"  Min amount: {tx['amount_min']:,.2f}")
+        print(f"  Max amount: {tx['amount_max']:,.2f}")
+        print(f"  Mean amount: {tx['amount_mean']:,.2f}")
+        print(f"  Median amount: {report['profile']['amount']['all']['p50']:,.2f} (approximate)")
+        if tx["amount_std"] is not None:
+            print(f"  Std deviation: {tx['amount_std']:,.2f}")
+    if tx["transactions_per_customer"] is not None:
+        per_customer = tx["transactions_per_customer"]
+        print(f"\nTransactions per customer:")
+        print(f"  Min: {per_customer['min']}")
+        print(f"  Max: {per_customer['max']}")
+        print(f"  Mean: {per_customer['mean']:.2f}")
+        print(f"  Median: {per_customer['median']:.2f}")
+
+    profile = report["profile"]
+    print("\n--- TRANSACTIONS PROFILE (approximate) ---")
+    print(f"Distinct customers: {profile['distinct_customers']}")
+    print(f"Distinct descriptions: {profile['distinct_descriptions']}")
+    for group, quantiles in profile["amount"].items():
+        print(f"Amount quantiles ({group}): " + ", ".join(f"{name} {value:,.2f}" for name, value in quantiles.items() if name != "count"))
+    for group, fences in profile["outlier_fences"].items():
+        print(f"Outlier fences ({group}): {fences['lower']:,.2f} to {fences['upper']:,.2f}")
+    print("Top descriptions: " + ", ".join(f"{entry['description']} ({entry['count']})" for entry in profile["top_descriptions"]))
+    if "profile_drift" in report:
+        drift = report["profile_drift"]
+        print(f"\nChanges from the baseline profile {drift['baseline']}:")
+        for name in ("rows", "distinct_customers", "distinct_descriptions"):
+            change = drift[name]
+            print(f"  {name}: {change['baseline']} -> {change['current']}{_percent(change)}")
+        for group, quantiles in drift["amount"].items():
+            print(f"  amount {group}: " + ", ".join(f"{name} {_percent(change).strip() or 'n/a'}" for name, change in quantiles.items()))
+        if drift["new_top_descriptions"]:
+            print(f"  New top descriptions: {drift['new_top_descriptions']}")
+
+    print("\n" + "=" * 80)
+    print("DATA QUALITY ISSUES SUMMARY")
+    print("=" * 80)
+    issues = report["issues"]
+    if not issues:
+        print("\n✅ No data quality issues found!")
+    else:
+        print(f"\n⚠️  Found {len(issues)} data quality issue(s):\n")
+    for i, issue in enumerate(issues, 1):
+        print(f"{i}. {ICONS[issue['severity']]} File: {issue['file']}")
         print(f"   Issue: {issue['issue']}")
         if "count" in issue:
             print(f"   Count: {issue['count']}")
         if "details" in issue:
             print(f"   Details: {issue['details']}")
+        if "columns" in issue:
+            print(f"   Columns: {issue['columns']}")
         if "customer_ids" in issue:
-            print(f"   Customer IDs: {issue['customer_ids']}")
+            print(f"   Customer IDs: {issue['customer_ids']}{' ...' if issue['count'] > len(issue['customer_ids']) else ''}")
+        for row in issue.get("sample", []):
+            print(f"     {row}")
         print()
 
-print("\n" + "=" * 80)
-print("EXPLORATION COMPLETE")
-print("=" * 80)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    report = build_report(
+        args.labels,
+        args.transactions,
+        chunksize=args.chunksize,
+        sample_size=args.sample_size,
+        id_index=args.id_index,
+        baseline_profile=args.baseline_profile,
+        save_profile=args.save_profile,
+        parse_cache=None if args.no_parse_cache else args.parse_cache,
+        workers=args.workers,
+    )
+    print_report(report)
+
+    args.report.parent.mkdir(parents=True, exist_ok=True)
+    args.report.write_text(json.dumps(report, indent=2))
+    print("=" * 80)
+    print(f"Report written to {args.report}")
+    if "parse_cache" in report:
+        cache = report["parse_cache"]
+        print(f"Parse cache {cache['path']}: {cache['hits']} hit(s), {cache['parsed']} file(s) parsed")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
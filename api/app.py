@@ -1,34 +1,192 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
-import joblib
+import asyncio
+import os
+import numpy as np
 
-MODEL_PATH = Path(__file__).resolve().parents[1] / "artifacts" / "model.joblib"
+from api.batcher import MicroBatcher
+from api.binary_format import ARROW_CONTENT_TYPE, PACKED_CONTENT_TYPE, BinaryFormatError, decode_arrow, decode_packed
+from api.cache import PredictionCache
+from api.feature_store import StoreReader
+from api.inference import BoundedExecutor, Overloaded
+from api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, RequestMetrics, mark
+from api.model import FEATURE_NAMES, INTEGER_FEATURES, MODEL_PATH, REQUIRED_FEATURES, CustomerFeatures, CustomerFeaturesColumns, LoadedModel
 
-app = FastAPI(title="ML Inference Service")
+# Memory-mapped per-customer store for scoring by customer_id (python -m api.feature_store)
+FEATURE_STORE_DIR = Path(os.environ.get("FEATURE_STORE_DIR", MODEL_PATH.with_name("feature_store")))
 
+# Largest batch accepted by /predict_batch (rows)
+MAX_BATCH_ROWS = 100_000
 
-class CustomerFeatures(BaseModel):
-    txn_count: float
-    total_debit: float
-    total_credit: float
-    avg_amount: float
-    kw_rent: int = 0
-    kw_netflix: int = 0
-    kw_tesco: int = 0
-    kw_payroll: int = 0
-    kw_bonus: int = 0
+# Micro-batching of concurrent /predict requests (PREDICT_MAX_BATCH_SIZE=1 disables it)
+PREDICT_MAX_BATCH_SIZE = int(os.environ.get("PREDICT_MAX_BATCH_SIZE", "64"))
+PREDICT_MAX_BATCH_WAIT_MS = float(os.environ.get("PREDICT_MAX_BATCH_WAIT_MS", "2"))
 
+# Model calls run on this many threads; requests beyond INFERENCE_MAX_QUEUE waiting jobs get a 503
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", "1"))
+INFERENCE_MAX_QUEUE = int(os.environ.get("INFERENCE_MAX_QUEUE", "16"))
 
-model = None
+# Seconds between checks of model.joblib for a new version (0 disables hot reload)
+MODEL_RELOAD_INTERVAL_S = float(os.environ.get("MODEL_RELOAD_INTERVAL_S", "5"))
+# Load the model at import time, so `gunicorn --preload` loads it once in the master and workers share it
+MODEL_PRELOAD = os.environ.get("MODEL_PRELOAD") == "1"
+
+# Optional /predict result cache (disabled when PREDICTION_CACHE_SIZE is 0)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL_S = float(os.environ.get("PREDICTION_CACHE_TTL_S", "300"))
+
+# Directory where each gunicorn worker shares its metrics, so /metrics covers all workers (unset: this process only)
+METRICS_DIR = os.environ.get("METRICS_DIR")
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        mark("handle")
+        if orjson is None:
+            body = super().render(content)
+        else:
+            body = orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        mark("serialize")
+        return body
+
+
+# Hot endpoints return FastJSONResponse directly, which also skips FastAPI's jsonable_encoder pass
+app = FastAPI(title="ML Inference Service", default_response_class=FastJSONResponse)
+
+metrics = Metrics(METRICS_DIR)
+request_metrics = RequestMetrics(metrics)
+# Every route below records request counts and per-stage latency
+app.router.route_class = request_metrics.route_class
+inference_seconds = metrics.histogram(
+    "api_inference_stage_seconds",
+    "Time per model-call stage: batch_wait (first row queued to batch flush), queue (waiting for an inference thread), inference (model call).",
+    ("stage",),
+)
+BATCH_WAIT, INFERENCE_QUEUE, INFERENCE = (inference_seconds.slot(stage) for stage in ("batch_wait", "queue", "inference"))
+metrics.info_gauge("api_model_info", "Workers serving each model version (sha256 of model.joblib).", "version")
+model_reloads = metrics.counter("api_model_reloads_total", "Model hot reloads, by result.", ("result",))
+RELOADED, RELOAD_FAILED = model_reloads.slot("loaded"), model_reloads.slot("failed")
+
+
+# Current model; replaced (never mutated) on hot reload
+loaded: LoadedModel | None = None
+reloads = 0
+reload_failures = 0
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S) if PREDICTION_CACHE_SIZE > 0 else None
+store_reader = StoreReader(FEATURE_STORE_DIR)
+
+
+def use_model(candidate: LoadedModel) -> None:
+    global loaded
+    loaded = candidate
+    metrics.set_info("api_model_info", candidate.version)
+    if prediction_cache is not None:
+        prediction_cache.set_version(candidate.version)
+
+
+async def watch_model():
+    """Load a changed model.joblib in the background and swap it in once it is ready."""
+    global reloads, reload_failures
+    while True:
+        await asyncio.sleep(MODEL_RELOAD_INTERVAL_S)
+        try:
+            modified = MODEL_PATH.stat().st_mtime_ns
+        except OSError:
+            continue
+        if loaded is None or modified == loaded.modified:
+            continue
+        try:
+            candidate = await asyncio.to_thread(LoadedModel, MODEL_PATH)
+        except Exception:
+            # Possibly a half-written file; keep serving the current model and retry on the next check
+            reload_failures += 1
+            metrics.inc(RELOAD_FAILED)
+            continue
+        # Swapped in even when only the mtime changed, so the next check compares against it;
+        # the prediction cache keys on the content version and keeps its entries in that case
+        changed = candidate.version != loaded.version
+        use_model(candidate)
+        if changed:
+            reloads += 1
+            metrics.inc(RELOADED)
+
+
+if MODEL_PRELOAD and MODEL_PATH.exists():
+    use_model(LoadedModel(MODEL_PATH))
+
+watcher: asyncio.Task | None = None
 
 
 @app.on_event("startup")
 async def load_model():
-    global model
-    if not MODEL_PATH.exists():
-        raise RuntimeError("Model file not found. Please place model.joblib in artifacts/")
-    model = joblib.load(MODEL_PATH)
+    global watcher
+    # Runs in each worker after gunicorn forks, so every worker gets its own metrics file
+    metrics.start()
+    if loaded is None:
+        if not MODEL_PATH.exists():
+            raise RuntimeError("Model file not found. Please place model.joblib in artifacts/")
+        use_model(LoadedModel(MODEL_PATH))
+    if MODEL_RELOAD_INTERVAL_S > 0 and watcher is None:
+        watcher = asyncio.create_task(watch_model())
+
+
+def feature_matrix(batch: list[CustomerFeatures] | CustomerFeaturesColumns) -> np.ndarray:
+    """Contiguous (rows, features) float64 matrix in FEATURE_NAMES order."""
+    if isinstance(batch, CustomerFeaturesColumns):
+        columns = [getattr(batch, name) for name in FEATURE_NAMES]
+        return np.column_stack([np.zeros(len(batch)) if values is None else np.asarray(values, dtype=np.float64) for values in columns])
+    return np.array([[getattr(row, name) for name in FEATURE_NAMES] for row in batch], dtype=np.float64).reshape(len(batch), len(FEATURE_NAMES))
+
+
+def score(X: np.ndarray) -> np.ndarray:
+    """Default probability for every row of X, in one model call."""
+    current = loaded
+    if current is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    return current.predict_proba(X)
+
+
+def observe_inference(wait: float, elapsed: float) -> None:
+    metrics.observe(INFERENCE_QUEUE, wait)
+    metrics.observe(INFERENCE, elapsed)
+
+
+executor = BoundedExecutor(workers=INFERENCE_THREADS, max_queue=INFERENCE_MAX_QUEUE, observe=observe_inference)
+
+
+async def score_async(X: np.ndarray) -> np.ndarray:
+    """`score` on the inference executor, keeping the event loop free."""
+    return await executor.run(score, X)
+
+
+batcher = MicroBatcher(
+    score_async,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_MAX_BATCH_WAIT_MS,
+    observe=lambda waited: metrics.observe(BATCH_WAIT, waited),
+)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.on_event("shutdown")
+async def stop_executor():
+    global watcher
+    if watcher is not None:
+        watcher.cancel()
+        watcher = None
+    executor.shutdown()
 
 
 @app.get("/health")
@@ -36,23 +194,94 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics of every worker (see api/metrics.py)."""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "model": {
+            "version": loaded.version if loaded is not None else None,
+            "scorer": f"numpy-{loaded.scorer.kind}" if loaded is not None and loaded.scorer is not None else "sklearn",
+            "reloads": reloads,
+            "reload_failures": reload_failures,
+        },
+        "batching": batcher.stats(),
+        "inference": executor.stats(),
+        "prediction_cache": prediction_cache.stats() if prediction_cache is not None else None,
+    }
+
+
 @app.post("/predict")
 async def predict(payload: CustomerFeatures):
-    if model is None:
-        raise HTTPException(status_code=500, detail="Model not loaded")
-    X = [
-        [
-            payload.txn_count,
-            payload.total_debit,
-            payload.total_credit,
-            payload.avg_amount,
-            payload.kw_rent,
-            payload.kw_netflix,
-            payload.kw_tesco,
-            payload.kw_payroll,
-            payload.kw_bonus,
-        ]
-    ]
-    proba = model.predict_proba(X)[0][1]
+    row = [getattr(payload, name) for name in FEATURE_NAMES]
+    if prediction_cache is None:
+        proba = await batcher.submit(row)
+    else:
+        key = prediction_cache.key(row)
+        proba = prediction_cache.get(key)
+        if proba is None:
+            # A hot reload during the await may have scored with either model; don't cache that score
+            version = prediction_cache.version
+            proba = await batcher.submit(row)
+            prediction_cache.put(key, proba, version)
     pred = int(proba >= 0.5)
-    return {"probability": proba, "prediction": pred}
+    return FastJSONResponse({"probability": proba, "prediction": pred})
+
+
+@app.post("/predict_batch")
+async def predict_batch(batch: list[CustomerFeatures] | CustomerFeaturesColumns):
+    """Score many customers at once; accepts a list of records or a columnar body. Results keep input order."""
+    if len(batch) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch too large ({len(batch)} rows, limit {MAX_BATCH_ROWS})")
+    probabilities = await score_async(feature_matrix(batch)) if len(batch) else np.empty(0)
+    return FastJSONResponse({"probabilities": probabilities, "predictions": (probabilities >= 0.5).astype(np.int8)})
+
+
+@app.post("/predict_batch/binary")
+async def predict_batch_binary(request: Request):
+    """
+    Score a binary columnar batch (see api/binary_format.py): packed float64 columns
+    (application/octet-stream) or an Arrow IPC stream (application/vnd.apache.arrow.stream).
+    With `Accept: application/octet-stream` the probabilities come back as packed little-endian float64.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in (PACKED_CONTENT_TYPE, ARROW_CONTENT_TYPE):
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {PACKED_CONTENT_TYPE} or {ARROW_CONTENT_TYPE}")
+    if int(request.headers.get("content-length", 0)) > 64 + MAX_BATCH_ROWS * len(FEATURE_NAMES) * 8 * 2:
+        raise HTTPException(status_code=413, detail=f"Batch too large (limit {MAX_BATCH_ROWS} rows)")
+    body = await request.body()
+    try:
+        if content_type == PACKED_CONTENT_TYPE:
+            X = decode_packed(body, FEATURE_NAMES, INTEGER_FEATURES)
+        else:
+            X = decode_arrow(body, FEATURE_NAMES, REQUIRED_FEATURES, INTEGER_FEATURES)
+    except BinaryFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    mark("parse")
+    if len(X) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch too large ({len(X)} rows, limit {MAX_BATCH_ROWS})")
+    probabilities = await score_async(X) if len(X) else np.empty(0)
+    if PACKED_CONTENT_TYPE in request.headers.get("accept", ""):
+        return Response(probabilities.astype("<f8").tobytes(), media_type=PACKED_CONTENT_TYPE)
+    return FastJSONResponse({"probabilities": probabilities, "predictions": (probabilities >= 0.5).astype(np.int8)})
+
+
+@app.get("/customers/{customer_id}/score")
+async def score_customer(customer_id: str):
+    """Score a customer from the precomputed feature store (no feature payload needed)."""
+    store = store_reader.get()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store not published (run python -m api.feature_store)")
+    row = store.find(customer_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown customer_id {customer_id}")
+    if loaded is not None and store.model_version == loaded.version:
+        proba = float(store.scores[row])
+    else:
+        # Store was scored by another model version; rescore its stored inputs
+        proba = await batcher.submit(store.features[row].tolist())
+    return FastJSONResponse({"customer_id": customer_id, "probability": proba, "prediction": int(proba >= 0.5)})
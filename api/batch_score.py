@@ -0,0 +1,148 @@
+"""
+Offline bulk scoring of the pipeline output, without going through HTTP.
+
+The feature table (artifacts/training_set.csv or a Parquet/Feather equivalent)
+is read in chunks, each chunk is scored in a process pool, and
+`customer_id, probability, prediction` rows are streamed to the output in
+input order. At most two chunks per worker are in flight, so memory stays
+bounded whatever the size of the input.
+
+The model is loaded once, like in the API (`LoadedModel`: memory-mapped
+arrays and the verified NumPy scorer), before the pool starts; forked workers
+share it instead of loading their own copy.
+
+This is an offline job, not part of the server: app.py never imports it. It
+reads the feature table with the pipeline's readers (data_prep.table_io), so
+it runs from a checkout of the repository, or from the API image, which ships
+data_prep/ for the offline tools.
+
+Usage:
+    python -m api.batch_score [--input artifacts/training_set.csv] [--output artifacts/scores.csv] [--workers N] [--chunksize ROWS]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from api.feature_store import model_inputs
+from data_prep.table_io import iter_table, table_format
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts"
+
+# Model of this worker process (set by _init_worker)
+_model = None
+
+
+def _init_worker(model) -> None:
+    global _model
+    _model = model
+
+
+def _score(X: np.ndarray) -> np.ndarray:
+    return _model.predict_proba(X)
+
+
+def input_columns(path: Path, feature_names: list[str]) -> list[str]:
+    """customer_id plus the model inputs present in the file (missing inputs are scored as 0)."""
+    if table_format(path) == "csv":
+        available = pd.read_csv(path, nrows=0).columns
+    else:
+        import pyarrow.dataset as ds
+
+        available = ds.dataset(path, format="parquet" if table_format(path) == "parquet" else "ipc").schema.names
+    if "customer_id" not in available:
+        raise ValueError(f"{path} has no customer_id column")
+    return ["customer_id"] + [name for name in feature_names if name in available]
+
+
+class ScoreWriter:
+    """Appends score chunks to a CSV, Parquet or Feather file (by extension) with the pyarrow writers."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.format = table_format(path)
+        self._writer = None
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            if self.format == "csv":
+                import pyarrow.csv as pc
+
+                self._writer = pc.CSVWriter(self.path, table.schema)
+            elif self.format == "parquet":
+                import pyarrow.parquet as pq
+
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_table(input_path: Path, output_path: Path, model, feature_names: list[str], workers: int = 1, chunksize: int = 100_000) -> int:
+    """Score every row of the feature table at `input_path` into `output_path`; returns the number of rows."""
+    columns = input_columns(input_path, feature_names)
+    chunks = iter_table(input_path, chunksize, columns=columns, dtype={"customer_id": str} if table_format(input_path) == "csv" else None)
+    writer = ScoreWriter(output_path)
+    rows = 0
+
+    def emit(customer_id: pd.Series, probabilities: np.ndarray) -> None:
+        nonlocal rows
+        writer.write(pd.DataFrame({"customer_id": customer_id.to_numpy(), "probability": probabilities, "prediction": (probabilities >= 0.5).astype(np.int8)}))
+        rows += len(probabilities)
+
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                emit(chunk["customer_id"], model.predict_proba(model_inputs(chunk, feature_names)))
+            return rows
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk["customer_id"], pool.submit(_score, model_inputs(chunk, feature_names))))
+                # Bounded read-ahead; results are written in input order
+                if len(pending) >= 2 * workers:
+                    customer_id, future = pending.popleft()
+                    emit(customer_id, future.result())
+            while pending:
+                customer_id, future = pending.popleft()
+                emit(customer_id, future.result())
+        return rows
+    finally:
+        writer.close()
+
+
+def main(argv=None) -> None:
+    from api.model import FEATURE_NAMES, MODEL_PATH, LoadedModel
+
+    parser = argparse.ArgumentParser(description="Score the whole feature table offline and stream the scores to a file.")
+    parser.add_argument("--input", type=Path, default=ARTIFACTS_DIR / "training_set.csv", help="Feature table: .csv, .parquet or .feather/.arrow")
+    parser.add_argument("--output", type=Path, default=ARTIFACTS_DIR / "scores.csv", help="Scores to write: .csv, .parquet or .feather/.arrow")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes (1 scores in this process)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows read and scored at a time")
+    args = parser.parse_args(argv)
+
+    model = LoadedModel(args.model)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    rows = score_table(args.input, args.output, model, FEATURE_NAMES, workers=args.workers, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Scored {rows} customers into {args.output} in {elapsed:.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    print(f"   Model: {args.model.name} ({'numpy-' + model.scorer.kind if model.scorer is not None else 'sklearn'} scorer), workers: {args.workers}")
+
+
+if __name__ == "__main__":
+    main()
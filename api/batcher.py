@@ -0,0 +1,96 @@
+"""
+In-process micro-batching for single-row inference.
+
+Concurrent `/predict` requests are queued and scored together with one model
+call, flushed when `max_batch_size` rows are waiting or `max_wait_ms` after
+the first row of the batch arrived, whichever comes first. Each caller awaits
+its own row's result, so the per-call model overhead is shared by the batch.
+Batches are scored by an async `score` function (which runs the model call off
+the event loop), so new requests keep queueing while a batch is scored.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        score: Callable[[np.ndarray], Awaitable[np.ndarray]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        observe: Callable[[float], None] | None = None,
+    ):
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        # Called with the seconds from the first row of each batch arriving to the batch being flushed
+        self.observe = observe
+        self._first_at = 0.0
+        self.batch_sizes = Counter()
+        self._rows: list[list[float]] = []
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, row: list[float]) -> float:
+        """Queue one feature row and wait for its score."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        if not self._rows:
+            self._first_at = time.perf_counter()
+        self._rows.append(row)
+        self._waiters.append(waiter)
+        if len(self._rows) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self.flush)
+        return await waiter
+
+    def flush(self) -> None:
+        """Start scoring every queued row with one model call."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, waiters = self._rows, self._waiters
+        self._rows, self._waiters = [], []
+        if not rows:
+            return
+        self.batch_sizes[len(rows)] += 1
+        if self.observe is not None:
+            self.observe(time.perf_counter() - self._first_at)
+        # Keep a reference so the task is not garbage collected before it finishes
+        task = asyncio.get_running_loop().create_task(self._score_batch(rows, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score_batch(self, rows: list[list[float]], waiters: list[asyncio.Future]) -> None:
+        """Score one batch and hand each caller its result (or the error)."""
+        try:
+            scores = await self.score(np.array(rows, dtype=np.float64))
+        except Exception as exc:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        for waiter, value in zip(waiters, scores.tolist()):
+            # A caller that disconnected has its future cancelled
+            if not waiter.done():
+                waiter.set_result(value)
+
+    def stats(self) -> dict:
+        """Achieved batch-size distribution since startup."""
+        batches = sum(self.batch_sizes.values())
+        requests = sum(size * count for size, count in self.batch_sizes.items())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": batches,
+            "requests": requests,
+            "mean_batch_size": requests / batches if batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+        }
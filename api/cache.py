@@ -0,0 +1,77 @@
+"""
+Bounded in-process cache of predictions keyed on the feature vector.
+
+Entries are kept in least-recently-used order, limited to `max_entries`, and
+expire `ttl_seconds` after they were stored. The cache is tied to a model
+version (the fingerprint of model.joblib); setting a different version clears
+it, so a new model never serves scores from the previous one. A score computed
+while the version changed is not stored (`put` takes the version it was
+computed for).
+"""
+
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+
+    @staticmethod
+    def key(values: list[float]) -> tuple:
+        """Canonical key: every value as a float (1 == 1.0, -0.0 == 0.0)."""
+        return tuple(float(value) + 0.0 for value in values)
+
+    def set_version(self, version: str) -> None:
+        """Bind the cache to a model version, dropping entries from any other version."""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: tuple) -> float | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: float, version: str) -> None:
+        """Store a score; skipped if it was computed for a `version` the cache is no longer bound to."""
+        if version != self.version:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,154 @@
+"""
+Read-only, memory-mapped store of per-customer model inputs and scores.
+
+The store is built from the pipeline output (artifacts/training_set.csv or a
+Parquet/Feather equivalent) into a version directory of plain .npy files:
+
+- customer_id.npy: fixed-width byte strings, sorted (binary search lookups)
+- features.npy:    (customers, features) float64 model inputs, same order
+- scores.npy:      positive-class probabilities from the model at build time
+- meta.json:       feature names and the fingerprint of the scoring model
+
+The files are opened with `mmap_mode="r"`, so every gunicorn worker shares the
+same pages through the OS page cache, and a lookup touches O(log n) pages.
+`current` is a symlink to the live version; publishing a new build replaces
+it atomically, and readers switch on their next `refresh`.
+
+Usage:
+    python -m api.feature_store [--training-set artifacts/training_set.csv] [--store artifacts/feature_store]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts"
+STORE_DIR = ARTIFACTS_DIR / "feature_store"
+
+
+class FeatureStore:
+    """One published version of the store, memory-mapped."""
+
+    def __init__(self, version_dir: Path):
+        self.version_dir = Path(version_dir)
+        self.customer_ids = np.load(self.version_dir / "customer_id.npy", mmap_mode="r")
+        self.features = np.load(self.version_dir / "features.npy", mmap_mode="r")
+        self.scores = np.load(self.version_dir / "scores.npy", mmap_mode="r")
+        meta = json.loads((self.version_dir / "meta.json").read_text())
+        self.feature_names = meta["feature_names"]
+        self.model_version = meta["model_version"]
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    def find(self, customer_id: str) -> int | None:
+        """Row of `customer_id`, or None when the customer is not in the store."""
+        key = customer_id.encode("utf-8")
+        if not key or len(key) > self.customer_ids.dtype.itemsize:
+            return None
+        row = int(np.searchsorted(self.customer_ids, key))
+        if row < len(self) and self.customer_ids[row] == key:
+            return row
+        return None
+
+
+class StoreReader:
+    """Follows the `current` symlink of a store directory, reopening the store when it is republished."""
+
+    def __init__(self, store_dir: Path = STORE_DIR, check_interval: float = 1.0):
+        self.store_dir = Path(store_dir)
+        self.check_interval = check_interval
+        self.store: FeatureStore | None = None
+        self._target = None
+        self._checked_at = float("-inf")
+
+    def get(self) -> FeatureStore | None:
+        """The live store (None if nothing is published), checking for a new version at most once per interval."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self.refresh()
+        return self.store
+
+    def refresh(self) -> None:
+        try:
+            target = os.readlink(self.store_dir / "current")
+        except OSError:
+            return
+        if target != self._target:
+            self.store = FeatureStore(self.store_dir / target)
+            self._target = target
+
+
+def model_inputs(table, feature_names: list[str]) -> np.ndarray:
+    """
+    Model input matrix from a pipeline feature table.
+
+    The pipeline stores debits as a negative sum; API payloads carry the total
+    as a positive amount. Inputs the table does not have are 0, the API default.
+    """
+    columns = []
+    for name in feature_names:
+        if name not in table.columns:
+            columns.append(np.zeros(len(table)))
+        elif name == "total_debit":
+            columns.append(np.abs(table[name].to_numpy(dtype=np.float64)))
+        else:
+            columns.append(table[name].to_numpy(dtype=np.float64))
+    return np.column_stack(columns)
+
+
+def build_store(table, feature_names: list[str], score, model_version: str, store_dir: Path = STORE_DIR) -> Path:
+    """Write a new store version from a feature table and publish it as `current`."""
+    table = table.drop_duplicates("customer_id", keep="last")
+    ids = table["customer_id"].astype(str).str.encode("utf-8").to_numpy()
+    width = max((len(i) for i in ids), default=1)
+    ids = np.array(ids, dtype=f"S{width}")
+    order = np.argsort(ids, kind="stable")
+    features = np.ascontiguousarray(model_inputs(table, feature_names)[order])
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    # Sortable by build time; nanoseconds keep two builds within one second apart
+    now = time.time_ns()
+    version = f"v{time.strftime('%Y%m%dT%H%M%S', time.localtime(now // 10**9))}.{now % 10**9:09d}-{os.getpid()}"
+    version_dir = store_dir / version
+    version_dir.mkdir()
+    np.save(version_dir / "customer_id.npy", ids[order])
+    np.save(version_dir / "features.npy", features)
+    np.save(version_dir / "scores.npy", np.asarray(score(features), dtype=np.float64))
+    (version_dir / "meta.json").write_text(json.dumps({"feature_names": feature_names, "model_version": model_version}))
+
+    # Atomic publish: readers see either the old or the new version, never a partial one
+    link = store_dir / f"current.{version}"
+    link.symlink_to(version)
+    os.replace(link, store_dir / "current")
+
+    # Keep the previous version for readers that have not switched yet; drop older ones
+    versions = sorted(p for p in store_dir.iterdir() if p.is_dir() and not p.is_symlink() and p.name.startswith("v"))
+    for old in versions[:-2]:
+        shutil.rmtree(old, ignore_errors=True)
+    return version_dir
+
+
+def main(argv=None) -> None:
+    from api.model import FEATURE_NAMES, MODEL_PATH, LoadedModel
+    from data_prep.table_io import read_table
+
+    parser = argparse.ArgumentParser(description="Build the customer feature/score store from the pipeline output.")
+    parser.add_argument("--training-set", type=Path, default=ARTIFACTS_DIR / "training_set.csv")
+    parser.add_argument("--store", type=Path, default=STORE_DIR)
+    args = parser.parse_args(argv)
+
+    table = read_table(args.training_set)
+    model = LoadedModel(MODEL_PATH)
+    version_dir = build_store(table, FEATURE_NAMES, model.predict_proba, model.version, args.store)
+    print(f"✅ Published {version_dir} ({table['customer_id'].nunique()} customers)")
+
+
+if __name__ == "__main__":
+    main()
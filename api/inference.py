@@ -0,0 +1,76 @@
+"""
+Bounded execution of blocking model calls off the event loop.
+
+`predict_proba` is synchronous, so running it inside an async handler stalls
+every other request (including /health) for the duration of the call. Model
+calls run on a small dedicated thread pool instead. At most `max_queue` jobs
+may wait for a thread; past that, `run` fails fast with `Overloaded`, so the
+service sheds load rather than letting latency grow without bound.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full."""
+
+    # HTTP status the API answers with
+    status_code = 503
+
+
+class BoundedExecutor:
+    def __init__(self, workers: int = 1, max_queue: int = 16, observe: Callable[[float, float], None] | None = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        # Called on the event loop with (seconds waiting for a thread, seconds running) of every job
+        self.observe = observe
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        # Counters are only touched from the event loop thread
+        self.depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` on the pool, or raise `Overloaded` if too many jobs are already waiting."""
+        if self.depth >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"inference queue full ({self.max_queue} waiting)")
+        self.depth += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = fn(*args)
+            return started - submitted, time.perf_counter() - started, result
+
+        try:
+            wait, elapsed, result = await asyncio.get_running_loop().run_in_executor(self._pool, timed)
+        finally:
+            self.depth -= 1
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if self.observe is not None:
+            self.observe(wait, elapsed)
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth and the time jobs waited for a thread."""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": min(self.depth, self.workers),
+            "queued": max(self.depth - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "mean_wait_ms": 1000 * self.total_wait / self.completed if self.completed else 0.0,
+            "max_wait_ms": 1000 * self.max_wait,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,345 @@
+"""
+Low-overhead service metrics in the Prometheus text format, aggregated across gunicorn workers.
+
+Every series is a fixed slot in one float64 array: counters and gauges take one
+slot, histograms one per bucket plus one for their sum. Recording is a bisect
+and in-place adds on that array, with no locks or allocations; it only happens
+on the event loop thread.
+
+With a `directory`, each worker keeps its array in a memory-mapped file named
+after its pid (created in `start`, which runs after gunicorn forks), and
+`render` sums the files of every worker, so /metrics describes the whole
+service whichever worker answers. Counters and histograms of workers that have
+exited are kept, so totals never go backwards when gunicorn replaces a worker;
+gauges and info labels only count live workers. The directory should start
+empty for each deployment.
+
+`RequestMetrics` instruments FastAPI routes: request counts, errors, in-flight
+requests, latency per endpoint, and latency per stage of a request:
+
+- parse: reading and decoding the body
+- validate: checking it against the endpoint's schema
+- handle: the endpoint itself, including waiting for the model
+- serialize: encoding the response (recorded by responses that call `mark`)
+"""
+
+import contextvars
+import json
+import mmap
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+from inspect import iscoroutinefunction
+from pathlib import Path
+
+import numpy as np
+
+# Upper bounds (seconds) shared by every histogram; the last bucket is +Inf
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Family:
+    """A metric name with its label names; each combination of label values is a series."""
+
+    def __init__(self, metrics: "Metrics", name: str, kind: str, help: str, labelnames: tuple[str, ...]):
+        self.metrics = metrics
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = labelnames
+        self.width = len(BUCKETS) + 2 if kind == "histogram" else 1
+        self.series: dict[tuple, int] = {}
+
+    def slot(self, *labelvalues) -> int:
+        """Offset of the series in the value array (allocated on first use)."""
+        offset = self.series.get(labelvalues)
+        if offset is None:
+            if len(labelvalues) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            offset = self.series[labelvalues] = self.metrics._allocate(self.width)
+        return offset
+
+
+class Metrics:
+    def __init__(self, directory: Path | str | None = None):
+        self.directory = Path(directory) if directory else None
+        self.families: dict[str, Family] = {}
+        self.info: dict[str, str] = {}
+        self.size = 0
+        self.values = memoryview(bytearray()).cast("d")
+        self._file = None
+
+    def _family(self, name: str, kind: str, help: str, labelnames: tuple[str, ...]) -> Family:
+        if name in self.families:
+            raise ValueError(f"metric {name} is already registered")
+        family = self.families[name] = Family(self, name, kind, help, tuple(labelnames))
+        return family
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Family:
+        return self._family(name, "counter", help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Family:
+        return self._family(name, "gauge", help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Family:
+        return self._family(name, "histogram", help, labelnames)
+
+    def info_gauge(self, name: str, help: str, labelname: str) -> Family:
+        """Gauge of the number of workers reporting each value of `labelname` (see `set_info`)."""
+        return self._family(name, "info", help, (labelname,))
+
+    def _allocate(self, width: int) -> int:
+        if self._file is not None:
+            raise RuntimeError("series must be created before start()")
+        offset = self.size
+        self.size += width
+        values = memoryview(bytearray(8 * self.size)).cast("d")
+        values[:offset] = self.values
+        self.values = values
+        return offset
+
+    # Recording (hot path)
+
+    def inc(self, offset: int, amount: float = 1.0) -> None:
+        self.values[offset] += amount
+
+    def observe(self, offset: int, seconds: float) -> None:
+        values = self.values
+        values[offset + bisect_left(BUCKETS, seconds)] += 1
+        values[offset + len(BUCKETS) + 1] += seconds
+
+    def set_info(self, name: str, value: str) -> None:
+        self.info[name] = value
+        if self._file is not None:
+            self._write_info()
+
+    # Sharing between workers
+
+    def _path(self, pid: int, suffix: str) -> Path:
+        return self.directory / f"{pid}.{suffix}"
+
+    def start(self) -> None:
+        """Move this process's values into its shared file (no-op without a directory or when already started)."""
+        if self.directory is None or self._file is not None or not self.size:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(os.getpid(), "metrics")
+        # A file left by an exited worker with the same pid: keep its totals, reset its gauges
+        reused = path.exists() and path.stat().st_size == 8 * self.size
+        with open(path, "r+b" if reused else "w+b") as f:
+            f.truncate(8 * self.size)
+            self._file = mmap.mmap(f.fileno(), 8 * self.size)
+        values = memoryview(self._file).cast("d")
+        if reused:
+            for offset in self._gauge_slots():
+                values[offset] = 0.0
+            for offset, value in enumerate(self.values):
+                values[offset] += value
+        else:
+            values[:] = self.values
+        self.values = values
+        self._write_info()
+
+    def _write_info(self) -> None:
+        path = self._path(os.getpid(), "info")
+        tmp = path.with_suffix(".info.tmp")
+        tmp.write_text(json.dumps(self.info))
+        os.replace(tmp, path)
+
+    def _gauge_slots(self) -> list[int]:
+        return [offset for family in self.families.values() if family.kind == "gauge" for offset in family.series.values()]
+
+    def _collect(self) -> tuple[np.ndarray, list[dict]]:
+        """Values summed over workers, and the info of live workers."""
+        own = np.frombuffer(self.values, dtype=np.float64).copy() if self.size else np.zeros(0)
+        if self.directory is None or self._file is None:
+            return own, [self.info]
+        totals, live = np.zeros(self.size), np.zeros(self.size)
+        infos = []
+        for path in self.directory.glob("*.metrics"):
+            try:
+                pid = int(path.stem)
+                values = np.fromfile(path, dtype=np.float64)
+            except (ValueError, OSError):
+                continue
+            if len(values) != self.size:
+                continue  # written by a different version of the app
+            totals += values
+            if _alive(pid):
+                live += values
+                try:
+                    infos.append(json.loads(self._path(pid, "info").read_text()))
+                except (OSError, ValueError):
+                    pass
+        gauges = self._gauge_slots()
+        totals[gauges] = live[gauges]
+        return totals, infos
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        values, infos = self._collect()
+        lines = []
+        for family in self.families.values():
+            kind = "gauge" if family.kind == "info" else family.kind
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {kind}")
+            if family.kind == "info":
+                reported = [info[family.name] for info in infos if family.name in info]
+                for value in sorted(set(reported)):
+                    lines.append(f"{family.name}{_labels(family.labelnames, (value,))} {reported.count(value)}")
+                continue
+            for labelvalues, offset in family.series.items():
+                if family.kind != "histogram":
+                    lines.append(f"{family.name}{_labels(family.labelnames, labelvalues)} {_number(values[offset])}")
+                    continue
+                cumulative = np.cumsum(values[offset : offset + len(BUCKETS) + 1])
+                for bound, count in zip(BUCKETS + ("+Inf",), cumulative):
+                    labels = _labels(family.labelnames + ("le",), labelvalues + (str(bound),))
+                    lines.append(f"{family.name}_bucket{labels} {_number(count)}")
+                labels = _labels(family.labelnames, labelvalues)
+                lines.append(f"{family.name}_sum{labels} {_number(values[offset + len(BUCKETS) + 1])}")
+                lines.append(f"{family.name}_count{labels} {_number(cumulative[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class RequestTimer:
+    """Stage durations of one request; `mark(stage)` charges the time since the previous mark to `stage`."""
+
+    __slots__ = ("started", "last", "stages")
+
+    def __init__(self):
+        self.started = self.last = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+
+
+# Timer of the request being handled, for code that records its own stages
+current_timer: contextvars.ContextVar[RequestTimer | None] = contextvars.ContextVar("current_timer", default=None)
+
+
+def mark(stage: str) -> None:
+    """Charge the time since the previous mark of the current request (if any) to `stage`."""
+    timer = current_timer.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+# Error kinds counted by api_errors_total
+ERROR_KINDS = {400: "bad_request", 404: "not_found", 413: "too_large", 415: "unsupported_media_type", 422: "validation", 500: "internal", 503: "unavailable"}
+STAGES = ("parse", "validate", "handle", "serialize")
+
+
+class RequestMetrics:
+    """Request counters and latency histograms, recorded by routes of `route_class`."""
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        self.requests = metrics.counter("api_requests_total", "Requests handled, by endpoint and status class.", ("endpoint", "status"))
+        self.errors = metrics.counter("api_errors_total", "Failed requests, by endpoint and error kind.", ("endpoint", "error"))
+        self.in_flight = metrics.gauge("api_requests_in_flight", "Requests currently being handled.").slot()
+        self.duration = metrics.histogram("api_request_duration_seconds", "Time to handle a request, by endpoint.", ("endpoint",))
+        self.stages = metrics.histogram(
+            "api_request_stage_seconds",
+            "Time per request stage (parse, validate, handle, serialize), by endpoint.",
+            ("endpoint", "stage"),
+        )
+        self.route_class = self._route_class()
+
+    def _route_class(self):
+        from fastapi.exceptions import RequestValidationError
+        from fastapi.routing import APIRoute
+
+        request_metrics = self
+
+        def marking(endpoint):
+            """The endpoint, charging the time before it runs (body validation) to `validate`."""
+            if not iscoroutinefunction(endpoint):
+                return endpoint
+
+            @wraps(endpoint)
+            async def call(*args, **kwargs):
+                mark("validate")
+                return await endpoint(*args, **kwargs)
+
+            return call
+
+        class TimedRoute(APIRoute):
+            def __init__(self, path: str, endpoint, **kwargs):
+                super().__init__(path, marking(endpoint), **kwargs)
+
+            def get_route_handler(self):
+                handler = super().get_route_handler()
+                m = request_metrics.metrics
+                in_flight = request_metrics.in_flight
+                duration = request_metrics.duration.slot(self.path)
+                stages = {stage: request_metrics.stages.slot(self.path, stage) for stage in STAGES}
+                # One slot per status class, and "other" for codes outside 100-599
+                statuses = {status: request_metrics.requests.slot(self.path, f"{status}xx") for status in range(1, 6)}
+                other_status = request_metrics.requests.slot(self.path, "other")
+                errors = {kind: request_metrics.errors.slot(self.path, kind) for kind in (*ERROR_KINDS.values(), "other")}
+
+                async def timed_handler(request):
+                    timer = RequestTimer()
+                    token = current_timer.set(timer)
+                    m.inc(in_flight)
+                    status = 500
+                    try:
+                        if request.headers.get("content-type", "").startswith("application/json"):
+                            # Decoded once here and reused by FastAPI; invalid JSON is reported by FastAPI
+                            try:
+                                await request.json()
+                            except ValueError:
+                                pass
+                            timer.mark("parse")
+                        response = await handler(request)
+                        status = response.status_code
+                        return response
+                    except Exception as exc:
+                        status = getattr(exc, "status_code", 422 if isinstance(exc, RequestValidationError) else 500)
+                        raise
+                    finally:
+                        if "serialize" not in timer.stages:
+                            timer.mark("handle")
+                        current_timer.reset(token)
+                        m.inc(in_flight, -1.0)
+                        m.observe(duration, time.perf_counter() - timer.started)
+                        for stage, seconds in timer.stages.items():
+                            m.observe(stages[stage], seconds)
+                        m.inc(statuses.get(status // 100, other_status))
+                        if status >= 400:
+                            m.inc(errors[ERROR_KINDS.get(status, "other")])
+
+                return timed_handler
+
+        return TimedRoute
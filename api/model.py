@@ -0,0 +1,81 @@
+"""
+The served model: where its artifacts live, its input schema and a loaded version.
+
+Importing this module has no side effects, unlike `api.app`, which creates the
+app, the inference executor and the metrics. Offline tools (the feature store
+build, batch scoring) take their constants from here.
+"""
+
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+from pydantic import BaseModel, model_validator
+
+from api.scorer import compile_model, file_fingerprint, load_scorer
+
+MODEL_PATH = Path(os.environ.get("MODEL_PATH", Path(__file__).resolve().parents[1] / "artifacts" / "model.joblib"))
+# NumPy export of the model (python -m api.scorer); used when it matches model.joblib
+SCORER_PATH = MODEL_PATH.with_name("model_scorer.npz")
+
+
+class CustomerFeatures(BaseModel):
+    txn_count: float
+    total_debit: float
+    total_credit: float
+    avg_amount: float
+    kw_rent: int = 0
+    kw_netflix: int = 0
+    kw_tesco: int = 0
+    kw_payroll: int = 0
+    kw_bonus: int = 0
+
+
+# Model input columns, in the order the model was trained on
+FEATURE_NAMES = list(CustomerFeatures.model_fields)
+REQUIRED_FEATURES = {name for name, field in CustomerFeatures.model_fields.items() if field.is_required()}
+INTEGER_FEATURES = {name for name, field in CustomerFeatures.model_fields.items() if field.annotation is int}
+
+
+class CustomerFeaturesColumns(BaseModel):
+    """Columnar batch: one list per feature, all of the same length (kw_* columns default to 0)."""
+
+    txn_count: list[float]
+    total_debit: list[float]
+    total_credit: list[float]
+    avg_amount: list[float]
+    kw_rent: list[int] | None = None
+    kw_netflix: list[int] | None = None
+    kw_tesco: list[int] | None = None
+    kw_payroll: list[int] | None = None
+    kw_bonus: list[int] | None = None
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        lengths = {len(values) for values in self.__dict__.values() if values is not None}
+        if len(lengths) > 1:
+            raise ValueError("all feature columns must have the same length")
+        return self
+
+    def __len__(self) -> int:
+        return len(self.txn_count)
+
+
+class LoadedModel:
+    """One model version with its scorer, swapped in as a single object."""
+
+    def __init__(self, path: Path):
+        self.modified = path.stat().st_mtime_ns
+        self.version = file_fingerprint(path)
+        # Arrays are memory-mapped from the file, so workers share them through the page cache
+        self.model = joblib.load(path, mmap_mode="r")
+        # Prefer the exported artifact; otherwise export (and verify) in memory
+        self.scorer = load_scorer(SCORER_PATH, path) or compile_model(self.model, source=self.version)
+        # Warm up, so the first request does not pay for lazy initialisation
+        self.predict_proba(np.zeros((1, len(FEATURE_NAMES))))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if self.scorer is not None:
+            return self.scorer.predict_proba(X)
+        return self.model.predict_proba(X)[:, 1]
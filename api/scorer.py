@@ -0,0 +1,183 @@
+"""
+Standalone NumPy scoring artifacts exported from the sklearn model.
+
+`predict_proba` spends far longer in input validation and dispatch than in the
+arithmetic for a nine-feature row. The export turns the fitted estimator into
+plain arrays and scores with a few NumPy operations:
+
+- linear: coefficients and intercept of a binary LogisticRegression
+- trees: the nodes of a DecisionTreeClassifier, RandomForestClassifier or
+  ExtraTreesClassifier flattened into shared arrays, traversed level by level
+  for all rows and trees at once
+
+An export is only used after it reproduces the model's probabilities on probe
+inputs; other estimator types return None and are served by sklearn.
+
+Usage:
+    python -m api.scorer [--model artifacts/model.joblib] [--output artifacts/model_scorer.npz]
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+ARTIFACTS_DIR = Path(__file__).resolve().parents[1] / "artifacts"
+
+
+def file_fingerprint(path: Path) -> str:
+    """Content hash tying a scorer artifact to the model file it was exported from."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    # 1 / (1 + exp(-z)) without overflow for large |z|
+    return np.exp(-np.logaddexp(0.0, -z))
+
+
+class NumpyScorer:
+    """Positive-class probabilities from exported arrays (see module docstring)."""
+
+    def __init__(self, kind: str, arrays: dict[str, np.ndarray], source: str = ""):
+        self.kind = kind
+        self.arrays = arrays
+        self.source = source
+        self.n_features = int(arrays["n_features"])
+        if kind == "linear":
+            self._coef = arrays["coef"]
+            self._intercept = float(arrays["intercept"])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the positive class for every row of X."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"expected {self.n_features} features, got shape {X.shape}")
+        if self.kind == "linear":
+            return _sigmoid(X @ self._coef + self._intercept)
+        return self._tree_proba(X)
+
+    def _tree_proba(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        # sklearn casts features to float32 and compares them with float64 thresholds
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(a["roots"], (len(X), len(a["roots"]))).copy()
+        for _ in range(int(a["max_depth"])):
+            leaf = a["left"][node] < 0
+            if leaf.all():
+                break
+            go_left = X[rows, a["feature"][node]] <= a["threshold"][node]
+            node = np.where(leaf, node, np.where(go_left, a["left"][node], a["right"][node]))
+        return a["value"][node].mean(axis=1)
+
+    def save(self, path: Path) -> None:
+        np.savez(path, kind=self.kind, source=self.source, **self.arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "NumpyScorer":
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files if key not in ("kind", "source")}
+            return cls(str(data["kind"]), arrays, str(data["source"]))
+
+
+def _flatten_trees(estimators: list) -> dict[str, np.ndarray]:
+    left, right, feature, threshold, value, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        children_left = tree.children_left.astype(np.int64)
+        is_leaf = children_left < 0
+        left.append(np.where(is_leaf, -1, children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right.astype(np.int64) + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+        threshold.append(tree.threshold.astype(np.float64))
+        counts = tree.value[:, 0, :]
+        value.append(counts[:, 1] / counts.sum(axis=1))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+    return {
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "value": np.concatenate(value),
+        "roots": np.array(roots, dtype=np.int64),
+        "max_depth": np.array(max_depth),
+    }
+
+
+def export_scorer(model, source: str = "") -> NumpyScorer | None:
+    """Export a fitted binary classifier to a `NumpyScorer`, or None if the type is not supported."""
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    if len(getattr(model, "classes_", [])) != 2:
+        return None
+    n_features = np.array(model.n_features_in_)
+    if type(model) is LogisticRegression:
+        arrays = {"coef": model.coef_[0].astype(np.float64), "intercept": np.array(model.intercept_[0]), "n_features": n_features}
+        return NumpyScorer("linear", arrays, source)
+    if type(model) is DecisionTreeClassifier:
+        return NumpyScorer("trees", {**_flatten_trees([model]), "n_features": n_features}, source)
+    if type(model) in (RandomForestClassifier, ExtraTreesClassifier):
+        return NumpyScorer("trees", {**_flatten_trees(model.estimators_), "n_features": n_features}, source)
+    return None
+
+
+def probe_inputs(scorer: NumpyScorer, rows: int = 2000, seed: int = 0) -> np.ndarray:
+    """Inputs spanning several orders of magnitude, plus rows sitting exactly on tree thresholds."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((rows, scorer.n_features)) * 10.0 ** rng.integers(0, 5, size=(rows, 1))
+    X[: rows // 4] = rng.integers(0, 2, size=(rows // 4, scorer.n_features))
+    if scorer.kind == "trees":
+        a = scorer.arrays
+        split = a["left"] >= 0
+        on_threshold = np.zeros((split.sum(), scorer.n_features))
+        on_threshold[np.arange(split.sum()), a["feature"][split]] = a["threshold"][split]
+        X = np.vstack([X, on_threshold])
+    return X
+
+
+def agrees(scorer: NumpyScorer, model, X: np.ndarray, rtol: float = 1e-9, atol: float = 1e-12) -> bool:
+    """Whether the scorer reproduces the model's positive-class probabilities on X."""
+    expected = model.predict_proba(X)[:, 1]
+    return bool(np.allclose(scorer.predict_proba(X), expected, rtol=rtol, atol=atol))
+
+
+def compile_model(model, source: str = "") -> NumpyScorer | None:
+    """Exported and verified scorer for the model, or None to keep serving with sklearn."""
+    scorer = export_scorer(model, source)
+    if scorer is None or not agrees(scorer, model, probe_inputs(scorer)):
+        return None
+    return scorer
+
+
+def load_scorer(path: Path, model_path: Path) -> NumpyScorer | None:
+    """The scorer artifact at `path` if it was exported from the current `model_path`."""
+    if not Path(path).exists():
+        return None
+    scorer = NumpyScorer.load(path)
+    return scorer if scorer.source == file_fingerprint(model_path) else None
+
+
+def main(argv=None) -> None:
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Export model.joblib to a standalone NumPy scoring artifact.")
+    parser.add_argument("--model", type=Path, default=ARTIFACTS_DIR / "model.joblib")
+    parser.add_argument("--output", type=Path, default=ARTIFACTS_DIR / "model_scorer.npz")
+    args = parser.parse_args(argv)
+
+    model = joblib.load(args.model)
+    scorer = compile_model(model, source=file_fingerprint(args.model))
+    if scorer is None:
+        raise SystemExit(f"❌ {type(model).__name__} cannot be exported (unsupported type or probabilities disagree); the API will use sklearn")
+    scorer.save(args.output)
+    print(f"✅ Exported {type(model).__name__} to {args.output} ({scorer.kind} scorer, verified against sklearn)")
+
+
+if __name__ == "__main__":
+    main()
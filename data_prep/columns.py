@@ -0,0 +1,74 @@
+"""Column layouts shared by the feature pipeline's batch and streaming paths."""
+
+# Raw transaction columns the feature pipeline reads
+TRANSACTION_COLUMNS = ["transaction_id", "customer_id", "txn_timestamp", "amount", "description"]
+
+# How the raw input files are typed when parsed into the shared parse cache (data_prep/parse_cache.py).
+# The data quality specs (data_quality/rules.py) type the same columns, so both tools use one entry per file.
+RAW_TRANSACTION_TYPES = {
+    "text": ["transaction_id", "customer_id", "txn_type", "description"],
+    "numeric": ["amount"],
+    "timestamps": ["txn_timestamp"],
+}
+RAW_LABEL_TYPES = {"text": ["customer_id"], "numeric": ["defaulted_within_90d"], "timestamps": []}
+
+# Final training set columns, in output order
+FEATURE_COLUMNS = [
+    "customer_id",
+    "txn_count",
+    "total_debit",
+    "total_credit",
+    "avg_amount",
+    "debit_to_credit_ratio",
+    "days_since_last_credit",
+    "income_stability_ratio",
+    "flag_consistent_salary",
+    "flag_risky_spend",
+    "flag_rent_mortgage",
+    "flag_subscription",
+    "defaulted_within_90d",
+]
+
+# Rolling-window feature family: one column per feature and window, named <feature>_<days>d
+WINDOW_FEATURES = ["credit_sum", "debit_sum", "txn_count", "has_salary"]
+WINDOW_DTYPES = {"credit_sum": "float64", "debit_sum": "float64", "txn_count": "int32", "has_salary": "int8"}
+
+
+def window_columns(windows: list[int]) -> list[str]:
+    """Rolling-window column names for the given window lengths in days, in output order."""
+    return [f"{feature}_{days}d" for days in windows for feature in WINDOW_FEATURES]
+
+
+def with_window_columns(columns: list[str], windows: list[int]) -> list[str]:
+    """`columns` with the rolling-window columns inserted before the target (last column)."""
+    return columns[:-1] + window_columns(windows) + columns[-1:]
+
+
+# Point-in-time backfill output: one row per (customer_id, as_of)
+SNAPSHOT_COLUMNS = ["customer_id", "as_of"] + FEATURE_COLUMNS[1:]
+
+# Compact storage dtypes for the feature table in columnar formats (Parquet/Feather)
+FEATURE_DTYPES = {
+    "txn_count": "int32",
+    "total_debit": "float64",
+    "total_credit": "float64",
+    "avg_amount": "float64",
+    "debit_to_credit_ratio": "float32",
+    "days_since_last_credit": "int32",
+    "income_stability_ratio": "float32",
+    "flag_consistent_salary": "int8",
+    "flag_risky_spend": "int8",
+    "flag_rent_mortgage": "int8",
+    "flag_subscription": "int8",
+    "defaulted_within_90d": "Int8",
+}
+
+# Compact load profile for transactions: repeated strings become categories (integer codes),
+# unique transaction IDs stay in one Arrow string buffer. Amounts are converted to integer
+# pence and timestamps parsed with a fixed ISO 8601 format by `table_io.read_transactions`.
+TRANSACTION_DTYPES = {
+    "transaction_id": "string[pyarrow]",
+    "customer_id": "category",
+    "txn_type": "category",
+    "description": "category",
+}
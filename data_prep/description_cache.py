@@ -0,0 +1,99 @@
+"""
+Persistent description -> category bitmask table.
+
+Transaction descriptions repeat from day to day, so the keyword classification
+of every distinct description is kept on disk between runs. The table is tied
+to the classifier's keyword version; when the keyword lists change, the stored
+table is discarded and rebuilt. A daily run only classifies descriptions it
+has never seen.
+
+Each entry remembers the last run that saw it. When saving, entries not seen
+in the last `max_age_runs` runs are dropped, and beyond `max_entries` the
+least recently seen go first, so one-off descriptions (references, dates in
+the text) do not make the table grow forever.
+"""
+
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_prep.keywords import KEYWORD_CLASSIFIER, KeywordClassifier, expand_codes
+
+DEFAULT_MAX_AGE_RUNS = 30
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+
+class DescriptionCache:
+    """Category bitmasks of previously seen descriptions, loaded from and saved to `path`."""
+
+    def __init__(
+        self,
+        path: Path,
+        classifier: KeywordClassifier = KEYWORD_CLASSIFIER,
+        max_age_runs: int = DEFAULT_MAX_AGE_RUNS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.classifier = classifier
+        self.max_age_runs = max_age_runs
+        self.max_entries = max_entries
+        self.categories = pd.Series([], index=pd.Index([], dtype=object), dtype=classifier.dtype)
+        # Run number of this process, and the last run that saw each entry of `categories`
+        self.run = 1
+        self.last_seen = np.zeros(0, dtype=np.int64)
+        self.new_descriptions = 0
+        self.pruned = 0
+        self._used = False
+
+        if self.path.exists():
+            stored = joblib.load(self.path)
+            if stored.get("version") == classifier.version:
+                self.categories = stored["categories"]
+                self.run = stored.get("run", 0) + 1
+                self.last_seen = stored.get("last_seen", np.zeros(len(self.categories), dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def classify(self, descriptions: pd.Series) -> np.ndarray:
+        """Category bitmask for every description, classifying only unseen ones."""
+        codes, uniques = pd.factorize(descriptions)
+        positions = self.categories.index.get_indexer(uniques)
+        unseen = positions < 0
+        if unseen.any():
+            new = pd.Series(np.asarray(uniques, dtype=object)[unseen])
+            new_categories = pd.Series(self.classifier.classify_unique(new), index=pd.Index(new, dtype=object))
+            self.categories = pd.concat([self.categories, new_categories])
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new_categories), self.run, dtype=np.int64)])
+            self.new_descriptions += len(new_categories)
+            positions = self.categories.index.get_indexer(uniques)
+        self.last_seen[positions] = self.run
+        self._used = True
+        return expand_codes(codes, self.categories.to_numpy()[positions])
+
+    def prune(self) -> None:
+        """Drop entries not seen in the last `max_age_runs` runs, then the least recently seen beyond `max_entries`."""
+        keep = self.last_seen > self.run - self.max_age_runs
+        if keep.sum() > self.max_entries:
+            recent = np.argsort(-self.last_seen, kind="stable")[: self.max_entries]
+            keep = np.zeros(len(keep), dtype=bool)
+            keep[recent] = True
+        if not keep.all():
+            self.pruned += int((~keep).sum())
+            self.categories = self.categories[keep]
+            self.last_seen = self.last_seen[keep]
+
+    def save(self) -> None:
+        """Prune and write the table if this run classified anything (atomically replaces the file)."""
+        if not self._used:
+            return
+        self.prune()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        joblib.dump({"version": self.classifier.version, "run": self.run, "categories": self.categories, "last_seen": self.last_seen}, tmp_path)
+        os.replace(tmp_path, self.path)
+        self.new_descriptions = 0
+        self._used = False
@@ -0,0 +1,80 @@
+"""
+Incremental feature updates from daily transaction deltas.
+
+The per-customer `FeatureState` (running sums and counts, first/last and last
+credit timestamps, monthly salary map, keyword hit counts and the trailing
+window of recent credits) is persisted between runs. Each run folds only the
+new transactions file into it and re-emits the training set from the state,
+so a daily delta costs time proportional to the delta plus one pass over the
+customers instead of a reprocess of the full history.
+
+Each applied file is fingerprinted so the same delta is never counted twice,
+and the state is tied to the keyword version it was built with.
+"""
+
+import os
+from pathlib import Path
+
+import joblib
+
+from data_prep.description_cache import DescriptionCache
+from data_prep.keywords import KEYWORD_CLASSIFIER
+from data_prep.streaming import FeatureState, fold_transactions
+from data_prep.table_io import file_fingerprint
+
+# Bump when the layout of the stored state changes
+STATE_FORMAT = 2
+
+
+def load_state(path: Path) -> tuple[FeatureState, list[str]]:
+    """Load a stored state and the fingerprints of the files already folded into it."""
+    stored = joblib.load(path)
+    if stored.get("format") != STATE_FORMAT or stored.get("keyword_version") != KEYWORD_CLASSIFIER.version:
+        raise ValueError(f"Feature state {path} was built by another pipeline or keyword version; rebuild it from the full history")
+    state = FeatureState(stored["customers"], stored["salary_months"], stored["recent_credits"])
+    return state, stored["applied"]
+
+
+def save_state(path: Path, state: FeatureState, applied: list[str]) -> None:
+    """Write the state (atomically replaces the file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(
+        {
+            "format": STATE_FORMAT,
+            "keyword_version": KEYWORD_CLASSIFIER.version,
+            "customers": state.customers,
+            "salary_months": state.salary_months,
+            "recent_credits": state.recent_credits,
+            "applied": applied,
+        },
+        tmp_path,
+    )
+    os.replace(tmp_path, path)
+
+
+def update_state(
+    state_path: Path,
+    transactions_path: Path,
+    chunksize: int | None = None,
+    description_cache: DescriptionCache | None = None,
+    engine: str = "c",
+) -> FeatureState:
+    """
+    Fold a transactions file into the stored state and save it.
+
+    Creates the state when `state_path` does not exist yet (pass the full
+    history the first time, then one delta file per run). A file that was
+    already applied is skipped.
+    """
+    state, applied = load_state(state_path) if state_path.exists() else (None, [])
+
+    fingerprint = file_fingerprint(transactions_path)
+    if fingerprint in applied:
+        print(f"⚠️  {transactions_path} was already applied to {state_path}; skipping")
+        return state
+
+    delta = fold_transactions(transactions_path, chunksize, description_cache, engine=engine)
+    state = delta if state is None else state.merge(delta)
+    save_state(state_path, state, applied + [fingerprint])
+    return state
@@ -0,0 +1,116 @@
+"""
+Keyword families used to flag transaction descriptions.
+
+Descriptions are normalized with `clean_text` (lowercase, letters and single
+spaces only) before matching, so the keywords below are written in that form.
+Keywords match whole words; multi-word keywords match consecutive words.
+
+`KeywordClassifier` normalizes a whole column and matches every family in one
+scan, returning a per-transaction category bitmask. Adding a family adds a bit,
+not another pass over the text. Descriptions repeat heavily, so each distinct
+string is cleaned and matched once and the result is mapped back by code.
+"""
+
+import hashlib
+import json
+import re
+
+import numpy as np
+import pandas as pd
+
+
+SALARY_KEYWORDS = ["payroll", "salary", "dividend", "dwp", "payout", "bonus"]
+RISKY_KEYWORDS = ["bet", "casino", "crypto", "gambling"]
+HOUSING_KEYWORDS = ["rent", "mortgage", "housing", "council"]
+SUBSCRIPTION_KEYWORDS = ["netflix", "amazon prime", "hulu"]
+
+# Category name -> keywords; each category gets one bit, in this order
+KEYWORD_FAMILIES = {
+    "salary": SALARY_KEYWORDS,
+    "risky": RISKY_KEYWORDS,
+    "housing": HOUSING_KEYWORDS,
+    "subscription": SUBSCRIPTION_KEYWORDS,
+}
+
+# Separates descriptions once they are joined into a single string for scanning
+_ROW_SEPARATOR = "\x00"
+_NON_LETTERS = re.compile(r"[^a-z\x00]+")
+_SEPARATOR_SPACES = re.compile(r" ?\x00 ?")
+
+
+def clean_text(s: str) -> str:
+    """Clean and normalize text descriptions for keyword matching."""
+    s = s.lower()
+    s = re.sub(r"[^a-z\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def clean_joined(descriptions: pd.Series) -> str:
+    """
+    Apply `clean_text` to a whole column at once.
+
+    Returns the cleaned descriptions joined by NUL characters, which is the
+    same as joining `clean_text` of each row but costs two regex passes over
+    the column instead of two per row.
+    """
+    texts = descriptions.fillna("").astype(str).str.replace(_ROW_SEPARATOR, " ", regex=False)
+    joined = _ROW_SEPARATOR.join(texts.tolist()).lower()
+    joined = _NON_LETTERS.sub(" ", joined)
+    return _SEPARATOR_SPACES.sub(_ROW_SEPARATOR, joined).strip(" ")
+
+
+class KeywordClassifier:
+    """Match several keyword families against descriptions in a single scan."""
+
+    def __init__(self, families: dict[str, list[str]]):
+        self.bits = {name: 1 << i for i, name in enumerate(families)}
+        # Identifies the keyword lists; bitmasks computed under another version are not reusable
+        self.version = hashlib.sha256(json.dumps(families).encode()).hexdigest()[:16]
+        self.dtype = np.min_scalar_type((1 << len(families)) - 1)
+
+        # Each keyword is matched at the start of a word. Only one alternative can be
+        # captured per position, so longer keywords come first and carry the bits of
+        # every keyword that is a word prefix of them (those match at the same spot).
+        keywords = {tuple(kw.split()): 0 for words in families.values() for kw in words}
+        for name, words in families.items():
+            for kw in words:
+                keywords[tuple(kw.split())] |= self.bits[name]
+        self.keyword_bits = {}
+        for tokens in keywords:
+            bits = 0
+            for other, other_bits in keywords.items():
+                if tokens[: len(other)] == other:
+                    bits |= other_bits
+            self.keyword_bits[" ".join(tokens)] = bits
+
+        alternatives = sorted(self.keyword_bits, key=lambda kw: (-kw.count(" "), -len(kw), kw))
+        self.pattern = re.compile(r"\b(?=(" + "|".join(map(re.escape, alternatives)) + r")\b)")
+
+    def classify(self, descriptions: pd.Series) -> np.ndarray:
+        """Category bitmask for every description (0 when nothing matches)."""
+        codes, uniques = pd.factorize(descriptions)
+        return expand_codes(codes, self.classify_unique(pd.Series(uniques, dtype=object)))
+
+    def classify_unique(self, descriptions: pd.Series) -> np.ndarray:
+        """Category bitmask for each description, scanning every row (no deduplication)."""
+        masks = np.zeros(len(descriptions), dtype=self.dtype)
+        joined = clean_joined(descriptions)
+        matches = [(m.start(), self.keyword_bits[m.group(1)]) for m in self.pattern.finditer(joined)]
+        if matches:
+            positions, bits = np.array(matches, dtype=np.int64).T
+            separators = np.flatnonzero(np.frombuffer(joined.encode("ascii"), dtype=np.uint8) == 0)
+            np.bitwise_or.at(masks, np.searchsorted(separators, positions), bits.astype(self.dtype))
+        return masks
+
+    def has(self, masks: np.ndarray, category: str) -> np.ndarray:
+        """Boolean array of the rows whose bitmask includes `category`."""
+        return (masks & self.bits[category]) != 0
+
+
+def expand_codes(codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Map per-unique values back to rows by factorized code (code -1, a missing value, maps to 0)."""
+    return np.concatenate([values, np.zeros(1, dtype=values.dtype)])[codes]
+
+
+KEYWORD_CLASSIFIER = KeywordClassifier(KEYWORD_FAMILIES)
@@ -0,0 +1,280 @@
+"""
+Parse raw CSV inputs once into a typed, memory-mappable cache shared between tools.
+
+The data quality check and the feature pipeline read the same raw labels and
+transactions files, usually back to back. Each CSV is parsed once into an
+uncompressed Arrow IPC (Feather v2) file: text columns are strings, numeric
+columns float64 and timestamp columns datetime64. Later reads memory-map that
+file instead of parsing text again.
+
+The typing of a file is a profile of text, numeric and timestamp columns
+(`columns.RAW_TRANSACTION_TYPES` / `RAW_LABEL_TYPES`, which the data quality
+specs match). Unlisted columns are kept as text. Values that do not parse keep
+their raw text in a `<column>__raw` side column, and loads put that text back.
+So a cached read gives the data quality check the same invalid values a CSV
+read would. Numeric columns that were integers throughout the file come back
+as int64.
+
+Entries are keyed by the content hash of the source file plus the profile.
+index.json remembers each source's size and mtime, so an unchanged file is not
+re-hashed. A touched but identical file still hits by content. Entries no
+source points to anymore (the file changed or was removed) are evicted.
+Beyond that, the least recently used entries are dropped to stay under
+`max_bytes`. Updates to the index take a file lock, so parallel workers can
+share a cache. Parquet and Feather sources are already binary and bypass the
+cache.
+
+`engine` picks the CSV parser that fills the cache: "c" parses in chunks of
+`BUILD_CHUNKSIZE` rows, "pyarrow" parses the whole file with the multi-threaded
+Arrow reader. Both give the same typed file, so entries are shared between them.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from data_prep.table_io import file_fingerprint, iter_table, read_table, table_format
+
+# Bump when the layout of cached files changes
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 4 * 1024**3
+# Rows parsed at a time when building an entry (also the record batch size)
+BUILD_CHUNKSIZE = 500_000
+RAW_SUFFIX = "__raw"
+
+
+def _profile_key(types: dict[str, list[str]]) -> str:
+    canonical = json.dumps({kind: sorted(columns) for kind, columns in sorted(types.items())})
+    return hashlib.sha256(canonical.encode()).hexdigest()[:8]
+
+
+def _typed_chunk(chunk: pd.DataFrame, types: dict[str, list[str]]) -> pd.DataFrame:
+    """Typed columns plus the raw text of the values that failed to parse."""
+    typed = {}
+    for column in chunk.columns:
+        values = chunk[column]
+        if column in types["numeric"]:
+            parsed = values if pd.api.types.is_numeric_dtype(values) else pd.to_numeric(values, errors="coerce")
+            typed[column] = parsed.astype("float64")
+        elif column in types["timestamps"]:
+            parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+            typed[column] = parsed.astype("datetime64[ns]")
+        else:
+            # Explicitly missing: before pandas 3, astype("str") turns NaN into the text "nan"
+            typed[column] = values.astype("str").where(values.notna(), None)
+            continue
+        invalid = values.notna() & parsed.isna()
+        typed[column + RAW_SUFFIX] = values.astype("str").where(invalid, None)
+    return pd.DataFrame(typed)
+
+
+def _restore(df: pd.DataFrame, integer: list[str]) -> pd.DataFrame:
+    """Put back the raw text of unparseable values and the integer columns."""
+    for raw in [column for column in df.columns if column.endswith(RAW_SUFFIX)]:
+        column = raw[: -len(RAW_SUFFIX)]
+        if df[raw].notna().any():
+            df[column] = df[column].astype(object).where(df[raw].isna(), df[raw])
+        df = df.drop(columns=raw)
+    for column in integer:
+        if column in df.columns:
+            df[column] = df[column].astype("int64")
+    return df
+
+
+class ParseCache:
+    """Typed Arrow copies of raw CSV files in `directory`, reused across runs and tools."""
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES, engine: str = "c"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self) -> dict:
+        index_path = self.directory / "index.json"
+        index = json.loads(index_path.read_text()) if index_path.exists() else {}
+        if index.get("format") != CACHE_FORMAT:
+            index = {"format": CACHE_FORMAT, "sources": {}, "entries": {}}
+        return index
+
+    @contextmanager
+    def _locked(self):
+        # Several processes (e.g. data quality workers) may update the index at once
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / "index.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _source_record(self, source: Path) -> tuple[str, dict]:
+        key = str(source.resolve())
+        stat = source.stat()
+        known = self._load_index()["sources"].get(key)
+        if known is None or known["size"] != stat.st_size or known["mtime_ns"] != stat.st_mtime_ns:
+            known = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_fingerprint(source)}
+        return key, known
+
+    def entry(self, source: Path, types: dict[str, list[str]]) -> tuple[Path, dict]:
+        """Cached Arrow file of a CSV source (parsed now if needed) and its index record."""
+        key, known = self._source_record(source)
+        name = f"{known['sha256'][:32]}-{_profile_key(types)}.arrow"
+        path = self.directory / name
+        record = self._load_index()["entries"].get(name)
+        if record is not None and path.exists():
+            self.hits += 1
+        else:
+            self.misses += 1
+            record = self._build(source, types, path)
+        record["last_used"] = time.time()
+        # Hashing and parsing happen outside the lock; only the index update is serialized
+        with self._locked():
+            index = self._load_index()
+            index["sources"][key] = known
+            index["entries"][name] = record
+            self._evict(index, keep=name)
+            self._save_index(index)
+        return path, record
+
+    def _build(self, source: Path, types: dict[str, list[str]], path: Path) -> dict:
+        import pyarrow as pa
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        text = {column: str for column in types["text"]}
+        integer = None
+        writer = None
+        if self.engine == "c":
+            chunks = iter_table(source, BUILD_CHUNKSIZE, dtype=text)
+        else:
+            # The pyarrow parser has no chunked mode: parse the whole file, write it in batches
+            whole = read_table(source, dtype=text, engine=self.engine)
+            chunks = (whole.iloc[start : start + BUILD_CHUNKSIZE] for start in range(0, len(whole), BUILD_CHUNKSIZE))
+        try:
+            # Text columns as strings; numeric columns are inferred like a plain CSV read
+            for chunk in chunks:
+                chunk_integer = {column for column in types["numeric"] if column in chunk and pd.api.types.is_integer_dtype(chunk[column])}
+                integer = chunk_integer if integer is None else integer & chunk_integer
+                table = pa.Table.from_pandas(_typed_chunk(chunk, types), preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(tmp_path, schema)
+                writer.write_table(table.cast(schema))
+            if writer is None:
+                # Header only: an empty table with the typed columns
+                table = pa.Table.from_pandas(_typed_chunk(pd.read_csv(source, nrows=0, dtype=str), types), preserve_index=False)
+                writer = pa.ipc.new_file(tmp_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+        return {"source_sha256": path.name.split("-")[0], "bytes": path.stat().st_size, "integer": sorted(integer or ())}
+
+    def _evict(self, index: dict, keep: str) -> None:
+        sources = index["sources"]
+        for key in list(sources):
+            # Forget files that are gone or changed since they were hashed
+            try:
+                stat = Path(key).stat()
+            except FileNotFoundError:
+                stat = None
+            if stat is None or stat.st_size != sources[key]["size"] or stat.st_mtime_ns != sources[key]["mtime_ns"]:
+                del sources[key]
+        current = {known["sha256"][:32] for known in sources.values()}
+        entries = index["entries"]
+        stale = [name for name, record in entries.items() if record["source_sha256"] not in current]
+        total = sum(record["bytes"] for name, record in entries.items() if name not in stale)
+        for name in sorted(entries, key=lambda name: entries[name]["last_used"]):
+            if name != keep and name not in stale and total > self.max_bytes:
+                stale.append(name)
+                total -= entries[name]["bytes"]
+        for name in stale:
+            if name != keep:
+                del entries[name]
+                (self.directory / name).unlink(missing_ok=True)
+
+    def _save_index(self, index: dict) -> None:
+        tmp_path = self.directory / "index.json.tmp"
+        tmp_path.write_text(json.dumps(index))
+        os.replace(tmp_path, self.directory / "index.json")
+
+    def _batches(self, source: Path, types: dict[str, list[str]], columns: list[str] | None, since, until, timestamp_column: str):
+        """Record batches of the cached file, filtered and narrowed one batch at a time (memory-mapped, never whole)."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        path, record = self.entry(source, types)
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        names = reader.schema.names
+        keep = None if columns is None else [name for column in columns for name in (column, column + RAW_SUFFIX) if name in names]
+        schema = reader.schema if keep is None else pa.schema([reader.schema.field(name) for name in keep])
+        bounds = [pa.scalar(pd.Timestamp(value), pa.timestamp("ns")) if value is not None else None for value in (since, until)]
+
+        def batches():
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                # Rows whose timestamp did not parse are outside any range, like in a CSV read
+                if bounds[0] is not None:
+                    batch = batch.filter(pc.greater_equal(batch.column(timestamp_column), bounds[0]))
+                if bounds[1] is not None:
+                    batch = batch.filter(pc.less_equal(batch.column(timestamp_column), bounds[1]))
+                yield batch if keep is None else batch.select(keep)
+
+        return batches(), schema, record["integer"]
+
+    def read_table(
+        self,
+        source: Path,
+        types: dict[str, list[str]],
+        columns: list[str] | None = None,
+        since=None,
+        until=None,
+        timestamp_column: str = "txn_timestamp",
+    ) -> pd.DataFrame:
+        """Whole table like `table_io.read_table`, with the typed columns of `types`."""
+        if table_format(source) != "csv":
+            return read_table(source, columns=columns, since=since, until=until, timestamp_column=timestamp_column)
+        import pyarrow as pa
+
+        batches, schema, integer = self._batches(source, types, columns, since, until, timestamp_column)
+        return _restore(pa.Table.from_batches(list(batches), schema).to_pandas(), integer)
+
+    def iter_table(
+        self,
+        source: Path,
+        types: dict[str, list[str]],
+        chunksize: int,
+        columns: list[str] | None = None,
+        since=None,
+        until=None,
+        timestamp_column: str = "txn_timestamp",
+    ) -> Iterator[pd.DataFrame]:
+        """Chunks of at most `chunksize` rows like `table_io.iter_table`, with the typed columns of `types`."""
+        if table_format(source) != "csv":
+            yield from iter_table(source, chunksize, columns=columns, since=since, until=until, timestamp_column=timestamp_column)
+            return
+        import pyarrow as pa
+
+        batches, schema, integer = self._batches(source, types, columns, since, until, timestamp_column)
+        # Batches are regrouped into chunks of exactly `chunksize` rows; at most one chunk plus one batch is in memory
+        pending, rows = [], 0
+        for batch in batches:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunksize:
+                table = pa.Table.from_batches(pending, schema)
+                yield _restore(table.slice(0, chunksize).to_pandas(), integer)
+                rest = table.slice(chunksize)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield _restore(pa.Table.from_batches(pending, schema).to_pandas(), integer)
@@ -11,36 +11,73 @@ Feature Engineering Strategy:
 - Behavioral flags (spending patterns, financial commitments)
 """
 
+import argparse
+import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import re
 from datetime import datetime, timedelta
 
+if __package__ in (None, ""):
+    # Allow running as ``python data_prep/prepare_data.py`` from the repository root.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_prep.backfill import build_feature_snapshots, snapshot_dates
+from data_prep.keywords import KEYWORD_CLASSIFIER
+from data_prep.columns import FEATURE_COLUMNS, RAW_LABEL_TYPES, TRANSACTION_COLUMNS, WINDOW_FEATURES, with_window_columns
+from data_prep.description_cache import DescriptionCache
+from data_prep.features import CustomerSegments, CustomerTimeline, RollingWindows, amount_pence
+from data_prep.incremental import update_state
+from data_prep.parallel import build_features_parallel
+from data_prep.parse_cache import ParseCache
+from data_prep.streaming import build_features_streaming
+from data_prep.table_io import read_table, read_transactions, write_table
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = BASE_DIR / "data"
 ARTIFACTS_DIR = BASE_DIR / "artifacts"
 ARTIFACTS_DIR.mkdir(exist_ok=True)
 
 
-def clean_text(s: str) -> str:
-    """Clean and normalize text descriptions for keyword matching."""
-    s = s.lower()
-    s = re.sub(r"[^a-z\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-
-if __name__ == "__main__":
-    # Load data
-    tx = pd.read_csv(DATA_DIR / "transactions.csv", parse_dates=["txn_timestamp"])
-    labels = pd.read_csv(DATA_DIR / "labels.csv")
-
-    # Clean description text for keyword matching
-    tx["clean_desc"] = tx["description"].fillna("").apply(clean_text)
+def build_features(
+    tx: pd.DataFrame,
+    labels: pd.DataFrame,
+    description_cache: DescriptionCache | None = None,
+    *,
+    categories: np.ndarray | None = None,
+    reference_date: pd.Timestamp | None = None,
+    history_start: pd.Timestamp | None = None,
+    windows: list[int] = (),
+) -> pd.DataFrame:
+    """
+    Engineer the per-customer feature table from the full transactions frame.
+
+    When `tx` is only part of the transactions (a partition of customers), pass the
+    global `reference_date` and `history_start` (earliest timestamp) so temporal
+    features match a run over everything. `categories` are precomputed keyword
+    bitmasks for the rows of `tx`. `windows` adds the rolling-window columns for
+    those window lengths in days.
+    """
+    # Clean description text and match every keyword family in one scan (category bitmask per row).
+    # Each distinct description is classified once; the cache also skips descriptions seen in earlier runs.
+    if categories is None:
+        classifier = KEYWORD_CLASSIFIER if description_cache is None else description_cache
+        categories = classifier.classify(tx["description"])
 
     # Get reference date (most recent transaction date) for temporal calculations
-    reference_date = tx["txn_timestamp"].max()
+    if reference_date is None:
+        reference_date = tx["txn_timestamp"].max()
+    if history_start is None:
+        history_start = tx["txn_timestamp"].min()
+
+    # Group transactions by customer once. Every feature below is a vectorized reduction
+    # over these segments and is assigned on the same customer index (no per-feature merges).
+    segments = CustomerSegments(tx["customer_id"])
+    # Sums are taken in whole pence, so they are exact and match the chunked and incremental builds bit for bit
+    pence = amount_pence(tx)
+    timestamp = tx["txn_timestamp"].to_numpy()
+    is_credit = pence > 0
+    agg = pd.DataFrame(index=segments.customers)
 
     # ============================================================================
     # FEATURE 1-3: Basic Transaction Aggregations (Required Features as per task specification)
@@ -90,16 +127,12 @@ if __name__ == "__main__":
     # However, average alone doesn't tell the whole story - a customer with avg $1000 but std dev
     # of $500 (high variability) is riskier than one with avg $1000 and std dev of $50 (low variability)
 
-    agg = (
-        tx.groupby("customer_id")
-        .agg(
-            txn_count=("transaction_id", "count"),
-            total_debit=("amount", lambda x: x[x < 0].sum()),
-            total_credit=("amount", lambda x: x[x > 0].sum()),
-            avg_amount=("amount", "mean"),
-        )
-        .reset_index()
-    )
+    agg["txn_count"] = segments.count(tx["transaction_id"].notna().to_numpy())
+    has_amount = ~np.isnan(pence)
+    agg["total_debit"] = segments.sum(pence, pence < 0) / 100
+    agg["total_credit"] = segments.sum(pence, is_credit) / 100
+    with np.errstate(invalid="ignore", divide="ignore"):
+        agg["avg_amount"] = segments.sum(pence, has_amount) / 100 / segments.count(has_amount)
 
     # Calculate debit to credit ratio
     agg["debit_to_credit_ratio"] = np.where(agg["total_credit"] > 0, abs(agg["total_debit"]) / agg["total_credit"], np.nan)
@@ -114,12 +147,10 @@ if __name__ == "__main__":
     # can be used to derive binary flags (e.g., has_recent_salary) for regression models.
     # Rationale: If a customer defaults within 90 days, lack of recent income is a key indicator.
 
-    last_credit_dates = tx[tx["amount"] > 0].groupby("customer_id")["txn_timestamp"].max().reset_index().rename(columns={"txn_timestamp": "last_credit_date"})
-
-    agg = agg.merge(last_credit_dates, on="customer_id", how="left")
-    agg["days_since_last_credit"] = (reference_date - agg["last_credit_date"]).dt.days
-    agg["days_since_last_credit"] = agg["days_since_last_credit"].fillna((reference_date - tx["txn_timestamp"].min()).days + 1)  # If no credit, use max days
-    agg = agg.drop(columns=["last_credit_date"])
+    last_credit_date = pd.Series(segments.max(timestamp, is_credit), index=agg.index)
+    agg["days_since_last_credit"] = (reference_date - last_credit_date).dt.days
+    agg["days_since_last_credit"] = agg["days_since_last_credit"].fillna((reference_date - history_start).days + 1)  # If no credit, use max days
+    agg["days_since_last_credit"] = agg["days_since_last_credit"].astype("int64")  # whole days (the fill above leaves floats)
 
     # ============================================================================
     # FEATURE 5: Income Stability Ratio
@@ -134,34 +165,19 @@ if __name__ == "__main__":
 
     # Calculate total credit in last 30 days
     thirty_days_ago = reference_date - timedelta(days=30)
-    recent_credits = (
-        tx[(tx["amount"] > 0) & (tx["txn_timestamp"] >= thirty_days_ago)]
-        .groupby("customer_id")["amount"]
-        .sum()
-        .reset_index()
-        .rename(columns={"amount": "credit_last_30d"})
-    )
+    is_recent = (tx["txn_timestamp"] >= thirty_days_ago).to_numpy()
+    credit_last_30d = segments.sum(pence, is_credit & is_recent) / 100
 
     # Calculate average monthly credit (lifetime)
     # Get date range for each customer
-    customer_date_ranges = tx.groupby("customer_id")["txn_timestamp"].agg(["min", "max"]).reset_index()
-    customer_date_ranges["days_active"] = (customer_date_ranges["max"] - customer_date_ranges["min"]).dt.days + 1
-    customer_date_ranges["months_active"] = customer_date_ranges["days_active"] / 30.0
-    customer_date_ranges["months_active"] = customer_date_ranges["months_active"].clip(lower=1.0)
-
-    # Calculate average monthly credit
-    customer_date_ranges = customer_date_ranges.merge(agg[["customer_id", "total_credit"]], on="customer_id")
-    customer_date_ranges["avg_monthly_credit"] = customer_date_ranges["total_credit"] / customer_date_ranges["months_active"]
-
-    # Merge and calculate income stability ratio
-    agg = agg.merge(recent_credits[["customer_id", "credit_last_30d"]], on="customer_id", how="left")
-    agg = agg.merge(
-        customer_date_ranges[["customer_id", "avg_monthly_credit"]],
-        on="customer_id",
-        how="left",
-    )
-    agg["credit_last_30d"] = agg["credit_last_30d"].fillna(0)
-    agg["income_stability_ratio"] = np.where(agg["avg_monthly_credit"] > 0, agg["credit_last_30d"] / agg["avg_monthly_credit"], np.nan)
+    first_date = pd.Series(segments.min(timestamp), index=agg.index)
+    last_date = pd.Series(segments.max(timestamp), index=agg.index)
+    days_active = (last_date - first_date).dt.days + 1
+    months_active = (days_active / 30.0).clip(lower=1.0)
+    avg_monthly_credit = agg["total_credit"] / months_active
+
+    # Calculate income stability ratio
+    agg["income_stability_ratio"] = np.where(avg_monthly_credit > 0, credit_last_30d / avg_monthly_credit, np.nan)
 
     # ============================================================================
     # FEATURE 6: Flag Consistent Salary
@@ -174,30 +190,17 @@ if __name__ == "__main__":
     # which significantly reduces default risk. Irregular income patterns are associated
     # with higher default rates.
 
-    salary_keywords = ["payroll", "salary", "dividend", "dwp", "payout", "bonus"]
-    salary_pattern = "|".join([rf"\b{kw}\b" for kw in salary_keywords])
-
     # Identify salary transactions - only in credit transactions (amount > 0)
-    tx_credits = tx[tx["amount"] > 0].copy()
-    tx_credits["is_salary"] = tx_credits["clean_desc"].str.contains(salary_pattern, case=False, na=False).astype(int)
-
-    # Group by customer and month (only credit transactions)
-    tx_credits["year_month"] = tx_credits["txn_timestamp"].dt.to_period("M")
-    monthly_salary = tx_credits.groupby(["customer_id", "year_month"]).agg(has_salary=("is_salary", "max")).reset_index()
+    is_salary = KEYWORD_CLASSIFIER.has(categories, "salary")
 
-    # Calculate salary consistency
-    salary_consistency = (
-        monthly_salary.groupby("customer_id").agg(months_with_transactions=("year_month", "count"), months_with_salary=("has_salary", "sum")).reset_index()
-    )
-    salary_consistency["salary_consistency_ratio"] = salary_consistency["months_with_salary"] / salary_consistency["months_with_transactions"]
-    salary_consistency["flag_consistent_salary"] = (salary_consistency["salary_consistency_ratio"] >= 0.9).astype(int)
+    # Count distinct (customer, month) pairs among credit transactions
+    year_month = (tx["txn_timestamp"].dt.year * 12 + tx["txn_timestamp"].dt.month).to_numpy()
+    months_with_transactions, months_with_salary = segments.monthly_counts(year_month, is_salary, is_credit)
 
-    agg = agg.merge(
-        salary_consistency[["customer_id", "flag_consistent_salary"]],
-        on="customer_id",
-        how="left",
-    )
-    agg["flag_consistent_salary"] = agg["flag_consistent_salary"].fillna(0).astype(int)
+    # Calculate salary consistency (customers without credits are not consistent)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        salary_consistency_ratio = months_with_salary / months_with_transactions
+    agg["flag_consistent_salary"] = (salary_consistency_ratio >= 0.9).astype(int)
 
     # ============================================================================
     # FEATURE 7: Flag Risky Spend
@@ -208,20 +211,8 @@ if __name__ == "__main__":
     # and poor financial decision-making, leading to higher default rates. Customers who
     # gamble or invest heavily in volatile assets may have cash flow problems.
 
-    risky_keywords = ["bet", "casino", "crypto", "gambling"]
-    risky_pattern = "|".join([rf"\b{kw}\b" for kw in risky_keywords])
-
-    risky_transactions = (
-        tx[tx["clean_desc"].str.contains(risky_pattern, case=False, na=False)]
-        .groupby("customer_id")["transaction_id"]
-        .count()
-        .reset_index()
-        .rename(columns={"transaction_id": "risky_txn_count"})
-    )
-
-    agg = agg.merge(risky_transactions, on="customer_id", how="left")
-    agg["flag_risky_spend"] = (agg["risky_txn_count"] > 0).astype(int)
-    agg = agg.drop(columns=["risky_txn_count"])
+    risky_txn_count = segments.count(KEYWORD_CLASSIFIER.has(categories, "risky"))
+    agg["flag_risky_spend"] = (risky_txn_count > 0).astype(int)
 
     # ============================================================================
     # FEATURE 8: Flag Rent/Mortgage
@@ -232,20 +223,8 @@ if __name__ == "__main__":
     # this indicates responsibility, it also means less disposable income. Combined with
     # low income stability, housing payments can strain finances and increase default risk.
 
-    housing_keywords = ["rent", "mortgage", "housing", "council"]
-    housing_pattern = "|".join([rf"\b{kw}\b" for kw in housing_keywords])
-
-    housing_transactions = (
-        tx[tx["clean_desc"].str.contains(housing_pattern, case=False, na=False)]
-        .groupby("customer_id")["transaction_id"]
-        .count()
-        .reset_index()
-        .rename(columns={"transaction_id": "housing_txn_count"})
-    )
-
-    agg = agg.merge(housing_transactions, on="customer_id", how="left")
-    agg["flag_rent_mortgage"] = (agg["housing_txn_count"] > 0).astype(int)
-    agg = agg.drop(columns=["housing_txn_count"])
+    housing_txn_count = segments.count(KEYWORD_CLASSIFIER.has(categories, "housing"))
+    agg["flag_rent_mortgage"] = (housing_txn_count > 0).astype(int)
 
     # ============================================================================
     # FEATURE 9: Flag Subscription
@@ -256,50 +235,164 @@ if __name__ == "__main__":
     # small amounts, multiple subscriptions can add up. Customers with subscriptions but
     # declining income may struggle to maintain these commitments, indicating financial stress.
 
-    subscription_keywords = ["netflix", "amazon prime", "hulu"]
-    subscription_pattern = "|".join([rf"\b{kw.replace(' ', r'\s+')}\b" for kw in subscription_keywords])
+    subscription_txn_count = segments.count(KEYWORD_CLASSIFIER.has(categories, "subscription"))
+    agg["flag_subscription"] = (subscription_txn_count > 0).astype(int)
 
-    subscription_transactions = (
-        tx[tx["clean_desc"].str.contains(subscription_pattern, case=False, na=False)]
-        .groupby("customer_id")["transaction_id"]
-        .count()
-        .reset_index()
-        .rename(columns={"transaction_id": "subscription_txn_count"})
-    )
+    # ============================================================================
+    # ROLLING WINDOWS (optional): credit sum, debit sum, count, salary presence
+    # ============================================================================
+
+    # Why: Generalizes credit_last_30d to short and long horizons (e.g. 7/30/60/90 days), so
+    # the model can see income and spending trends rather than one fixed 30-day slice.
+    # Each customer's transactions are sorted by time once; every window is a difference of
+    # running totals at two binary-searched positions, so extra windows cost almost nothing.
 
-    agg = agg.merge(subscription_transactions, on="customer_id", how="left")
-    agg["flag_subscription"] = (agg["subscription_txn_count"] > 0).astype(int)
-    agg = agg.drop(columns=["subscription_txn_count"])
+    if windows:
+        timeline = CustomerTimeline(segments, timestamp)
+        rolling = RollingWindows(timeline, tx, is_salary)
+        agg = agg.join(pd.DataFrame(rolling.features(reference_date, timeline.position(reference_date), windows), index=agg.index))
 
     # ============================================================================
-    # Merge with Labels and Save
+    # Merge with Labels
     # ============================================================================
 
     # Merge with labels
-    df = agg.merge(labels, on="customer_id", how="left")
+    df = agg.reset_index().merge(labels, on="customer_id", how="left")
 
     # Select final feature columns (remove intermediate calculation columns)
-    feature_columns = [
-        "customer_id",
-        "txn_count",
-        "total_debit",
-        "total_credit",
-        "avg_amount",
-        "debit_to_credit_ratio",
-        "days_since_last_credit",
-        "income_stability_ratio",
-        "flag_consistent_salary",
-        "flag_risky_spend",
-        "flag_rent_mortgage",
-        "flag_subscription",
-        "defaulted_within_90d",
-    ]
-
-    df = df[feature_columns]
-
-    # Save to CSV
-    df.to_csv(ARTIFACTS_DIR / "training_set.csv", index=False)
-    print(f"✅ Successfully wrote {ARTIFACTS_DIR / 'training_set.csv'}")
+    return df[with_window_columns(FEATURE_COLUMNS, windows)]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the credit risk training set from raw transactions.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Directory containing transactions.csv and labels.csv")
+    parser.add_argument(
+        "--transactions",
+        type=Path,
+        default=None,
+        help="Transactions file to read: .csv, .parquet or .feather/.arrow (default: <data-dir>/transactions.csv)",
+    )
+    parser.add_argument("--labels", type=Path, default=None, help="Labels file to read (default: <data-dir>/labels.csv)")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=ARTIFACTS_DIR / "training_set.csv",
+        help="Training set to write; .parquet and .feather outputs use compact dtypes",
+    )
+    parser.add_argument("--since", default=None, help="Only use transactions at or after this timestamp")
+    parser.add_argument("--until", default=None, help="Only use transactions at or before this timestamp")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream transactions in chunks of this many rows instead of loading the whole file (bounded memory)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Partition customers by hash and build features in this many processes (in-memory mode only)",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=["c", "pyarrow"],
+        default="c",
+        help="Parser for CSV transactions read in one piece or into the parse cache; pyarrow is multi-threaded (uncached chunked reads always use c)",
+    )
+    parser.add_argument(
+        "--description-cache",
+        type=Path,
+        default=ARTIFACTS_DIR / "description_categories.joblib",
+        help="Persistent description -> keyword category table reused between runs",
+    )
+    parser.add_argument("--no-description-cache", action="store_true", help="Classify every description from scratch")
+    parser.add_argument(
+        "--parse-cache",
+        type=Path,
+        default=ARTIFACTS_DIR / "parse_cache",
+        help="Typed Arrow copies of the raw CSVs, shared with Data_Quality_Check.py; repeat reads skip CSV parsing",
+    )
+    parser.add_argument("--no-parse-cache", action="store_true", help="Parse the raw CSVs directly")
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=None,
+        help="Incremental mode: fold --transactions into this persisted per-customer state (created on first run) and emit features from it",
+    )
+    parser.add_argument(
+        "--as-of",
+        nargs="+",
+        default=None,
+        help="Backfill mode: emit one feature row per customer and snapshot date, using only transactions up to and including that date (a date without a time covers the whole day)",
+    )
+    parser.add_argument(
+        "--as-of-freq",
+        default=None,
+        help="With --as-of: take a snapshot every FREQ (pandas offset, e.g. W or 7D) from the first to the last --as-of date",
+    )
+    parser.add_argument(
+        "--windows",
+        nargs="+",
+        type=int,
+        default=[],
+        help="Add rolling-window columns (credit sum, debit sum, count, salary presence) for these window lengths in days, e.g. 7 30 60 90",
+    )
+    args = parser.parse_args(argv)
+    if args.workers > 1 and (args.chunksize or args.state):
+        parser.error("--workers applies to the in-memory mode only (not with --chunksize or --state)")
+    if args.as_of and (args.chunksize or args.state or args.workers > 1):
+        parser.error("--as-of applies to the in-memory single-process mode only")
+    if args.windows and (args.chunksize or args.state):
+        parser.error("--windows applies to the in-memory modes only (not with --chunksize or --state)")
+    if args.as_of_freq and not args.as_of:
+        parser.error("--as-of-freq requires --as-of")
+    if args.state and (args.since or args.until):
+        parser.error("--since/--until cannot be combined with --state (each applied file is folded in whole)")
+    return args
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    # Load data
+    parse_cache = None if args.no_parse_cache else ParseCache(args.parse_cache, engine=args.csv_engine)
+    labels_path = args.labels or args.data_dir / "labels.csv"
+    labels = read_table(labels_path) if parse_cache is None else parse_cache.read_table(labels_path, RAW_LABEL_TYPES)
+    transactions_path = args.transactions or args.data_dir / "transactions.csv"
+    time_range = {"since": args.since, "until": args.until}
+    description_cache = None if args.no_description_cache else DescriptionCache(args.description_cache)
+    if args.state:
+        df = update_state(
+            args.state, transactions_path, chunksize=args.chunksize, description_cache=description_cache, engine=args.csv_engine
+        ).finalize(labels)
+    elif args.chunksize:
+        df = build_features_streaming(
+            transactions_path, labels, chunksize=args.chunksize, description_cache=description_cache, parse_cache=parse_cache, **time_range
+        )
+    else:
+        tx = read_transactions(transactions_path, columns=TRANSACTION_COLUMNS, engine=args.csv_engine, parse_cache=parse_cache, **time_range)
+        if args.as_of:
+            df = build_feature_snapshots(tx, labels, snapshot_dates(args.as_of, args.as_of_freq), description_cache=description_cache, windows=args.windows)
+        elif args.workers > 1:
+            df = build_features_parallel(tx, labels, workers=args.workers, description_cache=description_cache, windows=args.windows)
+        else:
+            df = build_features(tx, labels, description_cache=description_cache, windows=args.windows)
+
+    # Save the training set (CSV, Parquet or Feather by extension)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    write_table(df, args.output)
+    print(f"✅ Successfully wrote {args.output}")
     print(f"   Shape: {df.shape}")
-    print(f"   Features: {len(feature_columns) - 2} (excluding customer_id and target)")
+    print(f"   Features: {len(FEATURE_COLUMNS) - 2 + len(args.windows) * len(WINDOW_FEATURES)} (excluding customer_id and target)")
     print(f"   Target variable: defaulted_within_90d")
+
+    if description_cache is not None:
+        new_descriptions = description_cache.new_descriptions
+        description_cache.save()
+        print(f"   Description cache: {len(description_cache)} known, {new_descriptions} newly classified, {description_cache.pruned} pruned")
+    if parse_cache is not None:
+        print(f"   Parse cache: {parse_cache.hits} hit(s), {parse_cache.misses} file(s) parsed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Chunked streaming computation of the training set features.
+
+The transactions file is read in bounded chunks. Each chunk is reduced to a
+per-customer partial `FeatureState` and folded into the running state, so peak
+memory depends on the number of customers rather than the number of
+transactions. `FeatureState.finalize` emits the same columns as
+`prepare_data.build_features`. Amounts are summed in whole pence, which add up
+exactly, so the output does not depend on the chunk size and matches the
+in-memory build bit for bit.
+"""
+
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_prep.columns import FEATURE_COLUMNS, TRANSACTION_COLUMNS
+from data_prep.description_cache import DescriptionCache
+from data_prep.features import CustomerSegments, amount_pence
+from data_prep.keywords import KEYWORD_CLASSIFIER
+from data_prep.table_io import iter_transactions, read_transactions
+
+# Window used for credit_last_30d (income stability ratio)
+RECENT_CREDIT_WINDOW = timedelta(days=30)
+
+# How each per-customer column combines when two partial states are merged
+CUSTOMER_AGGREGATIONS = {
+    "txn_count": "sum",
+    "debit_pence": "sum",
+    "credit_pence": "sum",
+    "amount_pence": "sum",
+    "amount_count": "sum",
+    "first_ts": "min",
+    "last_ts": "max",
+    "last_credit_ts": "max",
+    "risky_hits": "sum",
+    "housing_hits": "sum",
+    "subscription_hits": "sum",
+}
+
+
+def _merge_touched(current, new, key: str, aggregation):
+    """
+    Merge `new` rows into `current`, regrouping only the rows of `current` that share
+    a `key` value with `new`. A small delta therefore costs far less than regrouping
+    the whole state.
+    """
+    touched = current.index.get_level_values(key).isin(new.index.unique(key))
+    merged = pd.concat([current[touched], new]).groupby(level=list(range(current.index.nlevels))).agg(aggregation)
+    return pd.concat([current[~touched], merged])
+
+
+class FeatureState:
+    """
+    Mergeable per-customer partial aggregates.
+
+    - customers: one row per customer_id with the columns in CUSTOMER_AGGREGATIONS
+    - salary_months: has_salary per (customer_id, year_month) for months with credits
+    - recent_credits: credit pence per (customer_id, txn_timestamp), limited to
+      timestamps that can still fall inside the 30-day window before the reference date
+    """
+
+    def __init__(self, customers: pd.DataFrame, salary_months: pd.Series, recent_credits: pd.Series):
+        self.customers = customers
+        self.salary_months = salary_months
+        self.recent_credits = recent_credits
+
+    @property
+    def reference_date(self) -> pd.Timestamp:
+        """Most recent transaction timestamp seen so far."""
+        return self.customers["last_ts"].max()
+
+    @classmethod
+    def from_frame(cls, tx: pd.DataFrame, description_cache: DescriptionCache | None = None) -> "FeatureState":
+        """Reduce a frame of transactions to a partial state."""
+        segments = CustomerSegments(tx["customer_id"])
+        pence = amount_pence(tx)
+        timestamp = tx["txn_timestamp"].to_numpy()
+        classifier = KEYWORD_CLASSIFIER if description_cache is None else description_cache
+        categories = classifier.classify(tx["description"])
+        is_credit = pence > 0
+        has_amount = ~np.isnan(pence)
+
+        customers = pd.DataFrame(
+            {
+                "txn_count": segments.count(tx["transaction_id"].notna().to_numpy()),
+                "debit_pence": segments.sum(pence, pence < 0),
+                "credit_pence": segments.sum(pence, is_credit),
+                "amount_pence": segments.sum(pence, has_amount),
+                "amount_count": segments.count(has_amount),
+                "first_ts": segments.min(timestamp),
+                "last_ts": segments.max(timestamp),
+                "last_credit_ts": segments.max(timestamp, is_credit),
+                "risky_hits": segments.count(KEYWORD_CLASSIFIER.has(categories, "risky")),
+                "housing_hits": segments.count(KEYWORD_CLASSIFIER.has(categories, "housing")),
+                "subscription_hits": segments.count(KEYWORD_CLASSIFIER.has(categories, "subscription")),
+            },
+            index=segments.customers,
+        )
+
+        # Plain customer_id labels so partial states from chunks with different categories line up
+        customer_id = tx["customer_id"]
+        if isinstance(customer_id.dtype, pd.CategoricalDtype):
+            customer_id = customer_id.astype(customer_id.cat.categories.dtype)
+        credits = pd.DataFrame({"customer_id": customer_id, "txn_timestamp": tx["txn_timestamp"], "pence": pence})[is_credit]
+        is_salary = pd.Series(KEYWORD_CLASSIFIER.has(categories, "salary"), index=tx.index)[is_credit].astype(int)
+        salary_months = (
+            is_salary.groupby([credits["customer_id"], credits["txn_timestamp"].dt.to_period("M")])
+            .max()
+            .rename_axis(["customer_id", "year_month"])
+        )
+
+        recent = credits[credits["txn_timestamp"] >= tx["txn_timestamp"].max() - RECENT_CREDIT_WINDOW]
+        recent_credits = recent["pence"].groupby([recent["customer_id"], recent["txn_timestamp"]]).sum()
+
+        return cls(customers, salary_months, recent_credits)
+
+    def merge(self, other: "FeatureState") -> "FeatureState":
+        """Combine two partial states covering disjoint sets of transactions."""
+        customers = _merge_touched(self.customers, other.customers, "customer_id", CUSTOMER_AGGREGATIONS)
+        salary_months = _merge_touched(self.salary_months, other.salary_months, "year_month", "max")
+        recent_credits = pd.concat([self.recent_credits, other.recent_credits]).groupby(level=[0, 1]).sum()
+
+        # Credits older than the window before the latest timestamp can never count again
+        cutoff = customers["last_ts"].max() - RECENT_CREDIT_WINDOW
+        recent_credits = recent_credits[recent_credits.index.get_level_values("txn_timestamp") >= cutoff]
+
+        return FeatureState(customers, salary_months, recent_credits)
+
+    def finalize(self, labels: pd.DataFrame) -> pd.DataFrame:
+        """Turn the accumulated state into the training set feature table."""
+        c = self.customers.sort_index()
+        reference_date = self.reference_date
+        agg = pd.DataFrame(index=c.index)
+
+        # Features 1-3
+        agg["txn_count"] = c["txn_count"]
+        agg["total_debit"] = c["debit_pence"] / 100
+        agg["total_credit"] = c["credit_pence"] / 100
+        agg["avg_amount"] = c["amount_pence"] / 100 / c["amount_count"]
+        agg["debit_to_credit_ratio"] = np.where(agg["total_credit"] > 0, abs(agg["total_debit"]) / agg["total_credit"], np.nan)
+
+        # Feature 4: days since last credit (max days if no credit)
+        agg["days_since_last_credit"] = (reference_date - c["last_credit_ts"]).dt.days
+        agg["days_since_last_credit"] = agg["days_since_last_credit"].fillna((reference_date - c["first_ts"].min()).days + 1)
+        agg["days_since_last_credit"] = agg["days_since_last_credit"].astype("int64")
+
+        # Feature 5: income stability ratio
+        thirty_days_ago = reference_date - RECENT_CREDIT_WINDOW
+        recent = self.recent_credits[self.recent_credits.index.get_level_values("txn_timestamp") >= thirty_days_ago]
+        credit_last_30d = recent.groupby(level="customer_id").sum().reindex(c.index).fillna(0) / 100
+        months_active = (((c["last_ts"] - c["first_ts"]).dt.days + 1) / 30.0).clip(lower=1.0)
+        avg_monthly_credit = agg["total_credit"] / months_active
+        agg["income_stability_ratio"] = np.where(avg_monthly_credit > 0, credit_last_30d / avg_monthly_credit, np.nan)
+
+        # Feature 6: salary in at least 90% of months with credits
+        months = self.salary_months.groupby(level="customer_id")
+        salary_consistency_ratio = months.sum() / months.count()
+        agg["flag_consistent_salary"] = (salary_consistency_ratio >= 0.9).astype(int).reindex(c.index).fillna(0).astype(int)
+
+        # Features 7-9: keyword flags
+        agg["flag_risky_spend"] = (c["risky_hits"] > 0).astype(int)
+        agg["flag_rent_mortgage"] = (c["housing_hits"] > 0).astype(int)
+        agg["flag_subscription"] = (c["subscription_hits"] > 0).astype(int)
+
+        df = agg.reset_index().merge(labels, on="customer_id", how="left")
+        return df[FEATURE_COLUMNS]
+
+
+def fold_transactions(
+    path: Path,
+    chunksize: int | None,
+    description_cache: DescriptionCache | None = None,
+    since=None,
+    until=None,
+    engine: str = "c",
+    parse_cache=None,
+) -> FeatureState:
+    """
+    Reduce a transactions file (CSV, Parquet or Feather) to a `FeatureState`, reading
+    `chunksize` rows at a time (whole file with the given CSV `engine` if None).
+    `since`/`until` bound the timestamps used.
+    """
+    read_args = {"columns": TRANSACTION_COLUMNS, "since": since, "until": until, "parse_cache": parse_cache}
+    chunks = [read_transactions(path, engine=engine, **read_args)] if chunksize is None else iter_transactions(path, chunksize, **read_args)
+    state = None
+    for chunk in chunks:
+        part = FeatureState.from_frame(chunk, description_cache)
+        state = part if state is None else state.merge(part)
+    if state is None or state.customers.empty:
+        raise ValueError(f"No transactions found in {path}")
+    return state
+
+
+def build_features_streaming(
+    path: Path,
+    labels: pd.DataFrame,
+    chunksize: int,
+    description_cache: DescriptionCache | None = None,
+    since=None,
+    until=None,
+    parse_cache=None,
+) -> pd.DataFrame:
+    """Build the feature table by folding the transactions file chunk by chunk."""
+    return fold_transactions(path, chunksize, description_cache, since=since, until=until, parse_cache=parse_cache).finalize(labels)
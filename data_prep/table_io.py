@@ -0,0 +1,218 @@
+"""
+Reading and writing pipeline tables as CSV, Parquet or Arrow IPC/Feather.
+
+The format is picked from the file extension. Columnar reads load only the
+requested columns, and Parquet reads push timestamp bounds down so row groups
+outside the range are skipped. Feature tables written to columnar formats use
+the compact dtypes in `columns.FEATURE_DTYPES` instead of CSV's int64/float text.
+
+Transactions are loaded with a compact profile (`read_transactions`): ID and
+text columns as categories or Arrow strings, amounts as integer pence and
+timestamps parsed with a fixed ISO 8601 format. With a `parse_cache`
+(data_prep/parse_cache.py), raw CSVs are parsed once and later reads load the
+typed cache instead.
+"""
+
+import glob
+import hashlib
+import re
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from data_prep.columns import FEATURE_DTYPES, RAW_TRANSACTION_TYPES, TRANSACTION_DTYPES, WINDOW_DTYPES
+
+CSV_SUFFIXES = {".csv"}
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".feather", ".arrow", ".ipc"}
+
+
+def table_format(path: Path) -> str:
+    """'csv', 'parquet' or 'arrow' according to the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        return "csv"
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in ARROW_SUFFIXES:
+        return "arrow"
+    raise ValueError(f"Unsupported table format for {path} (expected .csv, .parquet or .feather/.arrow)")
+
+
+def file_fingerprint(path: Path) -> str:
+    """Content hash identifying a file (SHA-256 of its bytes)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def table_partitions(location) -> list[Path]:
+    """Files of a table given as one file, a directory of partition files or a glob pattern (sorted by path)."""
+    path = Path(location)
+    if path.is_dir():
+        files = [file for file in path.iterdir() if file.is_file() and file.suffix.lower() in CSV_SUFFIXES | PARQUET_SUFFIXES | ARROW_SUFFIXES]
+    elif any(char in str(location) for char in "*?["):
+        files = [Path(file) for file in glob.glob(str(location), recursive=True) if Path(file).is_file()]
+    else:
+        return [path]
+    if not files:
+        raise FileNotFoundError(f"No table files found at {location}")
+    return sorted(files)
+
+
+def _timestamp_filter(since, until, column: str) -> list[tuple] | None:
+    filters = []
+    if since is not None:
+        filters.append((column, ">=", pd.Timestamp(since)))
+    if until is not None:
+        filters.append((column, "<=", pd.Timestamp(until)))
+    return filters or None
+
+
+def _filter_rows(df: pd.DataFrame, since, until, column: str) -> pd.DataFrame:
+    if since is not None:
+        df = df[df[column] >= pd.Timestamp(since)]
+    if until is not None:
+        df = df[df[column] <= pd.Timestamp(until)]
+    return df
+
+
+def read_table(
+    path: Path,
+    columns: list[str] | None = None,
+    parse_dates: list[str] | None = None,
+    since=None,
+    until=None,
+    timestamp_column: str = "txn_timestamp",
+    dtype: dict | None = None,
+    engine: str = "c",
+) -> pd.DataFrame:
+    """
+    Load a table, keeping only `columns` (all when None).
+
+    `since`/`until` keep rows whose `timestamp_column` lies in the inclusive range;
+    Parquet skips whole row groups using their statistics. `dtype` and `engine`
+    ("c" or "pyarrow") only apply to CSV, whose dates are parsed as ISO 8601.
+    """
+    fmt = table_format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns, filters=_timestamp_filter(since, until, timestamp_column))
+    if fmt == "arrow":
+        df = pd.read_feather(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns, parse_dates=parse_dates, date_format="ISO8601", dtype=dtype, engine=engine)
+    return _filter_rows(df, since, until, timestamp_column)
+
+
+def iter_table(
+    path: Path,
+    chunksize: int,
+    columns: list[str] | None = None,
+    parse_dates: list[str] | None = None,
+    since=None,
+    until=None,
+    timestamp_column: str = "txn_timestamp",
+    dtype: dict | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield the table in chunks of at most `chunksize` rows (columnar formats read batch by batch)."""
+    fmt = table_format(path)
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, usecols=columns, parse_dates=parse_dates, date_format="ISO8601", dtype=dtype, chunksize=chunksize):
+            yield _filter_rows(chunk, since, until, timestamp_column)
+        return
+
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet" if fmt == "parquet" else "ipc")
+    expression = None
+    for column, op, value in _timestamp_filter(since, until, timestamp_column) or []:
+        condition = ds.field(column) >= value if op == ">=" else ds.field(column) <= value
+        expression = condition if expression is None else expression & condition
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def to_pence(amount: pd.Series) -> pd.Series | None:
+    """
+    Amounts as integer pence (int32 when the range allows, nullable when values are missing).
+
+    Returns None when some amounts have fractions of a penny, so they can stay floats.
+    Dividing the result by 100 gives back exactly the float parsed from a two-decimal value.
+    """
+    values = amount.to_numpy(dtype=np.float64, na_value=np.nan)
+    pence = np.round(values * 100)
+    present = ~np.isnan(values)
+    if not np.allclose(pence[present], values[present] * 100, rtol=0, atol=1e-6):
+        return None
+    dtype = "int32" if not present.any() or np.abs(pence[present]).max() < 2**31 else "int64"
+    if not present.all():
+        dtype = dtype.capitalize()
+    return pd.Series(pence, index=amount.index).astype(dtype)
+
+
+def compact_transactions(tx: pd.DataFrame) -> pd.DataFrame:
+    """Apply the compact transaction profile to the columns present in `tx` (in place)."""
+    for column, dtype in TRANSACTION_DTYPES.items():
+        if column in tx.columns and tx[column].dtype != dtype:
+            tx[column] = tx[column].astype(dtype)
+    for column in tx.columns:
+        # Sorted categories keep customer order identical to sorting the raw strings
+        if isinstance(tx[column].dtype, pd.CategoricalDtype) and not tx[column].cat.categories.is_monotonic_increasing:
+            tx[column] = tx[column].cat.reorder_categories(tx[column].cat.categories.sort_values())
+    if "txn_timestamp" in tx.columns and not pd.api.types.is_datetime64_any_dtype(tx["txn_timestamp"]):
+        tx["txn_timestamp"] = pd.to_datetime(tx["txn_timestamp"], format="ISO8601")
+    if "amount" in tx.columns:
+        pence = to_pence(tx["amount"])
+        if pence is not None:
+            tx["amount_pence"] = pence
+            tx = tx.drop(columns=["amount"])
+    return tx
+
+
+def read_transactions(
+    path: Path, columns: list[str] | None = None, since=None, until=None, engine: str = "c", parse_cache=None
+) -> pd.DataFrame:
+    """Load transactions with the compact dtype profile (optionally with the pyarrow CSV engine or from a `ParseCache`)."""
+    if parse_cache is not None:
+        df = parse_cache.read_table(path, RAW_TRANSACTION_TYPES, columns=columns, since=since, until=until)
+    else:
+        df = read_table(path, columns=columns, parse_dates=["txn_timestamp"], since=since, until=until, dtype=TRANSACTION_DTYPES, engine=engine)
+    return compact_transactions(df)
+
+
+def iter_transactions(
+    path: Path, chunksize: int, columns: list[str] | None = None, since=None, until=None, parse_cache=None
+) -> Iterator[pd.DataFrame]:
+    """Yield transactions in chunks with the compact dtype profile."""
+    if parse_cache is not None:
+        chunks = parse_cache.iter_table(path, RAW_TRANSACTION_TYPES, chunksize, columns=columns, since=since, until=until)
+    else:
+        chunks = iter_table(path, chunksize, columns=columns, parse_dates=["txn_timestamp"], since=since, until=until, dtype=TRANSACTION_DTYPES)
+    for chunk in chunks:
+        yield compact_transactions(chunk)
+
+
+def compact_feature_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast feature table columns (including rolling-window columns) to their compact storage dtypes."""
+    dtypes = {column: dtype for column, dtype in FEATURE_DTYPES.items() if column in df.columns}
+    for column in df.columns:
+        window = re.fullmatch(r"(\w+)_\d+d", column)
+        if window and window.group(1) in WINDOW_DTYPES:
+            dtypes[column] = WINDOW_DTYPES[window.group(1)]
+    return df.astype(dtypes)
+
+
+def write_table(df: pd.DataFrame, path: Path) -> None:
+    """Write a table in the format given by the extension of `path`."""
+    fmt = table_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        compact_feature_dtypes(df).to_parquet(path, index=False)
+    else:
+        compact_feature_dtypes(df).reset_index(drop=True).to_feather(path)
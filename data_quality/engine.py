@@ -0,0 +1,646 @@
+"""
+Streaming data quality checks: one read of each file and bounded state per rule.
+
+Each chunk is parsed once, and every rule of the file's `TableSpec` runs on it
+as a vectorized mask. For each rule the engine keeps the number of offending
+rows and the first `sample_size` of them. Checks that span chunks are
+tracked as the chunks go by: duplicate keys, duplicate rows, and customer IDs
+present in one file but not the other. They use 64-bit hash indexes
+(`id_index.HashIndex`) that spill to disk. The transaction ID index can be
+persisted, so a daily file is checked for duplicates against all of history.
+Transactions split into partition files are checked in a process pool. Each
+partition's counts, samples, sketches and distinct hashes merge into one
+result, and checks across partitions are resolved in the merge.
+The transactions are also profiled with mergeable sketches (`profile`), which
+give data-derived amount outlier thresholds and day-to-day comparisons.
+`build_report` turns the results into a JSON-serializable report.
+"""
+
+import json
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_prep.parse_cache import ParseCache
+from data_prep.table_io import file_fingerprint, iter_table, table_format, table_partitions
+from data_quality.id_index import HashCounts, HashIndex, hash_ids, hash_rows
+from data_quality.profile import TransactionProfile, compare_profiles
+from data_quality.rules import FUTURE_MARGIN_DAYS, TableSpec, label_spec, transaction_spec
+
+DEFAULT_CHUNKSIZE = 500_000
+SAMPLE_SIZE = 5
+
+
+def records(df: pd.DataFrame) -> list[dict]:
+    """JSON-safe row dicts (timestamps as ISO 8601, missing values as null)."""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def sample_view(chunk: pd.DataFrame, parsed: pd.DataFrame, invalid: dict[str, pd.Series]) -> pd.DataFrame:
+    """
+    Rows as shown in samples: the parsed values, and the raw text of values that did not parse.
+
+    The CSV reader gives a column as text in chunks with an unparseable value and as numbers
+    in the others, so samples built from the raw chunk would depend on the chunk size.
+    """
+    view = parsed.copy(deep=False)
+    for column, mask in invalid.items():
+        if mask.any():
+            view[column] = parsed[column].astype(object).where(~mask, chunk[column])
+    return view
+
+
+class Tally:
+    """Count of offending rows plus the first `sample_size` of them."""
+
+    def __init__(self, sample_size: int):
+        self.sample_size = sample_size
+        self.count = 0
+        self.sample: list[dict] = []
+
+    @property
+    def room(self) -> int:
+        return self.sample_size - len(self.sample)
+
+    def add(self, mask: np.ndarray, rows: pd.DataFrame) -> None:
+        hits = int(mask.sum())
+        if not hits:
+            return
+        self.count += hits
+        if self.room > 0:
+            self.sample.extend(records(rows[mask].head(self.room)))
+
+    def merge(self, other: "Tally") -> None:
+        """Add the tally of a later part of the file."""
+        self.count += other.count
+        self.sample.extend(other.sample[: max(self.room, 0)])
+
+
+class TableCheck:
+    """Results of one file's checks, updated chunk by chunk."""
+
+    def __init__(self, spec: TableSpec, sample_size: int = SAMPLE_SIZE, key_index: HashIndex | None = None):
+        self.spec = spec
+        self.sample_size = sample_size
+        self.rows = 0
+        self.missing_columns: list[str] | None = None
+        self.nulls = Counter()
+        self.invalid = {column: Tally(sample_size) for column in spec.numeric + spec.timestamps}
+        self.rules = {rule.name: Tally(sample_size) for rule in spec.rules}
+        self.skipped: dict[str, str] = {}
+        self.duplicate_rows = Tally(sample_size)
+        self.duplicate_keys = Tally(sample_size)
+        self.row_index = HashIndex()
+        # Distinct non-null keys seen so far (possibly preloaded with history)
+        self.key_index = key_index if key_index is not None else HashIndex()
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Run every check on one chunk; returns the chunk with its typed columns parsed."""
+        if self.missing_columns is None:
+            self.missing_columns = [column for column in self.spec.columns if column not in chunk.columns]
+        self.rows += len(chunk)
+        self.nulls.update({column: int(count) for column, count in chunk.isna().sum().items()})
+
+        parsed, invalid = self.spec.parse(chunk)
+        view = sample_view(chunk, parsed, invalid)
+        for column, mask in invalid.items():
+            self.invalid[column].add(mask.to_numpy(), view[[c for c in (self.spec.key, column) if c in chunk.columns]])
+        for rule in self.spec.rules:
+            if rule.name in self.skipped:
+                continue
+            try:
+                mask = rule.condition(parsed).to_numpy(dtype=bool)
+            except KeyError as exc:
+                self.skipped[rule.name] = f"missing column {exc}"
+                continue
+            self.rules[rule.name].add(mask, view[[c for c in rule.sample_columns if c in chunk.columns]])
+
+        self._track_duplicates(chunk, parsed, view)
+        return parsed
+
+    def _track_duplicates(self, chunk: pd.DataFrame, parsed: pd.DataFrame, view: pd.DataFrame) -> None:
+        # Rows are compared on their parsed values, so 1.0 and 1.00 are the same amount (in any file format)
+        self.duplicate_rows.add(self.row_index.add(hash_rows(parsed)), view)
+        if self.spec.key not in chunk.columns:
+            return
+        keys = chunk[self.spec.key]
+        # Nulls are reported as missing values
+        present = keys.notna().to_numpy()
+        repeated = np.zeros(len(chunk), dtype=bool)
+        repeated[present] = self.key_index.add(hash_ids(keys[present]))
+        self.duplicate_keys.add(repeated, view)
+
+    def merge(
+        self, other: "TableCheck", row_hashes: np.ndarray, key_hashes: np.ndarray, key_history: HashIndex | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Add the results of a later partition, checked on its own.
+
+        `row_hashes` and `key_hashes` are the partition's distinct row and key hashes.
+        A row or key already seen in an earlier partition (or in `key_history`) is one
+        more duplicate. Returns those hashes, so samples can be taken from the partition.
+        """
+        if other.missing_columns is not None:
+            known = self.missing_columns or []
+            self.missing_columns = known + [column for column in other.missing_columns if column not in known]
+        self.rows += other.rows
+        self.nulls.update(other.nulls)
+        for column, tally in other.invalid.items():
+            self.invalid[column].merge(tally)
+        for name, tally in other.rules.items():
+            self.rules[name].merge(tally)
+        for name, reason in other.skipped.items():
+            self.skipped.setdefault(name, reason)
+        self.duplicate_rows.merge(other.duplicate_rows)
+        self.duplicate_keys.merge(other.duplicate_keys)
+
+        seen_rows = self.row_index.add(row_hashes)
+        seen_keys = self.key_index.add(key_hashes)
+        if key_history is not None:
+            seen_keys |= key_history.add(key_hashes)
+        self.duplicate_rows.count += int(seen_rows.sum())
+        self.duplicate_keys.count += int(seen_keys.sum())
+        return row_hashes[seen_rows], key_hashes[seen_keys]
+
+    def sample_repeats(self, chunks, rows: np.ndarray, keys: np.ndarray) -> None:
+        """Fill the duplicate samples with the first rows of `chunks` whose row or key hash is in `rows` / `keys`."""
+        taken_rows, taken_keys = set(), set()
+        for chunk in chunks:
+            if self.duplicate_rows.room <= 0 and self.duplicate_keys.room <= 0:
+                return
+            parsed, invalid = self.spec.parse(chunk)
+            view = sample_view(chunk, parsed, invalid)
+            self._sample_first(self.duplicate_rows, view, hash_rows(parsed), rows, taken_rows)
+            if self.spec.key in chunk.columns:
+                self._sample_first(self.duplicate_keys, view, hash_ids(chunk[self.spec.key]), keys, taken_keys)
+
+    @staticmethod
+    def _sample_first(tally: Tally, chunk: pd.DataFrame, hashes: np.ndarray, wanted: np.ndarray, taken: set) -> None:
+        # The first row with each wanted hash is the repeat of the earlier partition
+        if tally.room <= 0 or not len(wanted):
+            return
+        positions = np.searchsorted(wanted, hashes)
+        candidates = np.flatnonzero(wanted[np.minimum(positions, len(wanted) - 1)] == hashes)
+        picked = []
+        for i in candidates.tolist():
+            if hashes[i] not in taken:
+                taken.add(hashes[i])
+                picked.append(i)
+                if len(picked) >= tally.room:
+                    break
+        tally.sample.extend(records(chunk.iloc[picked]))
+
+    def close(self) -> None:
+        """Remove the temporary row index (a persistent key index is saved by the caller)."""
+        self.row_index.close()
+        if not self.key_index.persistent:
+            self.key_index.close()
+
+
+class ReferentialCheck:
+    """Transaction customer IDs checked against the labels' key index, chunk by chunk."""
+
+    def __init__(self, label_index: HashIndex, sample_size: int = SAMPLE_SIZE):
+        self.labels = label_index
+        self.sample_size = sample_size
+        self.customers = HashIndex()
+        self.missing = HashIndex()
+        self.missing_sample: list[str] = []
+        # Distinct transaction customers that are also in the labels
+        self.matched = 0
+
+    def update(self, customer_id: pd.Series) -> None:
+        ids = customer_id.dropna()
+        hashes = hash_ids(ids)
+        in_labels = self.labels.contains(hashes)
+        new = ~self.customers.add(hashes)
+        self.matched += int((new & in_labels).sum())
+        unknown = ~in_labels
+        first_seen = ~self.missing.add(hashes[unknown])
+        if len(self.missing_sample) < self.sample_size:
+            self.missing_sample += ids[unknown][first_seen].astype(str).head(self.sample_size - len(self.missing_sample)).tolist()
+
+    @property
+    def missing_in_labels(self) -> int:
+        return len(self.missing)
+
+    @property
+    def missing_in_transactions(self) -> int:
+        return len(self.labels) - self.matched
+
+    def unmatched_labels(self, label_chunks) -> list[str]:
+        """Up to `sample_size` label customer IDs with no transactions (rereads the labels until the sample is full)."""
+        sample = []
+        if not self.missing_in_transactions:
+            return sample
+        for chunk in label_chunks:
+            ids = chunk["customer_id"].dropna()
+            sample += ids[~self.customers.contains(hash_ids(ids))].astype(str).head(self.sample_size - len(sample)).tolist()
+            if len(sample) >= self.sample_size:
+                break
+        return sample
+
+    def close(self) -> None:
+        self.customers.close()
+        self.missing.close()
+
+
+class TransactionStats:
+    """
+    Running totals for the transactions summary (amounts, dates, transactions per customer).
+
+    Everything is constant size except the transaction count of each customer, which is
+    needed for the exact median. It is kept per customer ID hash in numpy runs, so it
+    costs 16 bytes per distinct customer (not per transaction).
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.by_type = Counter()
+        self.amount_by_type = Counter()
+        self.amount_count = 0
+        self.amount_sum = 0.0
+        # Mean and sum of squared deviations, combined chunk by chunk (Chan et al.)
+        self.amount_mean = 0.0
+        self.amount_m2 = 0.0
+        self.amount_min = np.inf
+        self.amount_max = -np.inf
+        self.first = pd.NaT
+        self.last = pd.NaT
+        self.per_customer = HashCounts()
+
+    def update(self, tx: pd.DataFrame) -> None:
+        self.rows += len(tx)
+        if "amount" in tx.columns:
+            amount = tx["amount"].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = amount[~np.isnan(amount)]
+            if len(present):
+                mean = float(present.mean())
+                self._add_amounts(len(present), mean, float(np.square(present - mean).sum()), float(present.sum()), float(present.min()), float(present.max()))
+            if "txn_type" in tx.columns:
+                self.by_type.update(tx["txn_type"].value_counts().to_dict())
+                self.amount_by_type.update(tx.groupby("txn_type")["amount"].sum().to_dict())
+        if "txn_timestamp" in tx.columns and tx["txn_timestamp"].notna().any():
+            self._add_dates(tx["txn_timestamp"].min(), tx["txn_timestamp"].max())
+        if "customer_id" in tx.columns:
+            counts = tx["customer_id"].value_counts()
+            self.per_customer.add(hash_ids(counts.index.to_series()), counts.to_numpy())
+
+    def _add_amounts(self, n: int, mean: float, m2: float, total: float, low: float, high: float) -> None:
+        count = self.amount_count + n
+        delta = mean - self.amount_mean
+        self.amount_m2 += m2 + delta**2 * self.amount_count * n / count
+        self.amount_mean += delta * n / count
+        self.amount_count = count
+        self.amount_sum += total
+        self.amount_min = min(self.amount_min, low)
+        self.amount_max = max(self.amount_max, high)
+
+    def _add_dates(self, first: pd.Timestamp, last: pd.Timestamp) -> None:
+        self.first = first if pd.isna(self.first) else min(self.first, first)
+        self.last = last if pd.isna(self.last) else max(self.last, last)
+
+    def merge(self, other: "TransactionStats") -> None:
+        """Add the totals of another part of the transactions."""
+        self.rows += other.rows
+        self.by_type.update(other.by_type)
+        self.amount_by_type.update(other.amount_by_type)
+        if other.amount_count:
+            self._add_amounts(other.amount_count, other.amount_mean, other.amount_m2, other.amount_sum, other.amount_min, other.amount_max)
+        if not pd.isna(other.first):
+            self._add_dates(other.first, other.last)
+        self.per_customer.merge(other.per_customer)
+
+    def summary(self) -> dict:
+        n = self.amount_count
+        per_customer = self.per_customer.counts()
+        return {
+            "transactions": self.rows,
+            "credit_transactions": int(self.by_type.get("credit", 0)),
+            "debit_transactions": int(self.by_type.get("debit", 0)),
+            "total_credit_amount": float(self.amount_by_type.get("credit", 0.0)),
+            "total_debit_amount": float(self.amount_by_type.get("debit", 0.0)),
+            "net_amount": self.amount_sum,
+            "earliest_transaction": None if pd.isna(self.first) else self.first.isoformat(),
+            "latest_transaction": None if pd.isna(self.last) else self.last.isoformat(),
+            "date_span_days": None if pd.isna(self.first) else (self.last - self.first).days,
+            "amount_min": self.amount_min if n else None,
+            "amount_max": self.amount_max if n else None,
+            "amount_mean": self.amount_mean if n else None,
+            "amount_std": float(np.sqrt(self.amount_m2 / (n - 1))) if n > 1 else None,
+            "transactions_per_customer": {
+                "min": int(per_customer.min()),
+                "max": int(per_customer.max()),
+                "mean": float(per_customer.mean()),
+                "median": float(np.median(per_customer)),
+            }
+            if len(per_customer)
+            else None,
+        }
+
+
+def read_chunks(path: Path, spec: TableSpec, chunksize: int, parse_cache: ParseCache | None = None):
+    """
+    Chunks of the file with its text columns kept as strings (CSV); other formats keep their types.
+
+    With a `parse_cache`, a CSV is parsed once into the shared typed cache and read from there.
+    Values that do not parse come back as their raw text, so the checks see them the same way.
+    """
+    if parse_cache is not None:
+        types = {"text": spec.text, "numeric": spec.numeric, "timestamps": spec.timestamps}
+        return parse_cache.iter_table(path, types, chunksize)
+    dtype = {column: str for column in spec.text} if table_format(path) == "csv" else None
+    return iter_table(path, chunksize, dtype=dtype)
+
+
+def check_labels(
+    path: Path, chunksize: int = DEFAULT_CHUNKSIZE, sample_size: int = SAMPLE_SIZE, parse_cache: ParseCache | None = None
+) -> tuple[TableCheck, dict]:
+    """Checks and summary of the labels file."""
+    check = TableCheck(label_spec(), sample_size)
+    outcomes = Counter()
+    for chunk in read_chunks(path, check.spec, chunksize, parse_cache):
+        parsed = check.update(chunk)
+        if "defaulted_within_90d" in parsed.columns:
+            outcomes.update(parsed["defaulted_within_90d"].value_counts().to_dict())
+    summary = {
+        "customers": check.rows,
+        "defaulted": int(outcomes[1]),
+        "not_defaulted": int(outcomes[0]),
+        "default_rate": outcomes[1] / check.rows if check.rows else None,
+    }
+    return check, summary
+
+
+def check_transactions(
+    path: Path,
+    label_index: HashIndex,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = SAMPLE_SIZE,
+    spec: TableSpec | None = None,
+    key_index: HashIndex | None = None,
+    parse_cache: ParseCache | None = None,
+) -> tuple[TableCheck, TransactionStats, ReferentialCheck, TransactionProfile]:
+    """Checks, running totals, customer coverage and profile of the transactions file."""
+    check = TableCheck(spec or transaction_spec(), sample_size, key_index)
+    stats = TransactionStats()
+    referential = ReferentialCheck(label_index, sample_size)
+    profile = TransactionProfile()
+    for chunk in read_chunks(path, check.spec, chunksize, parse_cache):
+        parsed = check.update(chunk)
+        stats.update(parsed)
+        profile.update(parsed)
+        if "customer_id" in chunk.columns:
+            referential.update(chunk["customer_id"])
+    return check, stats, referential, profile
+
+
+class PartitionResult:
+    """Mergeable results of one transactions partition, checked on its own in a worker process."""
+
+    def __init__(self, path: Path, spec_args: dict, chunksize: int, sample_size: int, parse_cache: Path | None, fingerprint: bool):
+        cache = ParseCache(parse_cache) if parse_cache is not None else None
+        check = TableCheck(transaction_spec(**spec_args), sample_size)
+        self.stats = TransactionStats()
+        self.profile = TransactionProfile()
+        customers = []
+        for chunk in read_chunks(path, check.spec, chunksize, cache):
+            parsed = check.update(chunk)
+            self.stats.update(parsed)
+            self.profile.update(parsed)
+            if "customer_id" in chunk.columns:
+                customers.append(chunk["customer_id"].dropna().drop_duplicates())
+        self.path = path
+        self.row_hashes = check.row_index.values()
+        self.key_hashes = check.key_index.values()
+        # In order of first appearance, so the merged sample of unknown customers follows the files
+        self.customers = pd.concat(customers).drop_duplicates() if customers else pd.Series([], dtype=object)
+        self.fingerprint = file_fingerprint(path) if fingerprint else None
+        self.cache_hits, self.cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        check.close()
+        # The rules are lambdas, which do not pickle; the merging check has the same spec
+        check.spec = check.row_index = check.key_index = None
+        self.check = check
+
+
+def check_partitions(
+    paths: list[Path],
+    label_index: HashIndex,
+    spec_args: dict,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = SAMPLE_SIZE,
+    workers: int = 1,
+    parse_cache: ParseCache | None = None,
+    history: HashIndex | None = None,
+) -> tuple[TableCheck, TransactionStats, ReferentialCheck, TransactionProfile, int]:
+    """
+    Check transactions split across partition files, `workers` partitions at a time.
+
+    Each partition is checked in its own process. The results are merged here in file
+    order. Rows and transaction IDs repeated across partitions, and customers missing
+    from the labels, are resolved against the merged indexes. With `history`, the IDs
+    of partitions not added before are also checked against it and then added. Also
+    returns how many partitions were already in `history`.
+    """
+    check = TableCheck(transaction_spec(**spec_args), sample_size)
+    stats = TransactionStats()
+    referential = ReferentialCheck(label_index, sample_size)
+    profile = TransactionProfile()
+    already_applied = 0
+    args = (spec_args, chunksize, sample_size, parse_cache.directory if parse_cache is not None else None, history is not None)
+    for result in _partition_results(paths, args, workers):
+        key_history = None
+        if history is not None:
+            if result.fingerprint in history.applied:
+                already_applied += 1
+            else:
+                history.applied.append(result.fingerprint)
+                key_history = history
+        rows, keys = check.merge(result.check, result.row_hashes, result.key_hashes, key_history)
+        if len(rows) or len(keys):
+            check.sample_repeats(read_chunks(result.path, check.spec, chunksize, parse_cache), rows, keys)
+        stats.merge(result.stats)
+        profile.merge(result.profile)
+        referential.update(result.customers)
+        if parse_cache is not None:
+            parse_cache.hits += result.cache_hits
+            parse_cache.misses += result.cache_misses
+    return check, stats, referential, profile, already_applied
+
+
+def _partition_results(paths: list[Path], args: tuple, workers: int):
+    """`PartitionResult` of every path, in order (at most two partitions per worker in flight)."""
+    if workers <= 1:
+        for path in paths:
+            yield PartitionResult(path, *args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(PartitionResult, path, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _issue(file: str, check: str, issue: str, severity: str, tally: Tally | None = None, **details) -> dict:
+    entry = {"file": file, "check": check, "issue": issue, "severity": severity}
+    if tally is not None:
+        entry.update(count=tally.count, sample=tally.sample)
+    entry.update(details)
+    return entry
+
+
+def table_issues(check: TableCheck) -> list[dict]:
+    """Issues found in one file, in the order of the original report: nulls, duplicates, types, rules."""
+    spec, file = check.spec, check.spec.file
+    issues = []
+    if check.missing_columns:
+        issues.append(_issue(file, "missing_columns", "Missing columns", "error", columns=check.missing_columns))
+    nulls = {column: count for column, count in check.nulls.items() if count}
+    if nulls:
+        issues.append(_issue(file, "missing_values", "Missing values", "error", details=nulls))
+    if check.duplicate_rows.count:
+        issues.append(_issue(file, "duplicate_rows", "Duplicate rows", "error", check.duplicate_rows))
+    if check.duplicate_keys.count:
+        issues.append(_issue(file, "duplicate_keys", f"Duplicate {spec.key}s", "error", check.duplicate_keys))
+    for column, tally in check.invalid.items():
+        if tally.count:
+            kind = "number" if column in spec.numeric else "ISO 8601 timestamp"
+            issues.append(_issue(file, f"invalid_{column}", f"{column} values that are not a valid {kind}", "error", tally))
+    for rule in spec.rules:
+        if rule.name in check.skipped:
+            issues.append(_issue(file, rule.name, f"{rule.issue} (not checked: {check.skipped[rule.name]})", "error"))
+        elif check.rules[rule.name].count:
+            issues.append(_issue(file, rule.name, rule.issue, rule.severity, check.rules[rule.name], **rule.params))
+    return issues
+
+
+def referential_issues(referential: ReferentialCheck, unmatched_labels: list[str]) -> list[dict]:
+    """Customer IDs found in only one of the two files."""
+    issues = []
+    if referential.missing_in_labels:
+        issues.append(
+            _issue("transactions.csv", "customers_missing_in_labels", "Customer IDs missing in labels", "error",
+                   count=referential.missing_in_labels, customer_ids=referential.missing_sample)
+        )
+    if referential.missing_in_transactions:
+        issues.append(
+            _issue("labels.csv", "customers_without_transactions", "Customer IDs with no transactions", "warning",
+                   count=referential.missing_in_transactions, customer_ids=unmatched_labels)
+        )
+    return issues
+
+
+def profile_issues(profile: TransactionProfile) -> list[dict]:
+    """Amounts outside the fences of the file's own distribution (counted from the sketch, so approximate)."""
+    issues = []
+    for txn_type, (lower, upper) in profile.outlier_fences().items():
+        count = profile.amount[txn_type].count_outside(lower, upper)
+        if count:
+            issues.append(
+                _issue("transactions.csv", f"amount_outlier_{txn_type}", f"{txn_type.capitalize()} amounts outside the usual range (approximate)",
+                       "warning", count=count, lower=lower, upper=upper)
+            )
+    return issues
+
+
+def build_report(
+    labels_path: Path,
+    transactions_path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    sample_size: int = SAMPLE_SIZE,
+    id_index: Path | None = None,
+    baseline_profile: Path | None = None,
+    save_profile: Path | None = None,
+    parse_cache: Path | None = None,
+    workers: int = 1,
+) -> dict:
+    """
+    Run every check on both files (one read each) and return the JSON-serializable report.
+
+    `transactions_path` is one file, a directory of partition files or a glob pattern.
+    Partitions are checked `workers` at a time and merged into one report.
+
+    With `id_index`, transaction IDs are also checked against the persisted index of
+    earlier files, and this file's IDs are added to it. A file (partition) that was already
+    added is not checked against the index again.
+
+    With `baseline_profile`, amount outliers are the rows outside the baseline's fences
+    and the report compares the two profiles; otherwise outliers are estimated from this
+    file's own profile. `save_profile` writes this file's profile for later runs.
+
+    With `parse_cache`, CSVs are read through the typed parse cache shared with the
+    feature pipeline (data_prep/parse_cache.py).
+    """
+    cache = ParseCache(parse_cache) if parse_cache is not None else None
+    partitions = table_partitions(transactions_path)
+    history = HashIndex.open(id_index) if id_index is not None else None
+    ids_before = len(history) if history is not None else None
+
+    labels, label_summary = check_labels(labels_path, chunksize, sample_size, cache)
+    baseline = TransactionProfile.load(baseline_profile) if baseline_profile is not None else None
+    # Fixed here so every partition uses the same bounds
+    spec_args = {
+        "max_date": pd.Timestamp.now() + pd.Timedelta(days=FUTURE_MARGIN_DAYS),
+        "amount_fences": baseline.outlier_fences() if baseline is not None else None,
+    }
+    if len(partitions) == 1:
+        already_applied = 0
+        key_index = None
+        if history is not None:
+            fingerprint = file_fingerprint(partitions[0])
+            if fingerprint in history.applied:
+                already_applied = 1
+            else:
+                history.applied.append(fingerprint)
+                key_index = history
+        transactions, stats, referential, profile = check_transactions(
+            partitions[0], labels.key_index, chunksize, sample_size, spec=transaction_spec(**spec_args), key_index=key_index, parse_cache=cache
+        )
+    else:
+        transactions, stats, referential, profile, already_applied = check_partitions(
+            partitions, labels.key_index, spec_args, chunksize, sample_size, workers=workers, parse_cache=cache, history=history
+        )
+    unmatched = referential.unmatched_labels(read_chunks(labels_path, labels.spec, chunksize, cache))
+    issues = table_issues(labels) + table_issues(transactions) + referential_issues(referential, unmatched)
+    if baseline is None:
+        issues += profile_issues(profile)
+    if save_profile is not None:
+        profile.save(save_profile)
+    if history is not None:
+        history.save()
+    for check in (labels, transactions, referential):
+        check.close()
+
+    files = {
+        "labels": {"path": str(labels_path), "rows": labels.rows, "nulls": dict(labels.nulls)},
+        "transactions": {"path": str(transactions_path), "rows": transactions.rows, "nulls": dict(transactions.nulls)},
+    }
+    if len(partitions) > 1:
+        files["transactions"]["partitions"] = len(partitions)
+    if history is not None:
+        files["transactions"]["id_index"] = {
+            "path": str(id_index),
+            "ids_before": ids_before,
+            "ids_after": len(history),
+            "files": len(partitions),
+            "already_applied": already_applied,
+        }
+    report = {
+        "generated_at": pd.Timestamp.now().isoformat(),
+        "files": files,
+        "rules": [rule.describe() for rule in labels.spec.rules + transactions.spec.rules],
+        "issues": issues,
+        "summary": {"labels": label_summary, "transactions": stats.summary()},
+        "profile": profile.summary(),
+    }
+    if cache is not None:
+        report["parse_cache"] = {"path": str(parse_cache), "hits": cache.hits, "parsed": cache.misses}
+    if baseline is not None:
+        report["profile_drift"] = {"baseline": str(baseline_profile), **compare_profiles(baseline, profile)}
+    return report
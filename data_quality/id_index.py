@@ -0,0 +1,275 @@
+"""
+Set of 64-bit ID hashes that spills to disk and can persist between runs.
+
+IDs are hashed with pandas' SipHash (`hash_ids`), so an index costs 8 bytes
+per distinct ID whatever the ID looks like. Hashes live in sorted runs of
+unique values. New hashes form a run in memory, and runs of similar size are
+merged, so there are O(log n) runs and a batch lookup is a binary search in
+each. When the in-memory runs exceed `memory_limit` hashes they are written to
+disk as a new run. Disk runs are merged block by block and memory-mapped for
+lookups, so history never has to be loaded in full.
+
+With a `directory`, `save` records the runs and the fingerprints of the files
+already added in meta.json (replaced atomically). `HashIndex.open` reopens
+them, so a daily file can be checked against all of history. Without a
+directory, spilled runs go to a temporary directory that is removed with the
+index.
+
+`HashCounts` keeps a count per hash instead, in sorted in-memory runs (16
+bytes per distinct ID), for statistics such as transactions per customer.
+
+Two different IDs share a hash with probability about n^2 / 2^65 (under 1e-4
+for 50M IDs); such a pair would be reported as a duplicate.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes
+INDEX_FORMAT = 1
+# Hashes kept in memory before the runs are spilled to disk (8 bytes each)
+MEMORY_LIMIT = 16_000_000
+# Rows merged at a time when combining disk runs
+MERGE_BLOCK = 4_000_000
+
+
+def hash_ids(values: pd.Series) -> np.ndarray:
+    """Stable 64-bit hash of every value's text (the same ID hashes the same in every run and file format)."""
+    # categorize=False gives the same hashes, faster for mostly distinct values
+    return pd.util.hash_array(values.astype(str).to_numpy(dtype=object), categorize=False)
+
+
+def hash_rows(df: pd.DataFrame) -> np.ndarray:
+    """
+    Stable 64-bit hash of every row from canonical forms of its values.
+
+    Numbers are hashed as float64, timestamps as datetime64[ns] and everything
+    else as text, in column-name order, so a row hashes the same whether its
+    partition came from CSV, Parquet or Feather (where the same column may be
+    int64 or float64, str or categorical).
+    """
+    combined = np.full(len(df), 0x345678, dtype=np.uint64)
+    for column in sorted(df.columns):
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            canonical = values.astype("datetime64[ns]").to_numpy().view(np.int64)
+        elif pd.api.types.is_numeric_dtype(values):
+            # + 0.0 folds -0.0 into 0.0
+            canonical = values.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+        else:
+            canonical = values.astype(str).to_numpy(dtype=object, na_value=None)
+        # Array arithmetic on uint64 wraps around, which is what the mixing wants
+        combined = (combined ^ pd.util.hash_array(canonical, categorize=False)) * np.uint64(1_000_003)
+    return combined
+
+
+def _contains(run: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    positions = np.searchsorted(run, queries)
+    found = np.zeros(len(queries), dtype=bool)
+    inside = positions < len(run)
+    found[inside] = run[positions[inside]] == queries[inside]
+    return found
+
+
+def _merge(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Stable sort of two concatenated sorted runs is a linear merge
+    return np.sort(np.concatenate([a, b]), kind="stable")
+
+
+def _sum_by_hash(hashes: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct hashes, sorted, with the total of their counts."""
+    order = np.argsort(hashes, kind="stable")
+    hashes, counts = hashes[order], counts[order]
+    first = np.ones(len(hashes), dtype=bool)
+    first[1:] = hashes[1:] != hashes[:-1]
+    return hashes[first], np.add.reduceat(counts, np.flatnonzero(first)) if len(hashes) else counts
+
+
+def _merge_counts(a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    return _sum_by_hash(np.concatenate([a[0], b[0]]), np.concatenate([a[1], b[1]]))
+
+
+class HashIndex:
+    def __init__(self, directory: Path | None = None, memory_limit: int = MEMORY_LIMIT):
+        self.persistent = directory is not None
+        self.directory = Path(directory) if directory is not None else Path(tempfile.mkdtemp(prefix="hash_index_"))
+        self.memory_limit = memory_limit
+        self.count = 0
+        self.applied: list[str] = []
+        self._memory: list[np.ndarray] = []
+        self._disk: list[tuple[str, np.ndarray]] = []
+        # Disk runs replaced by a merge; deleted once meta.json no longer refers to them
+        self._obsolete: list[str] = []
+
+    @classmethod
+    def open(cls, directory: Path, memory_limit: int = MEMORY_LIMIT) -> "HashIndex":
+        """The index saved in `directory`, or an empty one that will be saved there."""
+        index = cls(directory, memory_limit)
+        meta_path = index.directory / "meta.json"
+        if not meta_path.exists():
+            return index
+        meta = json.loads(meta_path.read_text())
+        if meta["format"] != INDEX_FORMAT:
+            raise ValueError(f"{directory} holds a format {meta['format']} index (expected {INDEX_FORMAT}); rebuild it")
+        index.count = meta["count"]
+        index.applied = meta["applied"]
+        index._disk = [(name, np.load(index.directory / name, mmap_mode="r")) for name in meta["runs"]]
+        # Runs written by a run that did not get to save
+        for path in index.directory.glob("run-*.npy"):
+            if path.name not in meta["runs"]:
+                path.unlink()
+        return index
+
+    def __len__(self) -> int:
+        return self.count
+
+    def values(self) -> np.ndarray:
+        """Every hash in the index, sorted (loads the disk runs into memory)."""
+        runs = self._memory + [np.asarray(run) for _, run in self._disk]
+        return np.sort(np.concatenate(runs)) if runs else np.empty(0, dtype=np.uint64)
+
+    def _lookup(self, queries: np.ndarray) -> np.ndarray:
+        # Sorted queries keep the binary searches in each run cache friendly
+        found = np.zeros(len(queries), dtype=bool)
+        for run in self._memory + [run for _, run in self._disk]:
+            missing = ~found
+            if missing.any():
+                found[missing] = _contains(run, queries[missing])
+        return found
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Whether each hash is in the index."""
+        order = np.argsort(hashes)
+        result = np.empty(len(hashes), dtype=bool)
+        result[order] = self._lookup(hashes[order])
+        return result
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Add hashes; True for each one already in the index or earlier in `hashes` (a duplicate)."""
+        # Stable, so the first occurrence of a repeated hash comes first in its group
+        order = np.argsort(hashes, kind="stable")
+        queries = hashes[order]
+        first = np.ones(len(queries), dtype=bool)
+        first[1:] = queries[1:] != queries[:-1]
+        unique = queries[first]
+        known = self._lookup(unique)
+        duplicate = np.ones(len(hashes), dtype=bool)
+        duplicate[order[first]] = known
+        new = unique[~known]
+        if len(new):
+            self.count += len(new)
+            self._memory.append(new)
+            self._memory = self._compact(self._memory, _merge, len)
+            if sum(len(run) for run in self._memory) > self.memory_limit:
+                self.spill()
+        return duplicate
+
+    @staticmethod
+    def _compact(runs: list, merge, size) -> list:
+        # Merge the newest run into the previous one while it is at least half its size
+        while len(runs) > 1 and 2 * size(runs[-1]) >= size(runs[-2]):
+            newest = runs.pop()
+            runs[-1] = merge(runs[-1], newest)
+        return runs
+
+    def spill(self) -> None:
+        """Write the in-memory runs to disk as one run."""
+        if not self._memory:
+            return
+        run = self._memory[0]
+        for other in self._memory[1:]:
+            run = _merge(run, other)
+        self._memory = []
+        self._disk.append(self._write(run))
+        self._disk = self._compact(self._disk, self._merge_disk, lambda run: len(run[1]))
+
+    def _write(self, run: np.ndarray) -> tuple[str, np.ndarray]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"run-{uuid.uuid4().hex}.npy"
+        np.save(self.directory / name, run)
+        return name, np.load(self.directory / name, mmap_mode="r")
+
+    def _merge_disk(self, a: tuple[str, np.ndarray], b: tuple[str, np.ndarray]) -> tuple[str, np.ndarray]:
+        """Merge two disk runs block by block into a new run file."""
+        (name_a, run_a), (name_b, run_b) = a, b
+        name = f"run-{uuid.uuid4().hex}.npy"
+        out = np.lib.format.open_memmap(self.directory / name, mode="w+", dtype=np.uint64, shape=(len(run_a) + len(run_b),))
+        i = j = k = 0
+        while i < len(run_a):
+            block = np.asarray(run_a[i : i + MERGE_BLOCK])
+            # The values of b below the end of this block of a go in between
+            end_b = j + int(np.searchsorted(run_b[j:], block[-1]))
+            merged = _merge(block, np.asarray(run_b[j:end_b]))
+            out[k : k + len(merged)] = merged
+            i, j, k = i + len(block), end_b, k + len(merged)
+        for j in range(j, len(run_b), MERGE_BLOCK):
+            block = run_b[j : j + MERGE_BLOCK]
+            out[k : k + len(block)] = block
+            k += len(block)
+        out.flush()
+        del out
+        self._retire(name_a)
+        self._retire(name_b)
+        return name, np.load(self.directory / name, mmap_mode="r")
+
+    def _retire(self, name: str) -> None:
+        if self.persistent:
+            self._obsolete.append(name)
+        else:
+            (self.directory / name).unlink(missing_ok=True)
+
+    def save(self) -> None:
+        """Persist the index (and `applied`) to its directory."""
+        if not self.persistent:
+            raise ValueError("a temporary index cannot be saved")
+        self.spill()
+        meta = {"format": INDEX_FORMAT, "count": self.count, "applied": self.applied, "runs": [name for name, _ in self._disk]}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.directory / "meta.json")
+        for name in self._obsolete:
+            (self.directory / name).unlink(missing_ok=True)
+        self._obsolete = []
+
+    def close(self) -> None:
+        """Release the memory maps; a temporary index also removes its files."""
+        self._memory, self._disk = [], []
+        if not self.persistent:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class HashCounts:
+    """Occurrences of each ID hash, in sorted runs of (hash, count) arrays (mergeable)."""
+
+    def __init__(self):
+        self._runs: list[tuple[np.ndarray, np.ndarray]] = []
+
+    def add(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        """Add `counts[i]` occurrences of `hashes[i]` (hashes may repeat)."""
+        self._push(_sum_by_hash(hashes, counts.astype(np.int64)))
+
+    def _push(self, run: tuple[np.ndarray, np.ndarray]) -> None:
+        if len(run[0]):
+            self._runs.append(run)
+            self._runs = HashIndex._compact(self._runs, _merge_counts, lambda run: len(run[0]))
+
+    def merge(self, other: "HashCounts") -> None:
+        for run in other._runs:
+            self._push(run)
+
+    def counts(self) -> np.ndarray:
+        """Total count of every distinct hash (in hash order)."""
+        if not self._runs:
+            return np.empty(0, dtype=np.int64)
+        run = self._runs[0]
+        for other in self._runs[1:]:
+            run = _merge_counts(run, other)
+        return run[1]
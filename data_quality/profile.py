@@ -0,0 +1,147 @@
+"""
+Approximate profile of a transactions file built from mergeable sketches.
+
+A `TransactionProfile` is updated with each parsed chunk and holds:
+- a quantile sketch of `amount` overall and per transaction type
+- distinct-count sketches of `customer_id` and `description`
+- the most frequent descriptions
+Its state stays around a few hundred KB whatever the file size. Profiles of
+chunks, files or workers merge with `merge`.
+
+Outlier thresholds come from the amount distribution: Tukey's far-out fences,
+Q1 - k * IQR and Q3 + k * IQR per transaction type. A profile saved with
+`save` can be loaded as the baseline of a later run. Its fences then become
+exact row rules, and `compare_profiles` reports how the distribution moved
+between the two files.
+"""
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from data_quality.rules import TXN_TYPES
+from data_quality.sketches import DistinctSketch, QuantileSketch, TopK
+
+# Bump when the saved layout changes
+PROFILE_FORMAT = 1
+QUANTILES = {"p01": 0.01, "p05": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95, "p99": 0.99}
+# Tukey's "far out" fences
+OUTLIER_IQR_FACTOR = 3.0
+TOP_DESCRIPTIONS = 10
+# Amount sketch groups: every amount, then one per valid transaction type
+AMOUNT_GROUPS = ["all"] + TXN_TYPES
+
+
+class TransactionProfile:
+    def __init__(self):
+        self.rows = 0
+        self.amount = {group: QuantileSketch() for group in AMOUNT_GROUPS}
+        self.customers = DistinctSketch()
+        self.descriptions = DistinctSketch()
+        self.top_descriptions = TopK()
+
+    def update(self, tx: pd.DataFrame) -> None:
+        """Add a parsed chunk (amount as numbers)."""
+        self.rows += len(tx)
+        if "amount" in tx.columns:
+            amount = tx["amount"].to_numpy(dtype="float64", na_value=float("nan"))
+            self.amount["all"].update(amount)
+            if "txn_type" in tx.columns:
+                txn_type = tx["txn_type"].to_numpy()
+                for group in TXN_TYPES:
+                    self.amount[group].update(amount[txn_type == group])
+        if "customer_id" in tx.columns:
+            self.customers.update(tx["customer_id"])
+        if "description" in tx.columns:
+            descriptions = tx["description"].dropna()
+            self.descriptions.update(descriptions)
+            self.top_descriptions.update(descriptions)
+
+    def merge(self, other: "TransactionProfile") -> None:
+        self.rows += other.rows
+        for group, sketch in self.amount.items():
+            sketch.merge(other.amount[group])
+        self.customers.merge(other.customers)
+        self.descriptions.merge(other.descriptions)
+        self.top_descriptions.merge(other.top_descriptions)
+
+    def outlier_fences(self) -> dict[str, tuple[float, float]]:
+        """(lower, upper) amount fences per transaction type with data."""
+        fences = {}
+        for group in TXN_TYPES:
+            q1, q3 = self.amount[group].quantiles([0.25, 0.75])
+            if q1 is not None:
+                iqr = q3 - q1
+                fences[group] = (q1 - OUTLIER_IQR_FACTOR * iqr, q3 + OUTLIER_IQR_FACTOR * iqr)
+        return fences
+
+    def summary(self) -> dict:
+        amount = {}
+        for group, sketch in self.amount.items():
+            if sketch.count:
+                amount[group] = {"count": sketch.count, **dict(zip(QUANTILES, sketch.quantiles(list(QUANTILES.values()))))}
+        return {
+            "rows": self.rows,
+            "amount": amount,
+            "amount_relative_accuracy": self.amount["all"].relative_accuracy,
+            "distinct_customers": self.customers.estimate(),
+            "distinct_descriptions": self.descriptions.estimate(),
+            "top_descriptions": [{"description": value, "count": n} for value, n in self.top_descriptions.most_common(TOP_DESCRIPTIONS)],
+            "top_descriptions_max_error": self.top_descriptions.error,
+            "outlier_fences": {group: {"lower": lower, "upper": upper} for group, (lower, upper) in self.outlier_fences().items()},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "format": PROFILE_FORMAT,
+            "rows": self.rows,
+            "amount": {group: sketch.to_dict() for group, sketch in self.amount.items()},
+            "customers": self.customers.to_dict(),
+            "descriptions": self.descriptions.to_dict(),
+            "top_descriptions": self.top_descriptions.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransactionProfile":
+        if data["format"] != PROFILE_FORMAT:
+            raise ValueError(f"profile format {data['format']} is not supported (expected {PROFILE_FORMAT})")
+        profile = cls()
+        profile.rows = data["rows"]
+        profile.amount = {group: QuantileSketch.from_dict(sketch) for group, sketch in data["amount"].items()}
+        profile.customers = DistinctSketch.from_dict(data["customers"])
+        profile.descriptions = DistinctSketch.from_dict(data["descriptions"])
+        profile.top_descriptions = TopK.from_dict(data["top_descriptions"])
+        return profile
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path: Path) -> "TransactionProfile":
+        return cls.from_dict(json.loads(path.read_text()))
+
+
+def _change(baseline: float | None, current: float | None) -> dict:
+    relative = None
+    if baseline is not None and current is not None and baseline != 0:
+        relative = (current - baseline) / abs(baseline)
+    return {"baseline": baseline, "current": current, "relative_change": relative}
+
+
+def compare_profiles(baseline: TransactionProfile, current: TransactionProfile) -> dict:
+    """How the current file's distribution moved from the baseline profile."""
+    amount = {}
+    for group in AMOUNT_GROUPS:
+        before = dict(zip(QUANTILES, baseline.amount[group].quantiles(list(QUANTILES.values()))))
+        after = dict(zip(QUANTILES, current.amount[group].quantiles(list(QUANTILES.values()))))
+        amount[group] = {name: _change(before[name], after[name]) for name in ("p05", "p50", "p95", "p99")}
+    known = set(baseline.top_descriptions.counts)
+    return {
+        "rows": _change(baseline.rows, current.rows),
+        "amount": amount,
+        "distinct_customers": _change(baseline.customers.estimate(), current.customers.estimate()),
+        "distinct_descriptions": _change(baseline.descriptions.estimate(), current.descriptions.estimate()),
+        "new_top_descriptions": [value for value, _ in current.top_descriptions.most_common(TOP_DESCRIPTIONS) if value not in known],
+    }
@@ -0,0 +1,166 @@
+"""
+Declarative row-level data quality rules for the raw labels and transactions files.
+
+A `Rule` names an issue and a vectorized condition that flags the offending
+rows of a chunk. A `TableSpec` lists the rules of one file together with the
+columns that must parse as numbers or timestamps. Values that do not parse are
+reported by the engine, and the rules see the parsed columns (unparseable
+values as NaN/NaT).
+"""
+
+import pandas as pd
+
+TXN_TYPES = ["credit", "debit"]
+DEFAULT_VALUES = [0, 1]
+
+# Assumption: amounts should be reasonable (between -1,000,000 and 1,000,000); a business rule
+EXTREME_THRESHOLD = 1000000
+# Assumption: transactions should be between 2000-01-01 and the current date + 1 year
+MIN_REASONABLE_DATE = "2000-01-01"
+FUTURE_MARGIN_DAYS = 365
+
+
+class Rule:
+    """One row-level check: `condition(chunk)` returns a boolean mask of the offending rows."""
+
+    def __init__(self, name: str, issue: str, condition, sample_columns: list[str], severity: str = "error", **params):
+        self.name = name
+        self.issue = issue
+        self.condition = condition
+        self.sample_columns = sample_columns
+        self.severity = severity
+        self.params = params
+
+    def describe(self) -> dict:
+        return {"rule": self.name, "issue": self.issue, "severity": self.severity, **self.params}
+
+
+class TableSpec:
+    """Rules of one input file, its unique key and the columns parsed before the rules run."""
+
+    def __init__(self, file: str, columns: list[str], key: str, text: list[str], numeric: list[str], timestamps: list[str], rules: list[Rule]):
+        self.file = file
+        self.columns = columns
+        self.key = key
+        # Read as strings from CSV, so IDs such as 0001 keep their text
+        self.text = text
+        self.numeric = numeric
+        self.timestamps = timestamps
+        self.rules = rules
+
+    def parse(self, chunk: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, pd.Series]]:
+        """Chunk with the typed columns parsed, and a mask of values that failed to parse per column."""
+        parsed = chunk.copy(deep=False)
+        invalid = {}
+        for column in self.numeric + self.timestamps:
+            if column not in chunk.columns:
+                continue
+            values = chunk[column]
+            if column in self.numeric and not pd.api.types.is_numeric_dtype(values):
+                parsed[column] = pd.to_numeric(values, errors="coerce")
+            elif column in self.timestamps and not pd.api.types.is_datetime64_any_dtype(values):
+                parsed[column] = pd.to_datetime(values, format="ISO8601", errors="coerce")
+            invalid[column] = values.notna() & parsed[column].isna()
+        return parsed, invalid
+
+
+def label_spec() -> TableSpec:
+    return TableSpec(
+        "labels.csv",
+        columns=["customer_id", "defaulted_within_90d"],
+        key="customer_id",
+        text=["customer_id"],
+        numeric=["defaulted_within_90d"],
+        timestamps=[],
+        rules=[
+            Rule(
+                "invalid_default_flag",
+                "Invalid defaulted_within_90d values",
+                lambda df: ~df["defaulted_within_90d"].isin(DEFAULT_VALUES),
+                ["customer_id", "defaulted_within_90d"],
+                allowed=DEFAULT_VALUES,
+            ),
+        ],
+    )
+
+
+def transaction_spec(
+    extreme_threshold: float = EXTREME_THRESHOLD,
+    min_date: str = MIN_REASONABLE_DATE,
+    max_date: pd.Timestamp | None = None,
+    amount_fences: dict[str, tuple[float, float]] | None = None,
+) -> TableSpec:
+    """
+    Transaction rules; dates after `max_date` (default: now + FUTURE_MARGIN_DAYS) count as future dates.
+
+    `amount_fences` maps a transaction type to the (lower, upper) range of its usual
+    amounts (e.g. from a baseline profile); amounts outside it are reported as outliers.
+    """
+    min_date = pd.Timestamp(min_date)
+    max_date = pd.Timestamp.now() + pd.Timedelta(days=FUTURE_MARGIN_DAYS) if max_date is None else pd.Timestamp(max_date)
+    amount_columns = ["transaction_id", "customer_id", "amount", "txn_type", "description"]
+    date_columns = ["transaction_id", "customer_id", "txn_timestamp", "amount"]
+    sign_columns = ["transaction_id", "customer_id", "amount", "txn_type"]
+    outlier_rules = [
+        Rule(
+            f"amount_outlier_{txn_type}",
+            f"{txn_type.capitalize()} amounts outside the baseline range",
+            lambda df, txn_type=txn_type, lower=lower, upper=upper: (df["txn_type"] == txn_type) & ((df["amount"] < lower) | (df["amount"] > upper)),
+            amount_columns,
+            severity="warning",
+            lower=lower,
+            upper=upper,
+        )
+        for txn_type, (lower, upper) in (amount_fences or {}).items()
+    ]
+    return TableSpec(
+        "transactions.csv",
+        columns=["transaction_id", "customer_id", "txn_timestamp", "amount", "txn_type", "description"],
+        key="transaction_id",
+        text=["transaction_id", "customer_id", "txn_type", "description"],
+        numeric=["amount"],
+        timestamps=["txn_timestamp"],
+        rules=[
+            Rule("invalid_txn_type", "Invalid transaction types", lambda df: ~df["txn_type"].isin(TXN_TYPES), amount_columns, allowed=TXN_TYPES),
+            Rule(
+                "extreme_amount",
+                "Extremely large amounts",
+                lambda df: df["amount"].abs() > extreme_threshold,
+                amount_columns,
+                severity="warning",
+                threshold=extreme_threshold,
+            ),
+            Rule("zero_amount", "Zero amount transactions", lambda df: df["amount"] == 0, amount_columns, severity="warning"),
+            Rule(
+                "future_date",
+                "Future date transactions",
+                lambda df: df["txn_timestamp"] > max_date,
+                date_columns,
+                severity="warning",
+                after=max_date.isoformat(),
+            ),
+            Rule(
+                "old_date",
+                "Very old date transactions",
+                lambda df: df["txn_timestamp"] < min_date,
+                date_columns,
+                severity="warning",
+                before=min_date.isoformat(),
+            ),
+            Rule(
+                "credit_negative",
+                "Credit transactions with negative amounts",
+                lambda df: (df["txn_type"] == "credit") & (df["amount"] < 0),
+                sign_columns,
+                severity="warning",
+            ),
+            Rule(
+                "debit_positive",
+                "Debit transactions with positive amounts",
+                lambda df: (df["txn_type"] == "debit") & (df["amount"] > 0),
+                sign_columns,
+                severity="warning",
+            ),
+        ]
+        + outlier_rules,
+    )
@@ -0,0 +1,106 @@
+"""Shared synthetic inputs for the pipeline, data quality and API tests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DESCRIPTIONS = ["ACME PAYROLL", "TESCO 1234", "RENT JAN", "NETFLIX.COM", "BET365", "COFFEE SHOP", "DWP PAYMENT", "MORTGAGE"]
+
+
+def synthetic_transactions(rows: int = 5_000, customers: int = 200, seed: int = 0) -> pd.DataFrame:
+    """Raw transactions with two-decimal amounts spread over a few months."""
+    rng = np.random.default_rng(seed)
+    amount = np.round(rng.normal(0, 400, rows), 2)
+    return pd.DataFrame(
+        {
+            "transaction_id": [f"T{i:08d}" for i in range(rows)],
+            "customer_id": [f"CUST_{i:05d}" for i in rng.integers(0, customers, rows)],
+            "txn_timestamp": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 120 * 86_400, rows), unit="s")).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            ),
+            "amount": amount,
+            "txn_type": np.where(amount > 0, "credit", "debit"),
+            "description": rng.choice(DESCRIPTIONS, rows),
+        }
+    )
+
+
+def synthetic_labels(customers: int = 200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 1)
+    return pd.DataFrame({"customer_id": [f"CUST_{i:05d}" for i in range(customers)], "defaulted_within_90d": rng.integers(0, 2, customers)})
+
+
+def dirty_transactions(rows: int = 3_000, seed: int = 0) -> pd.DataFrame:
+    """Synthetic transactions as text, with a few rows of every issue the data quality check reports."""
+    tx = synthetic_transactions(rows, seed=seed).astype(str)
+    seeded = {
+        "txn_type": {3: "refund", 40: "refund", 900: "DEBIT"},
+        "amount": {5: "abc", 77: "1,000", 12: "5000000", 13: "0", 14: "0.00"},
+        "txn_timestamp": {20: "not a date", 21: "2090-01-01T00:00:00", 22: "1990-05-01T00:00:00"},
+        "customer_id": {30: "CUST_99999", 31: "CUST_99999", 32: "nan"},
+    }
+    for column, values in seeded.items():
+        for row, value in values.items():
+            tx.loc[row, column] = value
+    # Wrong signs for the type
+    tx.loc[50, ["amount", "txn_type"]] = ["-12.50", "credit"]
+    tx.loc[51, ["amount", "txn_type"]] = ["12.50", "debit"]
+    tx = tx.replace("nan", None)
+    # Exact copies of earlier rows (in another chunk), and reused IDs with other values
+    repeats = tx.iloc[[1, 2, 1_500]]
+    reused = tx.iloc[[10, 11]].assign(amount="1.23")
+    return pd.concat([tx, repeats, reused], ignore_index=True)
+
+
+@pytest.fixture
+def transactions():
+    return synthetic_transactions()
+
+
+@pytest.fixture
+def transactions_csv(tmp_path):
+    path = tmp_path / "transactions.csv"
+    synthetic_transactions().to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def labels():
+    return synthetic_labels()
+
+
+def feature_rows(rows: int = 20, seed: int = 0) -> list[dict]:
+    """/predict payloads whose probabilities spread across (0, 1) under the shipped model."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "txn_count": float(rng.integers(1, 200)),
+            "total_debit": float(np.round(rng.uniform(0, 80), 2)),
+            "total_credit": float(np.round(rng.uniform(0, 60), 2)),
+            "avg_amount": float(np.round(rng.normal(-60, 100), 2)),
+            "kw_rent": int(rng.integers(0, 3)),
+            "kw_netflix": int(rng.integers(0, 2)),
+            "kw_tesco": int(rng.integers(0, 5)),
+            "kw_payroll": int(rng.integers(0, 3)),
+            "kw_bonus": int(rng.integers(0, 2)),
+        }
+        for _ in range(rows)
+    ]
+
+
+@pytest.fixture(scope="session")
+def api_app():
+    """The API module with the model loaded; no lifespan events, so no hot-reload watcher runs."""
+    import api.app as app_module
+    from api.model import MODEL_PATH, LoadedModel
+
+    if app_module.loaded is None:
+        app_module.use_model(LoadedModel(MODEL_PATH))
+    return app_module
+
+
+@pytest.fixture
+def client(api_app):
+    from fastapi.testclient import TestClient
+
+    return TestClient(api_app.app)
@@ -0,0 +1,41 @@
+"""Endpoint behaviour of the inference service, checked against direct model calls."""
+
+import numpy as np
+import pytest
+from conftest import feature_rows
+
+from api.model import FEATURE_NAMES
+
+
+def _matrix(rows: list[dict]) -> np.ndarray:
+    return np.array([[row[name] for name in FEATURE_NAMES] for row in rows], dtype=np.float64)
+
+
+def test_predict_batch_matches_predict(client, api_app):
+    rows = feature_rows()
+
+    batch = client.post("/predict_batch", json=rows).json()
+
+    singles = [client.post("/predict", json=row).json() for row in rows]
+    assert batch["probabilities"] == pytest.approx([single["probability"] for single in singles], abs=1e-12)
+    assert batch["predictions"] == [single["prediction"] for single in singles]
+    np.testing.assert_allclose(batch["probabilities"], api_app.loaded.model.predict_proba(_matrix(rows))[:, 1], rtol=1e-9)
+
+
+def test_columnar_batch_matches_records(client):
+    rows = feature_rows()
+    columns = {name: [row[name] for row in rows] for name in FEATURE_NAMES}
+    # kw_* columns may be left out and count as zeros
+    required = {name: columns[name] for name in ["txn_count", "total_debit", "total_credit", "avg_amount"]}
+
+    assert client.post("/predict_batch", json=columns).json() == client.post("/predict_batch", json=rows).json()
+    zeroed = [{**row, **{name: 0 for name in FEATURE_NAMES if name.startswith("kw_")}} for row in rows]
+    assert client.post("/predict_batch", json=required).json() == client.post("/predict_batch", json=zeroed).json()
+
+
+def test_predict_batch_limits(client, api_app, monkeypatch):
+    monkeypatch.setattr(api_app, "MAX_BATCH_ROWS", 5)
+
+    assert client.post("/predict_batch", json=[]).json() == {"probabilities": [], "predictions": []}
+    assert client.post("/predict_batch", json=feature_rows(6)).status_code == 413
+    assert client.post("/predict_batch", json={"txn_count": [1.0], "total_debit": [], "total_credit": [1.0], "avg_amount": [1.0]}).status_code == 422
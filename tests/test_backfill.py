@@ -0,0 +1,33 @@
+"""Every snapshot must equal a build over the transactions up to its as_of date, as if run on that date."""
+
+import pandas as pd
+import pytest
+
+from data_prep.backfill import build_feature_snapshots, snapshot_dates
+from data_prep.prepare_data import build_features
+from data_prep.table_io import read_transactions
+
+
+def _build_as_of(tx: pd.DataFrame, labels: pd.DataFrame, cutoff: pd.Timestamp, windows) -> pd.DataFrame:
+    history_start = tx["txn_timestamp"].min()
+    upto = tx[tx["txn_timestamp"] <= cutoff].reset_index(drop=True)
+    return build_features(upto, labels, reference_date=cutoff, history_start=history_start, windows=windows)
+
+
+@pytest.mark.parametrize("windows", [[], [7, 30]])
+def test_snapshots_match_builds_as_of(transactions_csv, labels, windows):
+    tx = read_transactions(transactions_csv)
+    dates = [pd.Timestamp("2025-02-10"), pd.Timestamp("2025-03-31 12:00")]
+
+    snapshots = build_feature_snapshots(tx, labels, dates, windows=windows)
+
+    # A bare date covers the whole day
+    cutoffs = [pd.Timestamp("2025-02-10 23:59:59.999999999"), dates[1]]
+    for as_of, cutoff in zip(dates, cutoffs):
+        snapshot = snapshots[snapshots["as_of"] == as_of].drop(columns="as_of").reset_index(drop=True)
+        pd.testing.assert_frame_equal(snapshot, _build_as_of(tx, labels, cutoff, windows), check_exact=True)
+
+
+def test_snapshot_dates():
+    assert snapshot_dates(["2025-01-15", "2025-01-01"], freq="7D") == list(pd.date_range("2025-01-01", "2025-01-15", freq="7D"))
+    assert snapshot_dates(["2025-01-02", "2025-01-01", "2025-01-02"]) == [pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-02")]
@@ -0,0 +1,65 @@
+"""Offline scoring must give every customer, in input order, the score the API's model gives its feature row."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import feature_rows
+
+from api.batch_score import score_table
+from api.feature_store import model_inputs
+from api.model import FEATURE_NAMES, REQUIRED_FEATURES
+
+READERS = {"csv": lambda path: pd.read_csv(path, dtype={"customer_id": str}), "parquet": pd.read_parquet, "feather": pd.read_feather}
+
+
+@pytest.fixture(scope="module")
+def features() -> pd.DataFrame:
+    df = pd.DataFrame(feature_rows(1_000, seed=3))
+    df.insert(0, "customer_id", [f"{i:06d}" for i in range(len(df))][::-1])
+    return df
+
+
+def _expected(api_app, df: pd.DataFrame) -> pd.DataFrame:
+    probabilities = api_app.loaded.predict_proba(model_inputs(df, FEATURE_NAMES))
+    return pd.DataFrame({"customer_id": df["customer_id"], "probability": probabilities, "prediction": (probabilities >= 0.5).astype(np.int8)})
+
+
+@pytest.mark.parametrize("input_format,output_format", [("csv", "csv"), ("parquet", "feather"), ("feather", "parquet")])
+def test_scores_match_the_model(api_app, features, tmp_path, input_format, output_format):
+    input_path, output_path = tmp_path / f"features.{input_format}", tmp_path / f"scores.{output_format}"
+    getattr(features, f"to_{input_format}")(input_path, **({"index": False} if input_format == "csv" else {}))
+
+    rows = score_table(input_path, output_path, api_app.loaded, FEATURE_NAMES, chunksize=300)
+
+    assert rows == len(features)
+    scores = READERS[output_format](output_path)
+    pd.testing.assert_frame_equal(scores, _expected(api_app, features), check_dtype=False, check_exact=output_format != "csv", rtol=1e-15)
+
+
+def test_workers_preserve_input_order(api_app, features, tmp_path):
+    input_path = tmp_path / "features.parquet"
+    features.to_parquet(input_path)
+
+    score_table(input_path, tmp_path / "serial.parquet", api_app.loaded, FEATURE_NAMES, workers=1, chunksize=64)
+    score_table(input_path, tmp_path / "pool.parquet", api_app.loaded, FEATURE_NAMES, workers=2, chunksize=64)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "pool.parquet"), pd.read_parquet(tmp_path / "serial.parquet"))
+
+
+def test_missing_optional_inputs_are_scored_as_zero(api_app, features, tmp_path):
+    input_path = tmp_path / "features.parquet"
+    features[["customer_id", *REQUIRED_FEATURES]].to_parquet(input_path)
+    zeroed = features.copy()
+    zeroed[[name for name in FEATURE_NAMES if name not in REQUIRED_FEATURES]] = 0
+
+    score_table(input_path, tmp_path / "scores.parquet", api_app.loaded, FEATURE_NAMES)
+
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "scores.parquet"), _expected(api_app, zeroed), check_dtype=False)
+
+
+def test_input_without_customer_id_is_rejected(api_app, features, tmp_path):
+    input_path = tmp_path / "features.parquet"
+    features.drop(columns="customer_id").to_parquet(input_path)
+
+    with pytest.raises(ValueError, match="customer_id"):
+        score_table(input_path, tmp_path / "scores.parquet", api_app.loaded, FEATURE_NAMES)
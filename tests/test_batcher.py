@@ -0,0 +1,86 @@
+"""Concurrent single-row submissions must be scored together and each caller must get its own row's score."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from conftest import feature_rows
+
+from api.batcher import MicroBatcher
+from api.model import FEATURE_NAMES
+
+
+def _scorer(calls: list):
+    async def score(X: np.ndarray) -> np.ndarray:
+        calls.append(len(X))
+        await asyncio.sleep(0)
+        return X[:, 0] * 2 + X[:, 1]
+
+    return score
+
+
+def test_rows_are_batched_and_results_keep_their_order():
+    calls = []
+    batcher = MicroBatcher(_scorer(calls), max_batch_size=4, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit([float(i), 1.0]) for i in range(10)))
+
+    assert asyncio.run(run()) == [2.0 * i + 1.0 for i in range(10)]
+    # Two full batches flush at once, the remainder after max_wait_ms
+    assert calls == [4, 4, 2]
+    assert batcher.stats()["batch_sizes"] == {2: 1, 4: 2}
+
+
+def test_lone_row_is_flushed_after_the_wait():
+    calls = []
+    batcher = MicroBatcher(_scorer(calls), max_batch_size=64, max_wait_ms=5)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await batcher.submit([1.0, 0.5])
+        return result, loop.time() - started
+
+    result, waited = asyncio.run(run())
+    assert result == 2.5 and calls == [1]
+    assert 0.004 <= waited < 1.0
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    async def failing(X):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(failing, max_batch_size=3, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit([0.0]) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_affect_the_others():
+    calls = []
+    batcher = MicroBatcher(_scorer(calls), max_batch_size=3, max_wait_ms=20)
+
+    async def run():
+        tasks = [asyncio.create_task(batcher.submit([float(i), 0.0])) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    first, cancelled, last = asyncio.run(run())
+    assert (first, last) == (0.0, 4.0)
+    assert isinstance(cancelled, asyncio.CancelledError)
+
+
+@pytest.mark.parametrize("size", [1, 64])
+def test_batched_predict_matches_unbatched(client, api_app, monkeypatch, size):
+    monkeypatch.setattr(api_app.batcher, "max_batch_size", size)
+    rows = feature_rows(8)
+
+    probabilities = [client.post("/predict", json=row).json()["probability"] for row in rows]
+
+    expected = api_app.loaded.predict_proba(np.array([[row[name] for name in FEATURE_NAMES] for row in rows]))
+    np.testing.assert_allclose(probabilities, expected, rtol=0, atol=1e-15)
@@ -0,0 +1,92 @@
+"""Binary batch bodies must decode to the same matrix, and score the same, as the JSON records they encode."""
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from conftest import feature_rows
+
+from api.binary_format import ARROW_CONTENT_TYPE, PACKED_CONTENT_TYPE, BinaryFormatError, decode_arrow, decode_packed, encode_packed
+from api.model import FEATURE_NAMES, INTEGER_FEATURES, REQUIRED_FEATURES
+
+ROWS = feature_rows(50)
+MATRIX = np.array([[row[name] for name in FEATURE_NAMES] for row in ROWS], dtype=np.float64)
+
+
+def _arrow(columns: dict) -> bytes:
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=16)
+    return sink.getvalue().to_pybytes()
+
+
+def test_packed_round_trip():
+    np.testing.assert_array_equal(decode_packed(encode_packed(MATRIX), FEATURE_NAMES, INTEGER_FEATURES), MATRIX)
+
+
+def test_arrow_decodes_like_records():
+    columns = {name: MATRIX[:, j].astype(np.int64) if name in INTEGER_FEATURES else MATRIX[:, j] for j, name in enumerate(FEATURE_NAMES)}
+
+    np.testing.assert_array_equal(decode_arrow(_arrow(columns), FEATURE_NAMES, REQUIRED_FEATURES, INTEGER_FEATURES), MATRIX)
+
+    # Optional kw_* columns may be left out and count as zeros
+    required_only = decode_arrow(_arrow({name: columns[name] for name in REQUIRED_FEATURES}), FEATURE_NAMES, REQUIRED_FEATURES)
+    expected = MATRIX.copy()
+    expected[:, [j for j, name in enumerate(FEATURE_NAMES) if name not in REQUIRED_FEATURES]] = 0
+    np.testing.assert_array_equal(required_only, expected)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"CRF",
+        b"XXXX" + encode_packed(MATRIX)[4:],
+        encode_packed(MATRIX[:, :-1]),
+        encode_packed(MATRIX)[:-8],
+        encode_packed(np.where(np.arange(MATRIX.size).reshape(MATRIX.shape) == 3, np.nan, MATRIX)),
+        encode_packed(MATRIX + np.isin(FEATURE_NAMES, sorted(INTEGER_FEATURES)) * 0.5),
+    ],
+    ids=["short", "magic", "columns", "size", "nan", "fractional-count"],
+)
+def test_malformed_packed_bodies_are_rejected(body):
+    with pytest.raises(BinaryFormatError):
+        decode_packed(body, FEATURE_NAMES, INTEGER_FEATURES)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not arrow",
+        _arrow({"txn_count": [1.0]}),
+        _arrow({"txn_count": ["1"], "total_debit": [1.0], "total_credit": [1.0], "avg_amount": [1.0]}),
+        _arrow({"txn_count": [1.0, None], "total_debit": [1.0, 2.0], "total_credit": [1.0, 2.0], "avg_amount": [1.0, 2.0]}),
+    ],
+    ids=["garbage", "missing-columns", "text-column", "nulls"],
+)
+def test_malformed_arrow_bodies_are_rejected(body):
+    with pytest.raises(BinaryFormatError):
+        decode_arrow(body, FEATURE_NAMES, REQUIRED_FEATURES, INTEGER_FEATURES)
+
+
+def test_binary_endpoint_matches_json(client):
+    expected = client.post("/predict_batch", json=ROWS).json()
+    arrow_body = _arrow({name: MATRIX[:, j] for j, name in enumerate(FEATURE_NAMES)})
+
+    packed = client.post("/predict_batch/binary", content=encode_packed(MATRIX), headers={"Content-Type": PACKED_CONTENT_TYPE})
+    arrow = client.post("/predict_batch/binary", content=arrow_body, headers={"Content-Type": ARROW_CONTENT_TYPE})
+    raw = client.post(
+        "/predict_batch/binary", content=encode_packed(MATRIX), headers={"Content-Type": PACKED_CONTENT_TYPE, "Accept": PACKED_CONTENT_TYPE}
+    )
+
+    assert packed.json() == expected and arrow.json() == expected
+    np.testing.assert_array_equal(np.frombuffer(raw.content, dtype="<f8"), expected["probabilities"])
+    assert client.post("/predict_batch/binary", content=b"CRF", headers={"Content-Type": PACKED_CONTENT_TYPE}).status_code == 422
+    assert client.post("/predict_batch/binary", content=b"{}", headers={"Content-Type": "application/json"}).status_code == 415
+
+
+def test_binary_endpoint_enforces_the_row_limit(client, api_app, monkeypatch):
+    monkeypatch.setattr(api_app, "MAX_BATCH_ROWS", 10)
+
+    response = client.post("/predict_batch/binary", content=encode_packed(MATRIX[:20]), headers={"Content-Type": PACKED_CONTENT_TYPE})
+
+    assert response.status_code == 413
@@ -0,0 +1,97 @@
+"""The prediction cache must stay bounded, expire entries and never serve a score from another model version."""
+
+import pytest
+from conftest import feature_rows
+
+import api.cache
+from api.cache import PredictionCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(api.cache.time, "monotonic", clock)
+    return clock
+
+
+def _cache(**kwargs) -> PredictionCache:
+    cache = PredictionCache(**kwargs)
+    cache.set_version("v1")
+    return cache
+
+
+def test_key_is_canonical():
+    assert PredictionCache.key([1, -0.0, 2.5]) == PredictionCache.key([1.0, 0.0, 2.5])
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = _cache(max_entries=2)
+    cache.put(("a",), 0.1, "v1")
+    cache.put(("b",), 0.2, "v1")
+    assert cache.get(("a",)) == 0.1
+
+    cache.put(("c",), 0.3, "v1")
+
+    assert cache.get(("b",)) is None
+    assert (cache.get(("a",)), cache.get(("c",))) == (0.1, 0.3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = _cache(ttl_seconds=10)
+    cache.put(("a",), 0.1, "v1")
+
+    clock.now += 10
+    assert cache.get(("a",)) == 0.1
+    clock.now += 0.5
+    assert cache.get(("a",)) is None
+    assert cache.stats()["expirations"] == 1 and len(cache) == 0
+
+
+def test_new_model_version_clears_and_stale_scores_are_dropped(clock):
+    cache = _cache()
+    cache.put(("a",), 0.1, "v1")
+
+    cache.set_version("v2")
+    cache.put(("b",), 0.2, "v1")
+
+    assert len(cache) == 0
+    cache.set_version("v2")
+    cache.put(("b",), 0.2, "v2")
+    assert cache.get(("b",)) == 0.2
+
+
+def test_predict_uses_the_cache(client, api_app, monkeypatch):
+    cache = PredictionCache(max_entries=100)
+    cache.set_version(api_app.loaded.version)
+    monkeypatch.setattr(api_app, "prediction_cache", cache)
+    row = feature_rows(1)[0]
+
+    first = client.post("/predict", json=row).json()
+    second = client.post("/predict", json={**row, "txn_count": int(row["txn_count"])}).json()
+
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_score_from_a_reload_during_the_call_is_not_cached(client, api_app, monkeypatch):
+    cache = PredictionCache(max_entries=100)
+    cache.set_version(api_app.loaded.version)
+    monkeypatch.setattr(api_app, "prediction_cache", cache)
+
+    async def submit_during_reload(row):
+        cache.set_version("reloaded")
+        return 0.25
+
+    monkeypatch.setattr(api_app.batcher, "submit", submit_during_reload)
+
+    assert client.post("/predict", json=feature_rows(1)[0]).json()["probability"] == 0.25
+    assert len(cache) == 0
@@ -0,0 +1,107 @@
+"""The streaming rule engine must report the same counts, samples and summary as whole-file pandas checks, for any chunk size."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import dirty_transactions, synthetic_labels
+
+from data_quality.engine import build_report
+from data_quality.rules import EXTREME_THRESHOLD, TXN_TYPES
+
+
+@pytest.fixture
+def dirty_files(tmp_path):
+    labels = synthetic_labels(200).astype(str)
+    labels.loc[7, "defaulted_within_90d"] = "2"
+    labels = pd.concat([labels, pd.DataFrame({"customer_id": ["CUST_00500"], "defaulted_within_90d": ["0"]})], ignore_index=True)
+    tx = dirty_transactions()
+    labels.to_csv(tmp_path / "labels.csv", index=False)
+    tx.to_csv(tmp_path / "transactions.csv", index=False)
+    return tmp_path / "labels.csv", tmp_path / "transactions.csv", tx
+
+
+def expected_counts(tx: pd.DataFrame) -> dict[str, int]:
+    """Issue counts of the transactions, computed on the whole frame."""
+    amount = pd.to_numeric(tx["amount"], errors="coerce")
+    timestamp = pd.to_datetime(tx["txn_timestamp"], format="ISO8601", errors="coerce")
+    parsed = tx.assign(amount=amount, txn_timestamp=timestamp)
+    keys = tx["transaction_id"].dropna()
+    return {
+        "duplicate_rows": int(parsed.duplicated().sum()),
+        "duplicate_keys": int(keys.duplicated().sum()),
+        "invalid_amount": int((tx["amount"].notna() & amount.isna()).sum()),
+        "invalid_txn_timestamp": int((tx["txn_timestamp"].notna() & timestamp.isna()).sum()),
+        "invalid_txn_type": int((~tx["txn_type"].isin(TXN_TYPES)).sum()),
+        "extreme_amount": int((amount.abs() > EXTREME_THRESHOLD).sum()),
+        "zero_amount": int((amount == 0).sum()),
+        "future_date": int((timestamp > pd.Timestamp.now() + pd.Timedelta(days=365)).sum()),
+        "old_date": int((timestamp < pd.Timestamp("2000-01-01")).sum()),
+        "credit_negative": int(((tx["txn_type"] == "credit") & (amount < 0)).sum()),
+        "debit_positive": int(((tx["txn_type"] == "debit") & (amount > 0)).sum()),
+    }
+
+
+def issues_of(report: dict, file: str) -> dict[str, dict]:
+    return {issue["check"]: issue for issue in report["issues"] if issue["file"] == file}
+
+
+def test_counts_match_whole_file_checks(dirty_files):
+    labels_path, tx_path, tx = dirty_files
+
+    report = build_report(labels_path, tx_path, chunksize=700)
+
+    issues = issues_of(report, "transactions.csv")
+    counts = {check: issue["count"] for check, issue in issues.items() if "count" in issue and not check.startswith("amount_outlier")}
+    assert counts == {check: count for check, count in expected_counts(tx).items() if count} | {"customers_missing_in_labels": 1}
+    assert issues["missing_values"]["details"] == {"customer_id": 1}
+    assert issues["customers_missing_in_labels"]["customer_ids"] == ["CUST_99999"]
+    label_issues = issues_of(report, "labels.csv")
+    assert label_issues["invalid_default_flag"]["count"] == 1
+    assert label_issues["customers_without_transactions"]["customer_ids"] == ["CUST_00500"]
+
+
+def test_samples_are_the_first_offending_rows(dirty_files):
+    labels_path, tx_path, tx = dirty_files
+
+    issues = issues_of(build_report(labels_path, tx_path, chunksize=700, sample_size=2), "transactions.csv")
+
+    assert [row["transaction_id"] for row in issues["invalid_txn_type"]["sample"]] == tx["transaction_id"].iloc[[3, 40]].tolist()
+    assert [row["transaction_id"] for row in issues["duplicate_rows"]["sample"]] == tx["transaction_id"].iloc[[1, 2]].tolist()
+    assert all(len(issue.get("sample", [])) <= 2 for issue in issues.values())
+
+
+def test_report_does_not_depend_on_the_chunk_size(dirty_files):
+    labels_path, tx_path, _ = dirty_files
+
+    small = build_report(labels_path, tx_path, chunksize=97)
+    whole = build_report(labels_path, tx_path, chunksize=100_000)
+
+    # Only the future date bound, taken from the clock, may differ
+    for report in (small, whole):
+        next(issue for issue in report["issues"] if issue["check"] == "future_date").pop("after")
+    assert small["issues"] == whole["issues"]
+    assert small["summary"]["labels"] == whole["summary"]["labels"]
+    small_tx, whole_tx = small["summary"]["transactions"], whole["summary"]["transactions"]
+    assert small_tx.pop("transactions_per_customer") == whole_tx.pop("transactions_per_customer")
+    assert small_tx == pytest.approx(whole_tx, rel=1e-12)
+
+
+def test_summary_matches_pandas(dirty_files):
+    labels_path, tx_path, tx = dirty_files
+    amount = pd.to_numeric(tx["amount"], errors="coerce")
+    per_customer = tx["customer_id"].value_counts()
+
+    summary = build_report(labels_path, tx_path, chunksize=700)["summary"]["transactions"]
+
+    assert summary["transactions"] == len(tx)
+    assert summary["credit_transactions"] == int((tx["txn_type"] == "credit").sum())
+    assert summary["total_debit_amount"] == pytest.approx(amount[tx["txn_type"] == "debit"].sum(), rel=1e-12)
+    assert summary["net_amount"] == pytest.approx(amount.sum(), rel=1e-12)
+    assert summary["amount_mean"] == pytest.approx(amount.mean(), rel=1e-12)
+    assert summary["amount_std"] == pytest.approx(amount.std(), rel=1e-9)
+    assert summary["transactions_per_customer"] == {
+        "min": int(per_customer.min()),
+        "max": int(per_customer.max()),
+        "mean": pytest.approx(float(per_customer.mean())),
+        "median": float(np.median(per_customer)),
+    }
@@ -0,0 +1,63 @@
+"""The persistent description table must classify like the classifier, reuse earlier runs and stay bounded."""
+
+import numpy as np
+import pandas as pd
+
+from data_prep.description_cache import DescriptionCache
+from data_prep.keywords import KEYWORD_CLASSIFIER, KeywordClassifier
+
+
+def _run(path, descriptions, **kwargs) -> DescriptionCache:
+    cache = DescriptionCache(path, **kwargs)
+    masks = cache.classify(pd.Series(descriptions))
+    np.testing.assert_array_equal(masks, KEYWORD_CLASSIFIER.classify(pd.Series(descriptions)))
+    cache.save()
+    return cache
+
+
+def test_classifies_like_the_classifier(transactions, tmp_path):
+    cache = DescriptionCache(tmp_path / "descriptions.joblib")
+
+    masks = cache.classify(transactions["description"])
+
+    np.testing.assert_array_equal(masks, KEYWORD_CLASSIFIER.classify(transactions["description"]))
+    assert len(cache) == transactions["description"].nunique()
+
+
+def test_later_runs_only_classify_new_descriptions(tmp_path):
+    path = tmp_path / "descriptions.joblib"
+    _run(path, ["ACME PAYROLL", "RENT", None])
+
+    cache = _run(path, ["RENT", "NETFLIX", "ACME PAYROLL"])
+
+    assert cache.new_descriptions == 0
+    assert sorted(cache.categories.index) == ["ACME PAYROLL", "NETFLIX", "RENT"]
+
+
+def test_changed_keywords_discard_the_table(tmp_path):
+    path = tmp_path / "descriptions.joblib"
+    _run(path, ["ACME PAYROLL"])
+
+    cache = DescriptionCache(path, classifier=KeywordClassifier({"salary": ["payroll"]}))
+
+    assert len(cache) == 0
+
+
+def test_entries_not_seen_recently_are_pruned(tmp_path):
+    path = tmp_path / "descriptions.joblib"
+    for reference in ["REF 1", "REF 2", "REF 3"]:
+        cache = _run(path, ["ACME PAYROLL", reference], max_age_runs=2)
+
+    assert sorted(cache.categories.index) == ["ACME PAYROLL", "REF 2", "REF 3"]
+    assert cache.pruned == 1
+    assert len(DescriptionCache(path)) == 3
+
+
+def test_size_cap_keeps_the_most_recently_seen(tmp_path):
+    path = tmp_path / "descriptions.joblib"
+    _run(path, ["OLD 1", "OLD 2"])
+    _run(path, ["OLD 2", "NEW"])
+
+    cache = _run(path, ["NEW"], max_entries=2)
+
+    assert sorted(cache.categories.index) == ["NEW", "OLD 2"]
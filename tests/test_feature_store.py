@@ -0,0 +1,80 @@
+"""The memory-mapped store must return each customer's model inputs and score, and switch versions atomically."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.feature_store import FeatureStore, StoreReader, build_store, model_inputs
+from api.model import FEATURE_NAMES
+from data_prep.prepare_data import build_features
+from data_prep.table_io import read_transactions
+
+
+def _score(X: np.ndarray) -> np.ndarray:
+    return X[:, 0] / 1_000
+
+
+@pytest.fixture
+def features(transactions_csv, labels):
+    return build_features(read_transactions(transactions_csv), labels)
+
+
+def test_lookup_returns_the_customers_inputs_and_score(features, tmp_path):
+    store = FeatureStore(build_store(features, FEATURE_NAMES, _score, "m1", tmp_path))
+
+    assert len(store) == len(features)
+    for _, customer in features.sample(10, random_state=0).iterrows():
+        row = store.find(customer["customer_id"])
+        expected = model_inputs(features[features["customer_id"] == customer["customer_id"]], FEATURE_NAMES)[0]
+        np.testing.assert_array_equal(store.features[row], expected)
+        assert store.scores[row] == _score(expected[None])[0]
+    # Debits are stored as a positive total and missing kw_* inputs as 0
+    assert (store.features[:, FEATURE_NAMES.index("total_debit")] >= 0).all()
+    assert not store.features[:, FEATURE_NAMES.index("kw_rent")].any()
+    assert store.find("CUST_99999") is None and store.find("") is None and store.find("X" * 100) is None
+
+
+def test_duplicate_customers_keep_the_last_row(tmp_path):
+    table = pd.DataFrame({"customer_id": ["B", "A", "B"], "txn_count": [1.0, 2.0, 3.0]})
+
+    store = FeatureStore(build_store(table, ["txn_count"], _score, "m1", tmp_path))
+
+    assert list(store.customer_ids) == [b"A", b"B"]
+    assert store.features[store.find("B"), 0] == 3.0
+
+
+def test_republishing_swaps_the_current_version(features, tmp_path):
+    reader = StoreReader(tmp_path, check_interval=0)
+    assert reader.get() is None
+
+    build_store(features, FEATURE_NAMES, _score, "m1", tmp_path)
+    first = reader.get()
+    build_store(features.assign(txn_count=features["txn_count"] + 1), FEATURE_NAMES, _score, "m2", tmp_path)
+    second = reader.get()
+
+    assert (first.model_version, second.model_version) == ("m1", "m2")
+    # The old version stays readable for readers that have not switched yet
+    row = first.find(features["customer_id"].iloc[0])
+    assert second.features[row, 0] == first.features[row, 0] + 1
+
+    build_store(features, FEATURE_NAMES, _score, "m3", tmp_path)
+    assert len([path for path in tmp_path.iterdir() if path.is_dir() and not path.is_symlink()]) == 2
+    assert reader.get().model_version == "m3"
+
+
+def test_score_customer_endpoint(client, api_app, features, tmp_path, monkeypatch):
+    monkeypatch.setattr(api_app, "store_reader", StoreReader(tmp_path, check_interval=0))
+    assert client.get("/customers/CUST_00001/score").status_code == 503
+
+    loaded = api_app.loaded
+    build_store(features, FEATURE_NAMES, loaded.predict_proba, loaded.version, tmp_path)
+    customer = features["customer_id"].iloc[3]
+    expected = loaded.predict_proba(model_inputs(features.iloc[[3]], FEATURE_NAMES))[0]
+
+    response = client.get(f"/customers/{customer}/score").json()
+    assert response["probability"] == pytest.approx(expected, abs=1e-15) and response["prediction"] == int(expected >= 0.5)
+    assert client.get("/customers/NOBODY/score").status_code == 404
+
+    # A store scored by another model version is rescored with the live model
+    build_store(features, FEATURE_NAMES, _score, "old-model", tmp_path)
+    assert client.get(f"/customers/{customer}/score").json()["probability"] == pytest.approx(expected, abs=1e-15)
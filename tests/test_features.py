@@ -0,0 +1,67 @@
+"""Regression checks for the vectorized feature kernels against plain pandas groupby."""
+
+import numpy as np
+import pandas as pd
+
+from data_prep.features import CustomerSegments
+from data_prep.prepare_data import build_features
+
+
+def _transactions_with_missing_timestamps() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "transaction_id": ["T1", "T2", "T3", "T4", "T5", "T6"],
+            "customer_id": ["C1", "C1", "C1", "C2", "C2", "C3"],
+            "txn_timestamp": pd.to_datetime(
+                ["2024-01-01", None, "2024-02-01", None, "2024-03-05", None]
+            ),
+            "amount": [2500.0, 1200.0, -40.0, 900.0, -15.0, 300.0],
+            "txn_type": ["credit", "credit", "debit", "credit", "debit", "credit"],
+            "description": ["ACME PAYROLL", "ACME PAYROLL", "TESCO", "SALARY", "NETFLIX", "SALARY"],
+        }
+    )
+
+
+def test_min_max_skip_missing_timestamps():
+    tx = _transactions_with_missing_timestamps()
+    segments = CustomerSegments(tx["customer_id"])
+    timestamps = tx["txn_timestamp"].to_numpy()
+    grouped = tx.groupby("customer_id")["txn_timestamp"]
+
+    np.testing.assert_array_equal(segments.min(timestamps), grouped.min().to_numpy())
+    np.testing.assert_array_equal(segments.max(timestamps), grouped.max().to_numpy())
+
+
+def test_monthly_counts_skip_missing_timestamps():
+    tx = _transactions_with_missing_timestamps()
+    segments = CustomerSegments(tx["customer_id"])
+    year_month = (tx["txn_timestamp"].dt.year * 12 + tx["txn_timestamp"].dt.month).to_numpy()
+    is_credit = (tx["amount"] > 0).to_numpy()
+
+    months, _ = segments.monthly_counts(year_month, np.ones(len(tx)), is_credit)
+
+    expected = tx[is_credit].assign(year_month=year_month[is_credit]).groupby("customer_id")["year_month"].nunique()
+    np.testing.assert_array_equal(months, expected.reindex(segments.customers, fill_value=0).to_numpy())
+
+
+def test_build_features_with_missing_timestamps():
+    tx = _transactions_with_missing_timestamps()
+    labels = pd.DataFrame({"customer_id": ["C1", "C2", "C3"], "defaulted_within_90d": [0, 1, 0]})
+
+    features = build_features(tx, labels).set_index("customer_id")
+
+    assert features.loc["C1", "days_since_last_credit"] == 64
+    assert features["income_stability_ratio"].notna().loc[["C1", "C2"]].all()
+
+
+def test_sum_and_count_match_groupby(transactions):
+    segments = CustomerSegments(transactions["customer_id"])
+    amount = transactions["amount"].to_numpy()
+    is_credit = amount > 0
+    credits = transactions[is_credit].groupby("customer_id")
+
+    np.testing.assert_array_equal(segments.count(), transactions.groupby("customer_id").size().to_numpy())
+    np.testing.assert_array_equal(segments.count(is_credit), credits.size().reindex(segments.customers, fill_value=0))
+    # Bit-identical to summing each customer's rows with Series.sum, not merely close
+    expected = credits["amount"].apply(lambda values: values.sum()).reindex(segments.customers, fill_value=0.0)
+    np.testing.assert_array_equal(segments.sum(amount, is_credit), expected.to_numpy())
@@ -0,0 +1,137 @@
+"""The hash indexes must answer like a Python set or Counter, whether their runs are in memory, spilled or reopened."""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_quality.id_index
+from data_quality.id_index import INDEX_FORMAT, HashCounts, HashIndex, hash_ids, hash_rows
+
+
+def batches(count: int = 40, size: int = 60, seed: int = 0) -> list[np.ndarray]:
+    """Hash batches that repeat values within and across batches."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 1_500, size).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15) for _ in range(count)]
+
+
+def add_like_a_set(index: HashIndex, batches: list[np.ndarray], seen: set | None = None) -> None:
+    seen = set() if seen is None else set(seen)
+    for batch in batches:
+        expected = []
+        for value in batch.tolist():
+            expected.append(value in seen)
+            seen.add(value)
+
+        np.testing.assert_array_equal(index.add(batch), expected)
+
+    assert len(index) == len(seen)
+    np.testing.assert_array_equal(index.values(), np.array(sorted(seen), dtype=np.uint64))
+
+
+@pytest.mark.parametrize("memory_limit", [10_000, 50], ids=["in-memory", "spilled"])
+def test_add_reports_duplicates_like_a_set(monkeypatch, memory_limit):
+    # Small blocks, so disk merges go through several blocks
+    monkeypatch.setattr(data_quality.id_index, "MERGE_BLOCK", 7)
+    index = HashIndex(memory_limit=memory_limit)
+
+    add_like_a_set(index, batches())
+
+    runs = list(index.directory.glob("run-*.npy"))
+    assert (len(runs) > 0) == (memory_limit == 50) and len(runs) <= 12
+    probe = np.concatenate([batches(1, seed=1)[0], index.values()[:5]])
+    np.testing.assert_array_equal(index.contains(probe), np.isin(probe, index.values()))
+    index.close()
+    assert not index.directory.exists()
+
+
+def test_saved_index_is_reopened(tmp_path):
+    first, later = batches(seed=2)[:20], batches(seed=2)[20:]
+    index = HashIndex.open(tmp_path, memory_limit=100)
+    add_like_a_set(index, first)
+    index.applied.append("transactions_2025-01-01.csv")
+    index.save()
+    index.close()
+
+    reopened = HashIndex.open(tmp_path, memory_limit=100)
+
+    assert reopened.applied == ["transactions_2025-01-01.csv"]
+    np.testing.assert_array_equal(reopened.values(), np.unique(np.concatenate(first)))
+    add_like_a_set(reopened, later, seen=np.concatenate(first).tolist())
+    reopened.save()
+    assert len(HashIndex.open(tmp_path)) == len(np.unique(np.concatenate(first + later)))
+    # Only the saved runs remain
+    assert sorted(path.name for path in tmp_path.glob("run-*.npy")) == sorted(name for name, _ in reopened._disk)
+
+
+def test_unsaved_additions_are_dropped_on_reopen(tmp_path):
+    index = HashIndex.open(tmp_path, memory_limit=10)
+    index.add(batches(1)[0])
+    index.save()
+    saved = index.values()
+    index.add(batches(5, seed=3)[0])
+    index.spill()
+
+    reopened = HashIndex.open(tmp_path)
+
+    np.testing.assert_array_equal(reopened.values(), saved)
+    assert len(list(tmp_path.glob("run-*.npy"))) == len(reopened._disk)
+
+
+def test_other_format_is_refused(tmp_path):
+    index = HashIndex.open(tmp_path)
+    index.save()
+    meta = (tmp_path / "meta.json").read_text().replace(f'"format": {INDEX_FORMAT}', f'"format": {INDEX_FORMAT + 1}')
+    (tmp_path / "meta.json").write_text(meta)
+
+    with pytest.raises(ValueError, match="rebuild"):
+        HashIndex.open(tmp_path)
+
+
+def test_counts_match_a_counter():
+    rng = np.random.default_rng(4)
+    ids = [rng.integers(0, 300, 500) for _ in range(6)]
+    left, right = HashCounts(), HashCounts()
+
+    for i, chunk in enumerate(ids):
+        values, counts = np.unique(chunk, return_counts=True)
+        (left if i % 2 else right).add(values.astype(np.uint64), counts)
+    left.merge(right)
+
+    expected = Counter(np.concatenate(ids).tolist())
+    np.testing.assert_array_equal(left.counts(), [expected[key] for key in sorted(expected)])
+    assert HashCounts().counts().size == 0
+
+
+def test_ids_hash_by_their_text():
+    ids = pd.Series(["0001", "1", "CUST_00001"])
+
+    hashes = hash_ids(ids)
+
+    assert len(set(hashes.tolist())) == 3
+    np.testing.assert_array_equal(hash_ids(pd.Series([1, 2])), hash_ids(pd.Series(["1", "2"])))
+    np.testing.assert_array_equal(hash_ids(ids.astype("category")), hashes)
+
+
+def test_rows_hash_the_same_in_every_format():
+    df = pd.DataFrame(
+        {
+            "transaction_id": ["T1", "T2", "T3", None],
+            "amount": [12.0, -0.0, 3.5, np.nan],
+            "txn_timestamp": pd.to_datetime(["2025-01-01 00:00:00", "2025-01-02 10:00:00", None, "2025-01-04 00:00:00"]),
+        }
+    )
+    other = pd.DataFrame(
+        {
+            "txn_timestamp": df["txn_timestamp"].astype("datetime64[s]"),
+            "amount": pd.array([12, 0, 3.5, None], dtype="Float64"),
+            "transaction_id": df["transaction_id"].astype("category"),
+        }
+    )
+
+    np.testing.assert_array_equal(hash_rows(df), hash_rows(other))
+    np.testing.assert_array_equal(hash_rows(pd.DataFrame({"amount": [12, 0]})), hash_rows(pd.DataFrame({"amount": [12.0, -0.0]})))
+    assert len(set(hash_rows(df).tolist())) == len(df)
+    # Values are tied to their column
+    assert hash_rows(pd.DataFrame({"a": ["x"], "b": ["y"]}))[0] != hash_rows(pd.DataFrame({"a": ["y"], "b": ["x"]}))[0]
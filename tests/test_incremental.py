@@ -0,0 +1,44 @@
+"""Folding daily deltas into the stored state must give the same features as a build over the full history."""
+
+import pandas as pd
+import pytest
+
+from data_prep.incremental import load_state, update_state
+from data_prep.prepare_data import build_features
+from data_prep.table_io import read_transactions
+
+
+def _split_by_day(transactions: pd.DataFrame, tmp_path, days: list[str]) -> list:
+    """History up to the first day, then one delta file per later day boundary."""
+    timestamps = pd.to_datetime(transactions["txn_timestamp"])
+    bounds = [pd.Timestamp.min] + [pd.Timestamp(day) for day in days] + [pd.Timestamp.max]
+    paths = []
+    for i, (lo, hi) in enumerate(zip(bounds, bounds[1:])):
+        path = tmp_path / f"delta-{i}.csv"
+        transactions[(timestamps >= lo) & (timestamps < hi)].to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("chunksize", [None, 700])
+def test_deltas_match_full_build(transactions, transactions_csv, labels, tmp_path, chunksize):
+    state_path = tmp_path / "state.joblib"
+
+    for path in _split_by_day(transactions, tmp_path, ["2025-03-01", "2025-04-15"]):
+        state = update_state(state_path, path, chunksize=chunksize)
+
+    expected = build_features(read_transactions(transactions_csv), labels)
+    pd.testing.assert_frame_equal(state.finalize(labels), expected, check_exact=True)
+    pd.testing.assert_frame_equal(load_state(state_path)[0].finalize(labels), expected, check_exact=True)
+
+
+def test_applied_file_is_skipped(transactions, labels, tmp_path):
+    state_path = tmp_path / "state.joblib"
+    history, delta = _split_by_day(transactions, tmp_path, ["2025-04-01"])
+    update_state(state_path, history)
+    once = update_state(state_path, delta).finalize(labels)
+
+    twice = update_state(state_path, delta).finalize(labels)
+
+    pd.testing.assert_frame_equal(twice, once)
+    assert len(load_state(state_path)[1]) == 2
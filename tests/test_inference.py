@@ -0,0 +1,56 @@
+"""Model calls run on the inference threads, and requests beyond the queue bound are shed with a 503."""
+
+import asyncio
+import threading
+
+import pytest
+from conftest import feature_rows
+
+from api.inference import BoundedExecutor, Overloaded
+
+
+def test_runs_off_the_event_loop_thread():
+    executor = BoundedExecutor(workers=1, max_queue=1)
+
+    async def run():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(run()).startswith("inference")
+        assert executor.stats()["completed"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_when_the_queue_is_full():
+    executor = BoundedExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        # One job running and one waiting fill the executor
+        held = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(Overloaded):
+            await executor.run(lambda: None)
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(*held)
+        return stats
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert (stats["running"], stats["queued"], stats["rejected"]) == (1, 1, 1)
+    assert executor.stats()["completed"] == 2 and executor.depth == 0
+
+
+def test_full_executor_answers_503(client, api_app, monkeypatch):
+    executor = api_app.executor
+    monkeypatch.setattr(executor, "depth", executor.workers + executor.max_queue)
+
+    response = client.post("/predict_batch", json=feature_rows(3))
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,67 @@
+"""The one-scan classifier must flag the same rows as cleaning each row and matching each family with str.contains."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_prep.keywords import KEYWORD_CLASSIFIER, KEYWORD_FAMILIES, KeywordClassifier, clean_joined, clean_text
+
+DESCRIPTIONS = pd.Series(
+    [
+        "ACME PAYROLL",
+        "Salary - June",
+        "BET365",
+        "betting shop",
+        "Netflix.com",
+        "AMAZON   PRIME video",
+        "amazon",
+        "RENT-A-CAR",
+        "council tax / mortgage",
+        "crypto.com exchange",
+        "",
+        None,
+        "DWP\x00payment",
+        "hulu",
+        "prime amazon",
+    ]
+)
+
+
+def _row_by_row(descriptions: pd.Series) -> dict[str, np.ndarray]:
+    """Per-family flags computed the way the original pipeline did."""
+    cleaned = descriptions.fillna("").apply(clean_text)
+    flags = {}
+    for name, keywords in KEYWORD_FAMILIES.items():
+        pattern = "|".join(r"\b" + kw.replace(" ", r"\s+") + r"\b" for kw in keywords)
+        flags[name] = cleaned.str.contains(pattern, case=False, na=False).to_numpy()
+    return flags
+
+
+def test_clean_joined_matches_clean_text():
+    expected = "\x00".join(clean_text(text.replace("\x00", " ")) for text in DESCRIPTIONS.fillna(""))
+
+    assert clean_joined(DESCRIPTIONS) == expected
+
+
+@pytest.mark.parametrize("name", list(KEYWORD_FAMILIES))
+def test_classifier_matches_row_by_row(name):
+    masks = KEYWORD_CLASSIFIER.classify(DESCRIPTIONS)
+
+    np.testing.assert_array_equal(KEYWORD_CLASSIFIER.has(masks, name), _row_by_row(DESCRIPTIONS)[name])
+
+
+def test_classifier_on_synthetic_descriptions(transactions):
+    descriptions = transactions["description"]
+    masks = KEYWORD_CLASSIFIER.classify(descriptions)
+
+    for name, expected in _row_by_row(descriptions).items():
+        np.testing.assert_array_equal(KEYWORD_CLASSIFIER.has(masks, name), expected)
+
+
+def test_prefix_keywords_set_every_family():
+    classifier = KeywordClassifier({"short": ["amazon"], "long": ["amazon prime"]})
+
+    masks = classifier.classify(pd.Series(["amazon prime", "amazon", "prime"]))
+
+    np.testing.assert_array_equal(classifier.has(masks, "short"), [True, True, False])
+    np.testing.assert_array_equal(classifier.has(masks, "long"), [True, False, False])
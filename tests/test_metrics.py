@@ -0,0 +1,104 @@
+"""/metrics must sum counters and histograms over every worker's file, and gauges over live workers only."""
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from api.metrics import BUCKETS, Metrics, RequestMetrics
+
+DEAD_PID = 4_194_305  # above the kernel's largest pid
+
+
+def _metrics(directory=None) -> tuple[Metrics, int, int, int]:
+    metrics = Metrics(directory)
+    requests = metrics.counter("requests_total", "Requests.").slot()
+    in_flight = metrics.gauge("in_flight", "In flight.").slot()
+    latency = metrics.histogram("latency_seconds", "Latency.", ("endpoint",)).slot("/predict")
+    return metrics, requests, in_flight, latency
+
+
+def _series(text: str) -> dict[str, float]:
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if not line.startswith("#")}
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics, _, _, latency = _metrics()
+    for seconds in (0.0001, 0.003, 0.003, 20.0):
+        metrics.observe(latency, seconds)
+
+    series = _series(metrics.render())
+
+    assert series['latency_seconds_bucket{endpoint="/predict",le="0.0001"}'] == 1
+    assert series['latency_seconds_bucket{endpoint="/predict",le="0.005"}'] == 3
+    assert series[f'latency_seconds_bucket{{endpoint="/predict",le="{BUCKETS[-1]}"}}'] == 3
+    assert series['latency_seconds_bucket{endpoint="/predict",le="+Inf"}'] == 4
+    assert series['latency_seconds_count{endpoint="/predict"}'] == 4
+    assert series['latency_seconds_sum{endpoint="/predict"}'] == 0.0001 + 0.003 + 0.003 + 20.0
+
+
+def test_workers_are_summed_and_dead_workers_keep_only_their_totals(tmp_path):
+    metrics, requests, in_flight, latency = _metrics(tmp_path)
+    metrics.start()
+    metrics.inc(requests, 3)
+    metrics.inc(in_flight, 2)
+    metrics.observe(latency, 0.003)
+    metrics.set_info("model", "v1")
+    # Files of another live worker and of one that has exited
+    other = np.zeros(metrics.size)
+    other[[requests, in_flight]] = [5, 1]
+    other.tofile(tmp_path / f"{DEAD_PID}.metrics")
+    other.tofile(tmp_path / "1.metrics")
+    np.zeros(metrics.size + 1).tofile(tmp_path / "2.metrics")
+
+    series = _series(metrics.render())
+
+    assert series["requests_total"] == 3 + 5 + 5
+    assert series["in_flight"] == 2 + 1
+    assert series['latency_seconds_count{endpoint="/predict"}'] == 1
+
+
+def test_restarted_worker_keeps_its_counters_and_resets_its_gauges(tmp_path):
+    first, requests, in_flight, _ = _metrics(tmp_path)
+    first.start()
+    first.inc(requests, 4)
+    first.inc(in_flight)
+
+    second, requests, in_flight, _ = _metrics(tmp_path)
+    second.inc(requests)
+    second.start()
+
+    assert (second.values[requests], second.values[in_flight]) == (5, 0)
+
+
+def test_status_classes_are_counted():
+    metrics = Metrics()
+    app = FastAPI()
+    app.router.route_class = RequestMetrics(metrics).route_class
+
+    @app.get("/status/{code}")
+    async def status(code: int):
+        return Response(status_code=code)
+
+    client = TestClient(app)
+    for code in (200, 204, 404, 503, 299, 600):
+        client.get(f"/status/{code}")
+
+    series = _series(metrics.render())
+
+    assert series['api_requests_total{endpoint="/status/{code}",status="2xx"}'] == 3
+    assert series['api_requests_total{endpoint="/status/{code}",status="4xx"}'] == 1
+    assert series['api_requests_total{endpoint="/status/{code}",status="5xx"}'] == 1
+    assert series['api_requests_total{endpoint="/status/{code}",status="other"}'] == 1
+    assert series['api_errors_total{endpoint="/status/{code}",error="not_found"}'] == 1
+    assert series['api_errors_total{endpoint="/status/{code}",error="unavailable"}'] == 1
+    assert series['api_errors_total{endpoint="/status/{code}",error="other"}'] == 1
+    assert series["api_requests_in_flight"] == 0
+
+
+def test_metrics_endpoint_counts_requests(client):
+    client.get("/health")
+
+    series = _series(client.get("/metrics").text)
+
+    assert series['api_requests_total{endpoint="/health",status="2xx"}'] >= 1
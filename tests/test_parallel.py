@@ -0,0 +1,29 @@
+"""The hash-partitioned build must return exactly the serial feature table."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_prep.parallel import build_features_parallel, partition_ids
+from data_prep.prepare_data import build_features
+from data_prep.table_io import read_transactions
+
+
+@pytest.mark.parametrize("workers, windows", [(2, []), (3, [7, 30])])
+def test_parallel_matches_serial(transactions_csv, labels, workers, windows):
+    tx = read_transactions(transactions_csv)
+
+    result = build_features_parallel(tx, labels, workers=workers, windows=windows)
+
+    pd.testing.assert_frame_equal(result, build_features(tx, labels, windows=windows), check_exact=True)
+
+
+def test_partition_ids_do_not_depend_on_dtype(transactions):
+    customer_id = transactions["customer_id"]
+
+    ids = partition_ids(customer_id, 4)
+
+    np.testing.assert_array_equal(ids, partition_ids(customer_id.astype("category"), 4))
+    assert set(np.unique(ids)) == {0, 1, 2, 3}
+    # Every customer lands in exactly one partition
+    assert (pd.Series(ids).groupby(customer_id.to_numpy()).nunique() == 1).all()
@@ -0,0 +1,135 @@
+"""Reads through the parse cache must equal reads of the CSV, and entries must follow the content of their source."""
+
+import os
+
+import pandas as pd
+import pytest
+from conftest import dirty_transactions, synthetic_transactions
+
+from data_prep.columns import RAW_LABEL_TYPES, RAW_TRANSACTION_TYPES, TRANSACTION_COLUMNS
+from data_prep.parse_cache import ParseCache
+from data_prep.prepare_data import build_features
+from data_prep.table_io import iter_transactions, read_table, read_transactions
+from data_quality.engine import build_report
+
+RANGE = {"since": "2025-02-01", "until": "2025-03-15 12:00:00"}
+
+
+def entries(directory) -> list[str]:
+    return sorted(path.name for path in directory.glob("*.arrow"))
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+@pytest.mark.parametrize("time_range", [{}, RANGE], ids=["all", "range"])
+def test_cached_reads_equal_csv_reads(transactions_csv, labels, tmp_path, engine, time_range):
+    cache = ParseCache(tmp_path / "cache", engine=engine)
+
+    cached = read_transactions(transactions_csv, columns=TRANSACTION_COLUMNS, parse_cache=cache, **time_range)
+    chunks = list(iter_transactions(transactions_csv, 700, columns=TRANSACTION_COLUMNS, parse_cache=cache, **time_range))
+
+    # The CSV reader infers microseconds; the cache stores nanoseconds
+    plain = read_transactions(transactions_csv, columns=TRANSACTION_COLUMNS, **time_range).astype({"txn_timestamp": "datetime64[ns]"})
+    pd.testing.assert_frame_equal(cached, plain.reset_index(drop=True), check_exact=True)
+    assert [len(chunk) for chunk in chunks[:-1]] == [700] * (len(chunks) - 1)
+    # Chunks have their own categories
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True).astype(cached.dtypes.to_dict()), cached, check_exact=True)
+    pd.testing.assert_frame_equal(build_features(cached, labels), build_features(plain, labels), check_exact=True)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_engines_build_the_same_entry(transactions_csv, tmp_path):
+    c, arrow = ParseCache(tmp_path / "c"), ParseCache(tmp_path / "arrow", engine="pyarrow")
+
+    c_path, c_record = c.entry(transactions_csv, RAW_TRANSACTION_TYPES)
+    arrow_path, arrow_record = arrow.entry(transactions_csv, RAW_TRANSACTION_TYPES)
+
+    assert c_path.name == arrow_path.name and c_record["integer"] == arrow_record["integer"]
+    pd.testing.assert_frame_equal(pd.read_feather(c_path), pd.read_feather(arrow_path))
+
+
+def test_unparseable_values_keep_their_text(tmp_path):
+    path = tmp_path / "transactions.csv"
+    dirty_transactions().to_csv(path, index=False)
+    labels_path = tmp_path / "labels.csv"
+    pd.DataFrame({"customer_id": ["0001", "0002"], "defaulted_within_90d": [0, 1]}).to_csv(labels_path, index=False)
+    cache = ParseCache(tmp_path / "cache")
+
+    cached = cache.read_table(path, RAW_TRANSACTION_TYPES)
+    labels = cache.read_table(labels_path, RAW_LABEL_TYPES)
+
+    raw = pd.read_csv(path, dtype=str)
+    assert cached.loc[5, "amount"] == "abc" and cached.loc[20, "txn_timestamp"] == "not a date"
+    assert cached.loc[6, "amount"] == float(raw.loc[6, "amount"])
+    assert cached["customer_id"].isna().sum() == raw["customer_id"].isna().sum()
+    assert labels["customer_id"].tolist() == ["0001", "0002"] and labels["defaulted_within_90d"].dtype == "int64"
+
+
+def test_data_quality_report_is_the_same_through_the_cache(tmp_path):
+    labels_path, tx_path = tmp_path / "labels.csv", tmp_path / "transactions.csv"
+    pd.DataFrame({"customer_id": [f"CUST_{i:05d}" for i in range(200)], "defaulted_within_90d": 0}).to_csv(labels_path, index=False)
+    dirty_transactions().to_csv(tx_path, index=False)
+
+    cached = build_report(labels_path, tx_path, chunksize=500, parse_cache=tmp_path / "cache")
+    plain = build_report(labels_path, tx_path, chunksize=500)
+
+    for report in (cached, plain):
+        next(issue for issue in report["issues"] if issue["check"] == "future_date").pop("after")
+    assert cached["issues"] == plain["issues"]
+    assert cached["summary"] == plain["summary"]
+    assert cached["parse_cache"]["parsed"] == 2
+
+
+def test_entries_follow_the_source_content(transactions_csv, tmp_path):
+    directory = tmp_path / "cache"
+    ParseCache(directory).entry(transactions_csv, RAW_TRANSACTION_TYPES)
+    first = entries(directory)
+
+    # Touched but identical: still a hit, by content
+    stat = transactions_csv.stat()
+    os.utime(transactions_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    touched = ParseCache(directory)
+    touched.entry(transactions_csv, RAW_TRANSACTION_TYPES)
+    assert (touched.hits, touched.misses) == (1, 0)
+
+    # New content: parsed again, and the old entry is evicted
+    synthetic_transactions(300, seed=7).to_csv(transactions_csv, index=False)
+    changed = ParseCache(directory)
+    assert len(changed.read_table(transactions_csv, RAW_TRANSACTION_TYPES)) == 300
+    assert changed.misses == 1 and len(entries(directory)) == 1 and entries(directory) != first
+
+    # A second typing profile of the same file is its own entry
+    ParseCache(directory).entry(transactions_csv, {"text": TRANSACTION_COLUMNS, "numeric": [], "timestamps": []})
+    assert len(entries(directory)) == 2
+
+
+def test_least_recently_used_entries_are_dropped_over_max_bytes(tmp_path):
+    sources = []
+    for seed in range(3):
+        path = tmp_path / f"transactions_{seed}.csv"
+        synthetic_transactions(2_000, seed=seed).to_csv(path, index=False)
+        sources.append(path)
+    directory = tmp_path / "cache"
+    ParseCache(directory).entry(sources[0], RAW_TRANSACTION_TYPES)
+    size = sum(path.stat().st_size for path in directory.glob("*.arrow"))
+    cache = ParseCache(directory, max_bytes=int(2.5 * size))
+
+    cache.entry(sources[1], RAW_TRANSACTION_TYPES)
+    cache.entry(sources[0], RAW_TRANSACTION_TYPES)
+    cache.entry(sources[2], RAW_TRANSACTION_TYPES)
+
+    # The entry of sources[1] was the least recently used
+    assert len(entries(directory)) == 2
+    cache.entry(sources[0], RAW_TRANSACTION_TYPES)
+    cache.entry(sources[2], RAW_TRANSACTION_TYPES)
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_binary_sources_bypass_the_cache(transactions, tmp_path):
+    path = tmp_path / "transactions.parquet"
+    transactions.assign(txn_timestamp=pd.to_datetime(transactions["txn_timestamp"])).to_parquet(path)
+    cache = ParseCache(tmp_path / "cache")
+
+    cached = cache.read_table(path, RAW_TRANSACTION_TYPES, columns=["customer_id", "amount"], **RANGE)
+
+    pd.testing.assert_frame_equal(cached, read_table(path, columns=["customer_id", "amount"], **RANGE))
+    assert (cache.hits, cache.misses) == (0, 0) and not (tmp_path / "cache").exists()
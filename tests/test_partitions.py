@@ -0,0 +1,94 @@
+"""A transactions file split into partitions must give the report of the single file, whatever the workers and formats."""
+
+import pandas as pd
+import pytest
+from conftest import dirty_transactions, synthetic_labels, synthetic_transactions
+
+from data_quality.engine import build_report
+
+
+def split(tx: pd.DataFrame, directory, formats: list[str]) -> None:
+    """Write `tx` as consecutive partitions, one per format, in file order."""
+    directory.mkdir()
+    size = -(-len(tx) // len(formats))
+    for i, fmt in enumerate(formats):
+        part = tx.iloc[i * size : (i + 1) * size].reset_index(drop=True)
+        path = directory / f"part-{i}.{fmt}"
+        if fmt == "csv":
+            part.to_csv(path, index=False)
+        else:
+            getattr(part, f"to_{fmt}")(path)
+
+
+def assert_same_report(partitioned: dict, single: dict) -> None:
+    """Everything but the clock-derived future date bound matches; float totals up to summation order."""
+    for report in (partitioned, single):
+        for issue in report["issues"]:
+            issue.pop("after", None)
+    assert partitioned["issues"] == single["issues"]
+    assert partitioned["profile"] == single["profile"]
+    assert partitioned["summary"]["labels"] == single["summary"]["labels"]
+    partitioned_tx, single_tx = dict(partitioned["summary"]["transactions"]), dict(single["summary"]["transactions"])
+    assert partitioned_tx.pop("transactions_per_customer") == single_tx.pop("transactions_per_customer")
+    assert partitioned_tx == pytest.approx(single_tx, rel=1e-12)
+    assert partitioned["files"]["transactions"]["rows"] == single["files"]["transactions"]["rows"]
+
+
+def duplicates(report: dict) -> dict[str, int]:
+    return {issue["check"]: issue["count"] for issue in report["issues"] if issue["check"].startswith("duplicate")}
+
+
+@pytest.fixture
+def labels_csv(tmp_path):
+    path = tmp_path / "labels.csv"
+    synthetic_labels(200).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_partitions_match_the_single_file(tmp_path, labels_csv, workers):
+    tx = dirty_transactions()
+    tx.to_csv(tmp_path / "transactions.csv", index=False)
+    split(tx, tmp_path / "parts", ["csv"] * 4)
+
+    single = build_report(labels_csv, tmp_path / "transactions.csv", chunksize=400)
+    partitioned = build_report(labels_csv, tmp_path / "parts", chunksize=400, workers=workers)
+
+    assert partitioned["files"]["transactions"]["partitions"] == 4
+    # The copies and reused IDs at the end repeat rows of the first partition
+    assert duplicates(partitioned) == {"duplicate_rows": 3, "duplicate_keys": 5}
+    assert_same_report(partitioned, single)
+
+
+def test_partitions_may_mix_formats(tmp_path, labels_csv):
+    tx = synthetic_transactions(3_000)
+    tx = pd.concat([tx, tx.iloc[[5, 900, 1_700]]], ignore_index=True)
+    tx["txn_timestamp"] = pd.to_datetime(tx["txn_timestamp"]).astype("datetime64[ns]")
+    tx.to_csv(tmp_path / "transactions.csv", index=False)
+    split(tx, tmp_path / "parts", ["csv", "parquet", "feather", "csv"])
+
+    single = build_report(labels_csv, tmp_path / "transactions.csv", chunksize=400)
+    partitioned = build_report(labels_csv, tmp_path / "parts", chunksize=400, workers=2)
+
+    assert duplicates(partitioned) == {"duplicate_rows": 3, "duplicate_keys": 3}
+    assert_same_report(partitioned, single)
+
+
+def test_partitions_are_added_to_the_id_index_once(tmp_path, labels_csv):
+    tx = dirty_transactions()
+    split(tx, tmp_path / "parts", ["csv"] * 4)
+    index = tmp_path / "ids"
+
+    first = build_report(labels_csv, tmp_path / "parts", chunksize=400, id_index=index, workers=2)
+    again = build_report(labels_csv, tmp_path / "parts", chunksize=400, id_index=index, workers=2)
+    # A new day reusing two known IDs
+    tx.iloc[[0, 1]].assign(amount="9.99").to_csv(tmp_path / "parts" / "part-4.csv", index=False)
+    later = build_report(labels_csv, tmp_path / "parts", chunksize=400, id_index=index, workers=2)
+
+    distinct = tx["transaction_id"].nunique()
+    assert first["files"]["transactions"]["id_index"] == {"path": str(index), "ids_before": 0, "ids_after": distinct, "files": 4, "already_applied": 0}
+    assert again["files"]["transactions"]["id_index"]["already_applied"] == 4
+    assert duplicates(again)["duplicate_keys"] == duplicates(first)["duplicate_keys"] == 5
+    assert later["files"]["transactions"]["id_index"]["already_applied"] == 4
+    assert later["files"]["transactions"]["id_index"]["ids_after"] == distinct
+    assert duplicates(later)["duplicate_keys"] == 5 + 2
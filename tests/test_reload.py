@@ -0,0 +1,87 @@
+"""Hot reload must swap in a new model object when model.joblib changes and keep serving the old one on failure."""
+
+import asyncio
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from api.cache import PredictionCache
+from api.model import FEATURE_NAMES, MODEL_PATH, LoadedModel
+
+
+@pytest.fixture
+def reloading(api_app, tmp_path, monkeypatch):
+    """The app serving a copy of the model in tmp_path, checked for changes every 10 ms."""
+    path = tmp_path / "model.joblib"
+    shutil.copy(MODEL_PATH, path)
+    for name in ("loaded", "reloads", "reload_failures"):
+        monkeypatch.setattr(api_app, name, getattr(api_app, name))
+    monkeypatch.setattr(api_app, "MODEL_PATH", path)
+    monkeypatch.setattr(api_app, "MODEL_RELOAD_INTERVAL_S", 0.01)
+    monkeypatch.setattr(api_app, "prediction_cache", PredictionCache())
+    serving = api_app.loaded
+    api_app.use_model(LoadedModel(path))
+    yield path
+    api_app.metrics.set_info("api_model_info", serving.version)
+
+
+def _watch_until(api_app, done) -> None:
+    async def run():
+        task = asyncio.create_task(api_app.watch_model())
+        try:
+            for _ in range(500):
+                await asyncio.sleep(0.01)
+                if done():
+                    return
+            raise AssertionError("reload did not happen")
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+def _bump_mtime(path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_touched_file_swaps_in_a_new_object_of_the_same_version(api_app, reloading):
+    before = api_app.loaded
+    api_app.prediction_cache.put(("row",), 0.5, before.version)
+    _bump_mtime(reloading)
+
+    _watch_until(api_app, lambda: api_app.loaded is not before)
+
+    assert api_app.loaded.version == before.version and api_app.loaded.modified != before.modified
+    assert api_app.reloads == 0
+    # Same content, so cached scores stay valid
+    assert api_app.prediction_cache.get(("row",)) == 0.5
+
+
+def test_new_model_is_served_after_reload(api_app, reloading, client):
+    before = api_app.loaded
+    api_app.prediction_cache.put(("row",), 0.5, before.version)
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((200, len(FEATURE_NAMES)))
+    new_model = LogisticRegression().fit(X, (X[:, 0] > 0).astype(int))
+    joblib.dump(new_model, reloading)
+    _bump_mtime(reloading)
+
+    _watch_until(api_app, lambda: api_app.loaded.version != before.version)
+
+    assert api_app.reloads == 1 and len(api_app.prediction_cache) == 0
+    assert client.get("/stats").json()["model"]["version"] == api_app.loaded.version
+    np.testing.assert_allclose(api_app.loaded.predict_proba(X), new_model.predict_proba(X)[:, 1], rtol=1e-9)
+
+
+def test_broken_file_keeps_the_current_model(api_app, reloading):
+    before = api_app.loaded
+    reloading.write_bytes(b"half-written")
+
+    _watch_until(api_app, lambda: api_app.reload_failures > 0)
+
+    assert api_app.loaded is before and api_app.reloads == 0
@@ -0,0 +1,80 @@
+"""The NumPy export must reproduce sklearn's probabilities, and only be used when it does."""
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from api.scorer import NumpyScorer, agrees, compile_model, export_scorer, file_fingerprint, load_scorer, probe_inputs
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((400, 9)) * [1, 100, 100, 50, 1, 1, 1, 1, 1]
+    y = (X[:, 0] + X[:, 1] / 100 + rng.standard_normal(400) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        LogisticRegression(max_iter=1_000),
+        DecisionTreeClassifier(max_depth=6, random_state=0),
+        RandomForestClassifier(n_estimators=15, max_depth=5, random_state=0),
+        ExtraTreesClassifier(n_estimators=15, random_state=0),
+    ],
+    ids=["logistic", "tree", "forest", "extra-trees"],
+)
+def test_scorer_matches_sklearn(training_data, model):
+    X, y = training_data
+    model.fit(X, y)
+
+    scorer = compile_model(model)
+
+    assert scorer is not None
+    probe = probe_inputs(scorer)
+    np.testing.assert_allclose(scorer.predict_proba(probe), model.predict_proba(probe)[:, 1], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X)[:, 1], rtol=1e-9, atol=1e-12)
+
+
+def test_unsupported_model_stays_on_sklearn(training_data):
+    X, y = training_data
+    model = GradientBoostingClassifier(n_estimators=5).fit(X, y)
+
+    assert export_scorer(model) is None
+    assert compile_model(model) is None
+
+
+def test_disagreeing_export_is_rejected(training_data):
+    X, y = training_data
+    model = LogisticRegression(max_iter=1_000).fit(X, y)
+    scorer = export_scorer(model)
+    scorer._intercept += 0.01
+
+    assert not agrees(scorer, model, probe_inputs(scorer))
+
+
+def test_artifact_is_tied_to_its_model_file(training_data, tmp_path):
+    X, y = training_data
+    model_path, other_path, scorer_path = tmp_path / "model.joblib", tmp_path / "other.joblib", tmp_path / "model_scorer.npz"
+    joblib.dump(LogisticRegression(max_iter=1_000).fit(X, y), model_path)
+    joblib.dump(LogisticRegression(max_iter=1_000, C=0.1).fit(X, y), other_path)
+    compile_model(joblib.load(model_path), source=file_fingerprint(model_path)).save(scorer_path)
+
+    loaded = load_scorer(scorer_path, model_path)
+
+    assert isinstance(loaded, NumpyScorer)
+    np.testing.assert_array_equal(loaded.predict_proba(X), compile_model(joblib.load(model_path)).predict_proba(X))
+    assert load_scorer(scorer_path, other_path) is None
+    assert load_scorer(tmp_path / "missing.npz", model_path) is None
+
+
+def test_shipped_model_is_served_by_the_verified_scorer(api_app):
+    loaded = api_app.loaded
+    X = probe_inputs(loaded.scorer)
+
+    assert loaded.scorer is not None and loaded.scorer.kind == "linear"
+    np.testing.assert_allclose(loaded.predict_proba(X), loaded.model.predict_proba(X)[:, 1], rtol=1e-9, atol=1e-12)
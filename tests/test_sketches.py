@@ -0,0 +1,135 @@
+"""The sketches must stay within their error bounds, and merging sketches of parts must equal the sketch of the whole."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import synthetic_transactions
+
+from data_quality.profile import TransactionProfile, compare_profiles
+from data_quality.sketches import RELATIVE_ACCURACY, DistinctSketch, QuantileSketch, TopK
+
+
+def parts(data, n: int) -> list:
+    """`n` consecutive slices of a Series or DataFrame."""
+    bounds = np.linspace(0, len(data), n + 1).astype(int)
+    return [data.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+@pytest.fixture(scope="module")
+def amounts() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    magnitudes = rng.lognormal(3, 2, 50_000)
+    values = np.where(rng.random(50_000) < 0.3, -magnitudes, magnitudes)
+    values[:100] = 0.0
+    values[100:110] = np.nan
+    return values
+
+
+def test_quantiles_are_within_the_relative_accuracy(amounts):
+    sketch = QuantileSketch()
+    for chunk in np.array_split(amounts, 7):
+        sketch.update(chunk)
+
+    values = np.sort(amounts[~np.isnan(amounts)])
+    qs = [0.0, 0.01, 0.1, 0.25, 0.31, 0.5, 0.75, 0.99, 1.0]
+    expected = values[np.floor(np.array(qs) * (len(values) - 1)).astype(int)]
+
+    assert sketch.count == len(values)
+    np.testing.assert_allclose(sketch.quantiles(qs), expected, rtol=RELATIVE_ACCURACY)
+    assert QuantileSketch().quantiles([0.5]) == [None]
+
+
+def test_quantile_sketches_merge_to_the_whole(amounts):
+    whole, merged = QuantileSketch(), QuantileSketch()
+    whole.update(amounts)
+
+    for chunk in np.array_split(amounts, 5):
+        part = QuantileSketch()
+        part.update(chunk)
+        merged.merge(part)
+
+    assert merged.to_dict() == whole.to_dict()
+    assert QuantileSketch.from_dict(whole.to_dict()).quantiles([0.1, 0.9]) == whole.quantiles([0.1, 0.9])
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_count_outside_is_close_to_the_true_count(amounts):
+    sketch = QuantileSketch()
+    sketch.update(amounts)
+    lower, upper = -200.0, 500.0
+
+    count = sketch.count_outside(lower, upper)
+
+    # Only values in the buckets holding the bounds can be misplaced
+    true = int(((amounts < lower) | (amounts > upper)).sum())
+    near = int(((np.abs(amounts - lower) <= 0.02 * abs(lower)) | (np.abs(amounts - upper) <= 0.02 * upper)).sum())
+    assert abs(count - true) <= near
+
+
+@pytest.mark.parametrize("distinct", [50, 3_000, 120_000])
+def test_distinct_estimate_is_accurate(distinct):
+    ids = pd.Series([f"CUST_{i:07d}" for i in range(distinct)])
+    sketch = DistinctSketch()
+
+    # Every ID seen several times, in chunks
+    for chunk in parts(pd.concat([ids, ids.sample(frac=1, random_state=0)]), 9):
+        sketch.update(chunk)
+
+    assert sketch.estimate() == pytest.approx(distinct, rel=0.03, abs=1)
+
+
+def test_distinct_sketches_merge_to_the_union():
+    left, right, whole = DistinctSketch(), DistinctSketch(), DistinctSketch()
+    ids = pd.Series([f"C{i}" for i in range(20_000)])
+
+    left.update(ids[:12_000])
+    right.update(ids[8_000:])
+    whole.update(ids)
+    left.merge(right)
+
+    np.testing.assert_array_equal(left.registers, whole.registers)
+    np.testing.assert_array_equal(DistinctSketch.from_dict(whole.to_dict()).registers, whole.registers)
+
+
+def test_top_k_keeps_every_frequent_value_within_its_error():
+    rng = np.random.default_rng(1)
+    # A few frequent values in a long tail of rare ones
+    values = pd.Series(np.concatenate([rng.choice(["RENT", "TESCO", "PAYROLL"], 6_000), [f"SHOP {i}" for i in rng.integers(0, 5_000, 20_000)]]))
+    values = values.sample(frac=1, random_state=1).reset_index(drop=True)
+    true = values.value_counts()
+    summaries = []
+
+    for chunk in parts(values, 6):
+        part = TopK(capacity=20)
+        part.update(chunk)
+        summaries.append(part)
+    merged = summaries[0]
+    for part in summaries[1:]:
+        merged.merge(part)
+
+    assert merged.error <= len(values) / 21
+    frequent = true[true > len(values) / 21]
+    assert set(frequent.index) <= set(merged.counts) and len(frequent) == 3
+    for value, n in merged.counts.items():
+        assert true[value] - merged.error <= n <= true[value]
+
+
+def test_profiles_of_chunks_merge_to_the_whole_file_profile(tmp_path):
+    tx = synthetic_transactions(20_000, customers=3_000)
+    whole, merged = TransactionProfile(), TransactionProfile()
+    whole.update(tx)
+
+    for chunk in parts(tx, 4):
+        part = TransactionProfile()
+        part.update(chunk)
+        merged.merge(part)
+    merged.save(tmp_path / "profile.json")
+    loaded = TransactionProfile.load(tmp_path / "profile.json")
+
+    assert merged.summary() == whole.summary()
+    assert loaded.summary() == whole.summary()
+    assert whole.summary()["distinct_customers"] == pytest.approx(tx["customer_id"].nunique(), rel=0.03)
+    drift = compare_profiles(loaded, whole)
+    assert drift["rows"]["relative_change"] == 0 and drift["new_top_descriptions"] == []
+    assert all(change["relative_change"] in (0, None) for group in drift["amount"].values() for change in group.values())
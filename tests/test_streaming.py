@@ -0,0 +1,52 @@
+"""The chunked build must match the in-memory build exactly, whatever the chunk size."""
+
+import pandas as pd
+import pytest
+
+from data_prep.description_cache import DescriptionCache
+from data_prep.parse_cache import ParseCache
+from data_prep.prepare_data import build_features
+from data_prep.streaming import build_features_streaming
+from data_prep.table_io import read_transactions
+
+
+@pytest.mark.parametrize("chunksize", [97, 1_000, 100_000])
+def test_streaming_matches_in_memory(transactions_csv, labels, chunksize):
+    expected = build_features(read_transactions(transactions_csv), labels)
+
+    result = build_features_streaming(transactions_csv, labels, chunksize=chunksize)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_streaming_parquet_matches_csv(transactions_csv, labels, tmp_path):
+    parquet = tmp_path / "transactions.parquet"
+    pd.read_csv(transactions_csv).to_parquet(parquet)
+
+    result = build_features_streaming(parquet, labels, chunksize=333)
+
+    pd.testing.assert_frame_equal(result, build_features_streaming(transactions_csv, labels, chunksize=2_000), check_exact=True)
+
+
+@pytest.mark.parametrize("chunksize", [97, 5_000])
+def test_streaming_time_range_matches_in_memory(transactions_csv, labels, chunksize):
+    time_range = {"since": "2025-02-01", "until": "2025-03-15 12:00:00"}
+    expected = build_features(read_transactions(transactions_csv, **time_range), labels)
+
+    result = build_features_streaming(transactions_csv, labels, chunksize=chunksize, **time_range)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_streaming_through_the_caches_matches_in_memory(transactions_csv, labels, tmp_path):
+    expected = build_features(read_transactions(transactions_csv), labels)
+    parse_cache = ParseCache(tmp_path / "parse_cache")
+
+    # The second run reads both caches
+    for _ in range(2):
+        description_cache = DescriptionCache(tmp_path / "descriptions.joblib")
+        result = build_features_streaming(transactions_csv, labels, chunksize=700, description_cache=description_cache, parse_cache=parse_cache)
+        description_cache.save()
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    assert parse_cache.hits == 1 and description_cache.new_descriptions == 0
@@ -0,0 +1,102 @@
+"""Columnar and compact reads must give the same tables and features as a plain CSV read."""
+
+import pandas as pd
+import pytest
+
+from data_prep.prepare_data import build_features
+from data_prep.table_io import iter_table, read_table, read_transactions, table_format, table_partitions, to_pence, write_table
+
+RANGE = {"since": "2025-02-01", "until": "2025-03-15 12:00"}
+
+
+@pytest.fixture
+def transaction_files(transactions, tmp_path):
+    """The same transactions as CSV, Parquet (small row groups) and Feather."""
+    typed = transactions.assign(txn_timestamp=pd.to_datetime(transactions["txn_timestamp"]))
+    paths = {"csv": tmp_path / "tx.csv", "parquet": tmp_path / "tx.parquet", "arrow": tmp_path / "tx.feather"}
+    transactions.to_csv(paths["csv"], index=False)
+    typed.to_parquet(paths["parquet"], row_group_size=500)
+    typed.to_feather(paths["arrow"])
+    return paths
+
+
+def _csv(path, **kwargs) -> pd.DataFrame:
+    return read_table(path, parse_dates=["txn_timestamp"], **kwargs).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_read_matches_csv(transaction_files, fmt):
+    columns = ["customer_id", "txn_timestamp", "amount"]
+
+    result = read_table(transaction_files[fmt], columns=columns, **RANGE).reset_index(drop=True)
+
+    expected = _csv(transaction_files["csv"], columns=columns, **RANGE)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert len(expected) and len(expected) < 5_000
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_chunks_add_up_to_the_table(transaction_files, fmt):
+    chunks = list(iter_table(transaction_files[fmt], 700, parse_dates=["txn_timestamp"], **RANGE))
+
+    assert all(len(chunk) <= 700 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), _csv(transaction_files["csv"], **RANGE), check_dtype=False)
+
+
+def test_features_from_parquet_match_csv(transaction_files, labels):
+    expected = build_features(read_transactions(transaction_files["csv"]), labels)
+
+    pd.testing.assert_frame_equal(build_features(read_transactions(transaction_files["parquet"]), labels), expected, check_exact=True)
+
+
+@pytest.mark.parametrize("name", ["features.parquet", "features.feather"])
+def test_feature_table_round_trip(transactions_csv, labels, tmp_path, name):
+    features = build_features(read_transactions(transactions_csv), labels)
+
+    write_table(features, tmp_path / name)
+
+    result = read_table(tmp_path / name)
+    assert result["txn_count"].dtype == "int32" and result["flag_risky_spend"].dtype == "int8"
+    pd.testing.assert_frame_equal(result, features, check_dtype=False, rtol=1e-6)
+
+
+def test_partitions_and_formats(tmp_path):
+    for name in ["b.csv", "a.parquet", "notes.txt"]:
+        (tmp_path / name).touch()
+
+    assert table_partitions(tmp_path) == [tmp_path / "a.parquet", tmp_path / "b.csv"]
+    assert table_partitions(str(tmp_path / "*.csv")) == [tmp_path / "b.csv"]
+    assert table_format(tmp_path / "x.PQ") == "parquet"
+    with pytest.raises(ValueError):
+        table_format(tmp_path / "notes.txt")
+
+
+def test_compact_profile(transactions_csv):
+    tx = read_transactions(transactions_csv)
+
+    assert {column: str(tx[column].dtype) for column in ["customer_id", "txn_type", "description", "amount_pence"]} == {
+        "customer_id": "category",
+        "txn_type": "category",
+        "description": "category",
+        "amount_pence": "int32",
+    }
+    assert tx["customer_id"].cat.categories.is_monotonic_increasing
+    assert pd.api.types.is_datetime64_any_dtype(tx["txn_timestamp"])
+
+
+def test_pence_round_trip_exactly():
+    amount = pd.Series([0.1, -703.8, 161.44, None, 1e7 + 0.01])
+
+    pence = to_pence(amount)
+
+    assert str(pence.dtype) == "Int32"
+    assert (pence.astype("float64") / 100).equals(amount)
+    assert to_pence(pd.Series([1.005])) is None
+
+
+def test_compact_profile_gives_the_same_features(transactions_csv, labels):
+    plain = pd.read_csv(transactions_csv, parse_dates=["txn_timestamp"])
+
+    expected = build_features(plain, labels)
+
+    pd.testing.assert_frame_equal(build_features(read_transactions(transactions_csv), labels), expected, check_exact=True)
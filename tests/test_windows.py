@@ -0,0 +1,46 @@
+"""Rolling-window columns from running totals must match filtering each window and grouping."""
+
+import pandas as pd
+
+from data_prep.columns import FEATURE_COLUMNS, with_window_columns
+from data_prep.keywords import KEYWORD_CLASSIFIER
+from data_prep.prepare_data import build_features
+from data_prep.table_io import read_transactions
+
+WINDOWS = [1, 7, 30]
+
+
+def _window_features(tx: pd.DataFrame, customers: pd.Index, days: int) -> pd.DataFrame:
+    """The window columns computed directly from the rows inside the window."""
+    reference_date = tx["txn_timestamp"].max()
+    inside = tx[tx["txn_timestamp"] >= reference_date - pd.Timedelta(days=days)]
+    pence = (inside["amount"] * 100).round()
+    is_salary = KEYWORD_CLASSIFIER.has(KEYWORD_CLASSIFIER.classify(inside["description"]), "salary")
+    grouped = inside.assign(
+        credit=pence.where(pence > 0, 0), debit=pence.where(pence < 0, 0), salary=(pence > 0).to_numpy() & is_salary
+    ).groupby("customer_id")
+    return pd.DataFrame(
+        {
+            f"credit_sum_{days}d": grouped["credit"].sum() / 100,
+            f"debit_sum_{days}d": grouped["debit"].sum() / 100,
+            f"txn_count_{days}d": grouped.size(),
+            f"has_salary_{days}d": grouped["salary"].any().astype(int),
+        }
+    ).reindex(customers, fill_value=0)
+
+
+def test_windows_match_direct_computation(transactions, transactions_csv, labels):
+    features = build_features(read_transactions(transactions_csv), labels, windows=WINDOWS).set_index("customer_id")
+    tx = transactions.assign(txn_timestamp=pd.to_datetime(transactions["txn_timestamp"]))
+
+    for days in WINDOWS:
+        expected = _window_features(tx, features.index, days)
+        pd.testing.assert_frame_equal(features[expected.columns], expected, check_dtype=False, check_names=False, check_exact=True)
+        assert features[f"txn_count_{days}d"].sum() > 0
+
+
+def test_window_columns_sit_before_the_target(transactions_csv, labels):
+    tx = read_transactions(transactions_csv)
+
+    assert list(build_features(tx, labels).columns) == FEATURE_COLUMNS
+    assert list(build_features(tx, labels, windows=WINDOWS).columns) == with_window_columns(FEATURE_COLUMNS, WINDOWS)